@@ -17,6 +17,7 @@ from django.shortcuts import get_object_or_404
 from django.template.loader import render_to_string
 from django.utils.encoding import smart_text
 from django.utils.safestring import mark_safe
+from django.utils.timezone import now
 from django.contrib.contenttypes.models import ContentType
 from django.utils.translation import ugettext_lazy as _
 from django.contrib.auth import views as auth_views
@@ -150,8 +151,6 @@ class APIView(views.APIView):
         normal Django request, store time the request started.
         '''
         self.time_started = time.time()
-        if getattr(settings, 'SQL_DEBUG', False):
-            self.queries_before = len(connection.queries)
 
         # If there are any custom headers in REMOTE_HOST_HEADERS, make sure
         # they respect the proxy whitelist
@@ -199,11 +198,6 @@ class APIView(views.APIView):
         if time_started:
             time_elapsed = time.time() - self.time_started
             response['X-API-Time'] = '%0.3fs' % time_elapsed
-        if getattr(settings, 'SQL_DEBUG', False):
-            queries_before = getattr(self, 'queries_before', 0)
-            q_times = [float(q['time']) for q in connection.queries[queries_before:]]
-            response['X-API-Query-Count'] = len(q_times)
-            response['X-API-Query-Time'] = '%0.3fs' % sum(q_times)
 
         return response
 
@@ -804,6 +798,7 @@ class CopyAPIView(GenericAPIView):
     serializer_class = CopySerializer
     permission_classes = (AllowAny,)
     copy_return_serializer_class = None
+    copy_batch_size = 500
     new_in_330 = True
     new_in_api_v2 = True
 
@@ -850,6 +845,13 @@ class CopyAPIView(GenericAPIView):
                 )
         return ret
 
+    @staticmethod
+    def _skip_field_at_copy(field, fields_to_discard):
+        # Adjust copy blacklist fields here.
+        return field.name in fields_to_discard or field.name in [
+            'id', 'pk', 'polymorphic_ctype', 'unifiedjobtemplate_ptr', 'created_by', 'modified_by'
+        ] or field.name.endswith('_role')
+
     @staticmethod
     def copy_model_obj(old_parent, new_parent, model, obj, creater, copy_name='', create_kwargs=None):
         fields_to_preserve = set(getattr(model, 'FIELDS_TO_PRESERVE_AT_COPY', []))
@@ -864,10 +866,7 @@ class CopyAPIView(GenericAPIView):
                 field_val = getattr(obj, field.name)
             except AttributeError:
                 continue
-            # Adjust copy blacklist fields here.
-            if field.name in fields_to_discard or field.name in [
-                'id', 'pk', 'polymorphic_ctype', 'unifiedjobtemplate_ptr', 'created_by', 'modified_by'
-            ] or field.name.endswith('_role'):
+            if CopyAPIView._skip_field_at_copy(field, fields_to_discard):
                 create_kwargs.pop(field.name, None)
                 continue
             if field.one_to_many:
@@ -927,6 +926,78 @@ class CopyAPIView(GenericAPIView):
                 ret.update(CopyAPIView.copy_model_obj(obj, new_obj, type(sub_obj), sub_obj, creater))
         return ret
 
+    @staticmethod
+    def bulk_copy_model_objs(old_parent, new_parent, model, objs, creater):
+        '''
+        Copy `objs`, sub-objects of `old_parent`, to `new_parent` with one
+        bulk insert per `copy_batch_size` objects, and return a mapping of old
+        to new objects.  Like `copy_model_obj`, related objects are attached
+        afterwards, see `awx.main.tasks._reconstruct_relationships`.
+        '''
+        fields_to_preserve = set(getattr(model, 'FIELDS_TO_PRESERVE_AT_COPY', []))
+        fields_to_discard = set(getattr(model, 'FIELDS_TO_DISCARD_AT_COPY', []))
+        if model._meta.parents or any(
+            model._meta.get_field(field_name).one_to_many for field_name in fields_to_preserve
+        ):
+            # Multi-table models can't be inserted in bulk, and objects with
+            # sub-objects of their own are copied recursively.
+            ret = {}
+            for obj in objs:
+                ret.update(CopyAPIView.copy_model_obj(old_parent, new_parent, model, obj, creater))
+            return ret
+
+        parent_model = old_parent._meta.concrete_model
+        fields = [
+            field for field in model._meta.concrete_fields
+            if not CopyAPIView._skip_field_at_copy(field, fields_to_discard)
+        ]
+        field_names = set(field.name for field in model._meta.concrete_fields)
+        approval_templates = {}
+        if model is WorkflowJobTemplateNode:
+            approval_templates = WorkflowApprovalTemplate.objects.in_bulk(
+                set(obj.unified_job_template_id for obj in objs if obj.unified_job_template_id)
+            )
+
+        created = now()
+        new_objs = []
+        for obj in objs:
+            create_kwargs = {}
+            for field in fields:
+                if field.many_to_one:
+                    # compare ids, rather than loading every related object
+                    related_id = getattr(obj, field.attname)
+                    if not related_id:
+                        continue
+                    if related_id == old_parent.pk and field.related_model._meta.concrete_model is parent_model:
+                        create_kwargs[field.attname] = new_parent.pk
+                    elif field.name in fields_to_preserve:
+                        create_kwargs[field.attname] = related_id
+                elif field.name in fields_to_preserve:
+                    create_kwargs[field.name] = CopyAPIView._decrypt_model_field_if_needed(
+                        obj, field.name, getattr(obj, field.name)
+                    )
+            if getattr(obj, 'unified_job_template_id', None) in approval_templates:
+                # see copy_model_obj; approval templates are never shared
+                new_approval_template, sub_objs = CopyAPIView.copy_model_obj(
+                    None, None, WorkflowApprovalTemplate,
+                    approval_templates[obj.unified_job_template_id], creater
+                )
+                create_kwargs['unified_job_template_id'] = new_approval_template.pk
+            if 'created' in field_names:
+                create_kwargs['created'] = create_kwargs['modified'] = created
+            if 'created_by' in field_names:
+                create_kwargs['created_by'] = creater
+            new_objs.append(model(**create_kwargs))
+
+        if connection.features.can_return_ids_from_bulk_insert:
+            model.objects.bulk_create(new_objs, batch_size=CopyAPIView.copy_batch_size)
+        else:
+            for new_obj in new_objs:
+                # without the overridden save() methods, like bulk_create
+                new_obj.save_base(force_insert=True)
+        logger.debug('Deep copy: Created {} new {} objects'.format(len(new_objs), model))
+        return dict(zip(objs, new_objs))
+
     def get(self, request, *args, **kwargs):
         obj = self.get_object()
         if not request.user.can_access(obj.__class__, 'read', obj):
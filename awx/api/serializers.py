@@ -72,6 +72,7 @@ from awx.main.utils import (
     has_model_field_prefetched, extract_ansible_vars, encrypt_dict,
     prefetch_page_capabilities, get_external_account)
 from awx.main.utils.filters import SmartFilter
+from awx.main.utils.named_url_graph import get_named_url
 from awx.main.redact import UriCleaner, REPLACE_STR
 
 from awx.main.validators import vars_validate_or_raise
@@ -352,8 +353,7 @@ class BaseSerializer(serializers.ModelSerializer, metaclass=BaseSerializerMetacl
 
     def _generate_named_url(self, url_path, obj, node):
         url_units = url_path.split('/')
-        named_url = node.generate_named_url(obj)
-        url_units[4] = named_url
+        url_units[4] = get_named_url(node, obj)
         return '/'.join(url_units)
 
     def get_related(self, obj):
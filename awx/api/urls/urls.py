@@ -34,7 +34,7 @@ from awx.api.views import (
     OAuth2ApplicationDetail,
 )
 
-from awx.api.views.metrics import MetricsView
+from awx.api.views.metrics import MetricsView, RequestMetricsView
 
 from .organization import urls as organization_urls
 from .user import urls as user_urls
@@ -93,6 +93,7 @@ v2_urls = [
     url(r'^tokens/$', OAuth2TokenList.as_view(), name='o_auth2_token_list'),
     url(r'^', include(oauth2_urls)),
     url(r'^metrics/$', MetricsView.as_view(), name='metrics_view'),
+    url(r'^metrics/requests/$', RequestMetricsView.as_view(), name='request_metrics_view'),
     url(r'^ping/$', ApiV2PingView.as_view(), name='api_v2_ping_view'),
     url(r'^config/$', ApiV2ConfigView.as_view(), name='api_v2_config_view'),
     url(r'^config/subscriptions/$', ApiV2SubscriptionView.as_view(), name='api_v2_subscription_view'),
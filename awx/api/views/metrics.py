@@ -15,6 +15,7 @@ from rest_framework.exceptions import PermissionDenied
 # AWX
 # from awx.main.analytics import collectors
 from awx.main.analytics.metrics import metrics
+from awx.main.utils.request_metrics import get_request_metrics
 from awx.api import renderers
 
 from awx.api.generics import (
@@ -39,3 +40,15 @@ class MetricsView(APIView):
         if (request.user.is_superuser or request.user.is_system_auditor):
             return Response(metrics().decode('UTF-8'))
         raise PermissionDenied()
+
+
+class RequestMetricsView(APIView):
+
+    name = _('Request Metrics')
+    swagger_topic = 'Metrics'
+
+    def get(self, request):
+        ''' Show the slowest views, with their most frequent queries '''
+        if (request.user.is_superuser or request.user.is_system_auditor):
+            return Response(get_request_metrics())
+        raise PermissionDenied()
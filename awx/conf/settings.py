@@ -1,6 +1,7 @@
 # Python
 from collections import namedtuple
 import contextlib
+import copy
 import logging
 import re
 import sys
@@ -8,6 +9,7 @@ import threading
 import time
 import traceback
 import urllib.parse
+from uuid import uuid4
 from io import StringIO
 
 # Django
@@ -57,6 +59,12 @@ SETTING_CACHE_TIMEOUT = 60
 # Flag indicating whether to store field default values in the cache.
 SETTING_CACHE_DEFAULTS = True
 
+# Shared cache key holding the version of the setting values kept in process
+# memory.  It is replaced whenever a setting changes (see `awx.conf.signals`
+# and `awx.main.tasks.handle_setting_changes`); every process compares it with
+# the version of its own values on each lookup and drops them when it differs.
+SETTING_VERSION_KEY = '_awx_conf_version'
+
 __all__ = ['SettingsWrapper', 'get_settings_to_cache', 'SETTING_CACHE_NOTSET']
 
 
@@ -222,6 +230,68 @@ class EncryptedCacheProxy(object):
         setattr(self.cache, name, value)
 
 
+class LocalSettingCache(object):
+
+    def __init__(self):
+        """
+        A per-process cache of decoded (and decrypted) setting values, used to
+        avoid a round trip to the shared cache, decryption and validation for
+        every setting lookup.  Values are kept until the shared
+        ``SETTING_VERSION_KEY`` changes.
+        """
+        self.lock = threading.Lock()
+        self.version = None
+        self.data = {}
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def check_version(self, version):
+        with self.lock:
+            if version != self.version:
+                if self.data:
+                    self.data.clear()
+                    self.invalidations += 1
+                self.version = version
+
+    def get(self, key):
+        with self.lock:
+            try:
+                value = self.data[key]
+            except KeyError:
+                self.misses += 1
+                return empty
+            self.hits += 1
+            return value
+
+    def set(self, key, value):
+        if value is empty:
+            return
+        with self.lock:
+            self.data[key] = value
+
+    def delete_many(self, names):
+        with self.lock:
+            for key in list(self.data):
+                if key[0] in names:
+                    del self.data[key]
+            self.invalidations += 1
+
+    def clear(self):
+        with self.lock:
+            self.data.clear()
+            self.invalidations += 1
+
+    def stats(self):
+        with self.lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'invalidations': self.invalidations,
+                'size': len(self.data),
+            }
+
+
 def get_writeable_settings(registry):
     return registry.get_registered_settings(read_only=False)
 
@@ -279,6 +349,7 @@ class SettingsWrapper(UserSettingsHolder):
         self.__dict__['_awx_conf_preload_lock'] = threading.RLock()
         self.__dict__['_awx_conf_init_readonly'] = False
         self.__dict__['cache'] = EncryptedCacheProxy(cache, registry)
+        self.__dict__['local_cache'] = LocalSettingCache()
         self.__dict__['registry'] = registry
 
     @cached_property
@@ -355,7 +426,7 @@ class SettingsWrapper(UserSettingsHolder):
         settings_to_cache['_awx_conf_preload_expires'] = self._awx_conf_preload_expires
         self.cache.set_many(settings_to_cache, timeout=SETTING_CACHE_TIMEOUT)
 
-    def _get_local(self, name, validate=True):
+    def _get_cached_value(self, name):
         self._preload_cache()
         cache_key = Setting.get_cache_key(name)
         try:
@@ -407,6 +478,25 @@ class SettingsWrapper(UserSettingsHolder):
                     logger.debug('Saving id in cache for encrypted setting %s', cache_key)
                     self.cache.cache.set(Setting.get_cache_id_key(cache_key), setting_id)
                 self.cache.set(cache_key, get_cache_value(value), timeout=SETTING_CACHE_TIMEOUT)
+        return value
+
+    def _get_local(self, name, validate=True):
+        self._check_local_version()
+        value = self.local_cache.get((name, validate))
+        if value is empty:
+            value = self._get_validated(name, validate)
+            self.local_cache.set((name, validate), value)
+        # Callers may mutate what they get back; never hand out the
+        # instance that is held in the local cache.
+        if isinstance(value, (list, dict)):
+            value = copy.deepcopy(value)
+        return value
+
+    def _get_validated(self, name, validate=True):
+        value = self._get_cached_value(name)
+        # looked up after _preload_cache(), which marks settings that are
+        # defined in a file as read-only
+        field = self.registry.get_setting_field(name)
         if value == SETTING_CACHE_NOTSET and not SETTING_CACHE_DEFAULTS:
             try:
                 value = field.get_default()
@@ -429,9 +519,35 @@ class SettingsWrapper(UserSettingsHolder):
                     value, name, exc_info=True)
         return empty
 
+    def _check_local_version(self):
+        version = self.cache.cache.get(SETTING_VERSION_KEY)
+        if version is None:
+            # First lookup since the shared cache was (re)started; values
+            # kept in memory can no longer be trusted.
+            self.cache.cache.add(SETTING_VERSION_KEY, uuid4().hex, timeout=None)
+            version = self.cache.cache.get(SETTING_VERSION_KEY)
+        self.local_cache.check_version(version)
+
     def _get_default(self, name):
         return getattr(self.default_settings, name)
 
+    def invalidate_local_cache(self, keys=None):
+        """
+        Drop in-process values for the given setting names (or all of them)
+        and replace the shared version, so that every other process sharing
+        the cache drops its values on its next lookup.  Call this after the
+        changed settings have been deleted from the shared cache.
+        """
+        # Catch up with changes made elsewhere before taking the new version.
+        self._check_local_version()
+        if keys is None:
+            self.local_cache.clear()
+        else:
+            self.local_cache.delete_many(set(keys))
+        version = uuid4().hex
+        self.cache.cache.set(SETTING_VERSION_KEY, version, timeout=None)
+        self.local_cache.version = version
+
     @property
     def SETTINGS_MODULE(self):
         return self._get_default('SETTINGS_MODULE')
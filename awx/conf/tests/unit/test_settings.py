@@ -5,6 +5,7 @@
 
 from contextlib import contextmanager
 import codecs
+import mock
 from uuid import uuid4
 import time
 
@@ -15,7 +16,7 @@ from django.utils.translation import ugettext_lazy as _
 import pytest
 
 from awx.conf import models, fields
-from awx.conf.settings import SettingsWrapper, EncryptedCacheProxy, SETTING_CACHE_NOTSET
+from awx.conf.settings import SettingsWrapper, EncryptedCacheProxy, SETTING_CACHE_NOTSET, SETTING_VERSION_KEY
 from awx.conf.registry import SettingsRegistry
 
 from awx.main.utils import encrypt_field, decrypt_field
@@ -483,3 +484,119 @@ def test_readonly_sensitive_cache_data_is_encrypted(settings):
     cache.set('AWX_ENCRYPTED', 'SECRET!')
     assert cache.get('AWX_ENCRYPTED') == 'SECRET!'
     assert native_cache.get('AWX_ENCRYPTED') == 'FRPERG!'
+
+
+def test_settings_use_local_cache(settings):
+    "repeated lookups are served from process memory"
+    settings.registry.register(
+        'AWX_VAR',
+        field_class=fields.CharField,
+        category=_('System'),
+        category_slug='system'
+    )
+    settings.cache.set('AWX_VAR', 'foobar')
+    settings.cache.set('_awx_conf_preload_expires', 100)
+    assert settings.AWX_VAR == 'foobar'
+
+    # Will fail test if the shared value or database is used
+    settings.cache.delete('AWX_VAR')
+    assert settings.AWX_VAR == 'foobar'
+    assert settings.local_cache.stats()['hits'] == 1
+
+
+def test_local_cache_invalidation(settings):
+    "invalidating a setting drops its in-process value"
+    settings.registry.register(
+        'AWX_VAR',
+        field_class=fields.CharField,
+        category=_('System'),
+        category_slug='system'
+    )
+    settings.cache.set('AWX_VAR', 'foobar')
+    settings.cache.set('_awx_conf_preload_expires', 100)
+    assert settings.AWX_VAR == 'foobar'
+
+    settings.cache.set('AWX_VAR', 'changed')
+    assert settings.AWX_VAR == 'foobar'
+    settings.invalidate_local_cache(['AWX_VAR'])
+    assert settings.AWX_VAR == 'changed'
+
+
+def test_local_cache_follows_shared_version(settings):
+    "values are re-read once another process changes the shared version"
+    settings.registry.register(
+        'AWX_VAR',
+        field_class=fields.CharField,
+        category=_('System'),
+        category_slug='system'
+    )
+    settings.cache.set('AWX_VAR', 'foobar')
+    settings.cache.set('_awx_conf_preload_expires', 100)
+    assert settings.AWX_VAR == 'foobar'
+
+    settings.cache.set('AWX_VAR', 'changed')
+    assert settings.AWX_VAR == 'foobar'
+    settings.cache.set(SETTING_VERSION_KEY, 'another-process')
+    assert settings.AWX_VAR == 'changed'
+
+    # losing the version (e.g., a restarted memcached) drops local values too
+    settings.cache.set('AWX_VAR', 'restarted')
+    settings.cache.delete(SETTING_VERSION_KEY)
+    assert settings.AWX_VAR == 'restarted'
+
+
+def test_local_cache_invalidation_replaces_shared_version(settings):
+    "invalidating a setting tells other processes to drop their values"
+    settings.registry.register(
+        'AWX_VAR',
+        field_class=fields.CharField,
+        category=_('System'),
+        category_slug='system'
+    )
+    settings.cache.set('AWX_VAR', 'foobar')
+    settings.cache.set('_awx_conf_preload_expires', 100)
+    assert settings.AWX_VAR == 'foobar'
+    version = settings.cache.get(SETTING_VERSION_KEY)
+
+    settings.invalidate_local_cache(['AWX_VAR'])
+    assert settings.cache.get(SETTING_VERSION_KEY) not in (None, version)
+
+
+def test_local_cache_skips_validation(settings):
+    "cached lookups do not validate the value again"
+    settings.registry.register(
+        'AWX_VAR',
+        field_class=fields.CharField,
+        category=_('System'),
+        category_slug='system'
+    )
+    settings.cache.set('AWX_VAR', 'foobar')
+    settings.cache.set('_awx_conf_preload_expires', 100)
+    assert settings.AWX_VAR == 'foobar'
+
+    field = settings.registry.get_setting_field('AWX_VAR')
+    with mock.patch.object(type(field), 'run_validation') as run_validation:
+        assert settings.AWX_VAR == 'foobar'
+    run_validation.assert_not_called()
+
+
+def test_local_cache_returns_copies(settings):
+    "mutating a returned value does not change the cached setting"
+    settings.registry.register(
+        'AWX_LIST',
+        field_class=fields.StringListField,
+        category=_('System'),
+        category_slug='system'
+    )
+    settings.cache.set('AWX_LIST', ['a', 'b'])
+    settings.cache.set('_awx_conf_preload_expires', 100)
+
+    # the value stored in the local cache on a miss
+    settings.AWX_LIST.append('c')
+    assert settings.AWX_LIST == ['a', 'b']
+
+    # the value read from the local cache on a hit
+    assert settings.local_cache.stats()['hits'] == 1
+    settings.AWX_LIST.append('c')
+    assert settings.AWX_LIST == ['a', 'b']
+    assert settings.local_cache.stats()['hits'] == 3
@@ -216,86 +216,103 @@ def query_info(since, collection_type):
     return query_info
 
 
-# Copies Job Events from db to a .csv to be shipped
+# Tables are copied from the db as .csv files to be shipped; each function
+# writes into `dest` and returns the highest id it copied (or None), which is
+# used as `last_id` the next time analytics are gathered.
+def _copy_table(query, params, dest):
+    with connection.cursor() as cursor:
+        cursor.copy_expert(cursor.mogrify(query, params).decode('utf-8'), dest)
+
+
+def _max_id(table):
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT max(id) FROM {}'.format(table))
+        return cursor.fetchone()[0] or 0
+
+
 @table_version('events_table.csv', '1.0')
-@table_version('unified_jobs_table.csv', '1.0')
-@table_version('unified_job_template_table.csv', '1.0')
-def copy_tables(since, full_path):
-    def _copy_table(table, query, path):
-        file_path = os.path.join(path, table + '_table.csv')
-        file = open(file_path, 'w', encoding='utf-8')
-        with connection.cursor() as cursor:
-            cursor.copy_expert(query, file)
-            file.close()
-        return file_path
-
-    events_query = '''COPY (SELECT main_jobevent.id, 
+def events_table(since, dest, last_id=None):
+    max_id = _max_id('main_jobevent')
+    events_query = '''COPY (SELECT main_jobevent.id,
                               main_jobevent.created,
                               main_jobevent.uuid,
                               main_jobevent.parent_uuid,
-                              main_jobevent.event, 
+                              main_jobevent.event,
                               main_jobevent.event_data::json->'task_action' AS task_action,
-                              main_jobevent.failed, 
-                              main_jobevent.changed, 
-                              main_jobevent.playbook, 
+                              main_jobevent.failed,
+                              main_jobevent.changed,
+                              main_jobevent.playbook,
                               main_jobevent.play,
                               main_jobevent.task,
-                              main_jobevent.role, 
-                              main_jobevent.job_id, 
-                              main_jobevent.host_id, 
+                              main_jobevent.role,
+                              main_jobevent.job_id,
+                              main_jobevent.host_id,
                               main_jobevent.host_name
-                              FROM main_jobevent 
-                              WHERE main_jobevent.created > {}
-                              ORDER BY main_jobevent.id ASC) TO STDOUT WITH CSV HEADER'''.format(since.strftime("'%Y-%m-%d %H:%M:%S'"))
-    _copy_table(table='events', query=events_query, path=full_path)
+                              FROM main_jobevent
+                              WHERE main_jobevent.created > %(since)s
+                              AND main_jobevent.id > %(last_id)s
+                              AND main_jobevent.id <= %(max_id)s
+                              ORDER BY main_jobevent.id ASC) TO STDOUT WITH CSV HEADER'''
+    _copy_table(events_query, {'since': since, 'last_id': last_id or 0, 'max_id': max_id}, dest)
+    return max(max_id, last_id or 0)
+
 
+@table_version('unified_jobs_table.csv', '1.0')
+def unified_jobs_table(since, dest, last_id=None):
+    max_id = _max_id('main_unifiedjob')
     unified_job_query = '''COPY (SELECT main_unifiedjob.id,
                                  main_unifiedjob.polymorphic_ctype_id,
                                  django_content_type.model,
                                  main_project.organization_id,
                                  main_organization.name as organization_name,
-                                 main_unifiedjob.created,  
-                                 main_unifiedjob.name,  
-                                 main_unifiedjob.unified_job_template_id, 
-                                 main_unifiedjob.launch_type, 
-                                 main_unifiedjob.schedule_id, 
-                                 main_unifiedjob.execution_node, 
-                                 main_unifiedjob.controller_node, 
-                                 main_unifiedjob.cancel_flag, 
-                                 main_unifiedjob.status, 
-                                 main_unifiedjob.failed, 
-                                 main_unifiedjob.started, 
-                                 main_unifiedjob.finished, 
-                                 main_unifiedjob.elapsed, 
-                                 main_unifiedjob.job_explanation, 
+                                 main_unifiedjob.created,
+                                 main_unifiedjob.name,
+                                 main_unifiedjob.unified_job_template_id,
+                                 main_unifiedjob.launch_type,
+                                 main_unifiedjob.schedule_id,
+                                 main_unifiedjob.execution_node,
+                                 main_unifiedjob.controller_node,
+                                 main_unifiedjob.cancel_flag,
+                                 main_unifiedjob.status,
+                                 main_unifiedjob.failed,
+                                 main_unifiedjob.started,
+                                 main_unifiedjob.finished,
+                                 main_unifiedjob.elapsed,
+                                 main_unifiedjob.job_explanation,
                                  main_unifiedjob.instance_group_id
                                  FROM main_unifiedjob
                                  JOIN main_job ON main_unifiedjob.id = main_job.unifiedjob_ptr_id
                                  JOIN django_content_type ON main_unifiedjob.polymorphic_ctype_id = django_content_type.id
                                  JOIN main_project ON main_project.unifiedjobtemplate_ptr_id = main_job.project_id
                                  JOIN main_organization ON main_organization.id = main_project.organization_id
-                                 WHERE main_unifiedjob.created > {} 
+                                 WHERE main_unifiedjob.created > %(since)s
+                                 AND main_unifiedjob.id > %(last_id)s
+                                 AND main_unifiedjob.id <= %(max_id)s
                                  AND main_unifiedjob.launch_type != 'sync'
-                                 ORDER BY main_unifiedjob.id ASC) TO STDOUT WITH CSV HEADER'''.format(since.strftime("'%Y-%m-%d %H:%M:%S'"))    
-    _copy_table(table='unified_jobs', query=unified_job_query, path=full_path)
+                                 ORDER BY main_unifiedjob.id ASC) TO STDOUT WITH CSV HEADER'''
+    _copy_table(unified_job_query, {'since': since, 'last_id': last_id or 0, 'max_id': max_id}, dest)
+    return max(max_id, last_id or 0)
 
-    unified_job_template_query = '''COPY (SELECT main_unifiedjobtemplate.id, 
+
+@table_version('unified_job_template_table.csv', '1.0')
+def unified_job_template_table(since, dest, last_id=None):
+    # templates are modified in place, so every run ships all of them
+    unified_job_template_query = '''COPY (SELECT main_unifiedjobtemplate.id,
                                  main_unifiedjobtemplate.polymorphic_ctype_id,
                                  django_content_type.model,
-                                 main_unifiedjobtemplate.created, 
-                                 main_unifiedjobtemplate.modified, 
-                                 main_unifiedjobtemplate.created_by_id, 
-                                 main_unifiedjobtemplate.modified_by_id, 
-                                 main_unifiedjobtemplate.name, 
-                                 main_unifiedjobtemplate.current_job_id, 
-                                 main_unifiedjobtemplate.last_job_id, 
-                                 main_unifiedjobtemplate.last_job_failed, 
-                                 main_unifiedjobtemplate.last_job_run, 
-                                 main_unifiedjobtemplate.next_job_run, 
-                                 main_unifiedjobtemplate.next_schedule_id, 
-                                 main_unifiedjobtemplate.status 
+                                 main_unifiedjobtemplate.created,
+                                 main_unifiedjobtemplate.modified,
+                                 main_unifiedjobtemplate.created_by_id,
+                                 main_unifiedjobtemplate.modified_by_id,
+                                 main_unifiedjobtemplate.name,
+                                 main_unifiedjobtemplate.current_job_id,
+                                 main_unifiedjobtemplate.last_job_id,
+                                 main_unifiedjobtemplate.last_job_failed,
+                                 main_unifiedjobtemplate.last_job_run,
+                                 main_unifiedjobtemplate.next_job_run,
+                                 main_unifiedjobtemplate.next_schedule_id,
+                                 main_unifiedjobtemplate.status
                                  FROM main_unifiedjobtemplate, django_content_type
                                  WHERE main_unifiedjobtemplate.polymorphic_ctype_id = django_content_type.id
-                                 ORDER BY main_unifiedjobtemplate.id ASC) TO STDOUT WITH CSV HEADER'''.format(since.strftime("'%Y-%m-%d %H:%M:%S'"))    
-    _copy_table(table='unified_job_template', query=unified_job_template_query, path=full_path)
-    return
+                                 ORDER BY main_unifiedjobtemplate.id ASC) TO STDOUT WITH CSV HEADER'''
+    _copy_table(unified_job_template_query, {}, dest)
@@ -1,13 +1,18 @@
 import inspect
+import io
 import json
 import logging
 import os
 import os.path
+import tarfile
 import tempfile
-import shutil
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 import requests
 
 from django.conf import settings
+from django.db import connection
 from django.utils.timezone import now, timedelta
 from rest_framework.exceptions import PermissionDenied
 
@@ -24,6 +29,12 @@ logger = logging.getLogger('awx.main.analytics')
 
 manifest = dict()
 
+# table watermarks of gathered tarballs, saved once they have been shipped
+_pending_watermarks = dict()
+
+# tables larger than this are spooled to disk while they are gathered
+SPOOL_MAX_SIZE = 8 * 1024 * 1024
+
 
 def _valid_license():
     try:
@@ -56,16 +67,61 @@ def register(key, version):
 
 
 def table_version(file_name, version):
+    """
+    A decorator used to register a function as a table copier.
+
+    Decorated functions are called with `(since, dest, last_id)`, write a CSV
+    to the file-like `dest`, and return the highest id they copied (which is
+    passed as `last_id` next time), or None.
+    """
 
     global manifest
     manifest[file_name] = version
 
     def decorate(f):
+        f.__awx_analytics_table__ = file_name
         return f
 
     return decorate
 
 
+def _run_collector(func, last_run, collection_type):
+    key = func.__awx_analytics_key__
+    try:
+        if func.__name__ == 'query_info':
+            data = func(last_run, collection_type=collection_type)
+        else:
+            data = func(last_run)
+        return '{}.json'.format(key), json.dumps(data).encode('utf-8')
+    except Exception:
+        logger.exception("Could not generate metric {}.json".format(key))
+    finally:
+        # each worker thread has its own connection
+        connection.close()
+
+
+def _copy_table(func, since, last_id):
+    name = func.__awx_analytics_table__
+    start = time.time()
+    dest = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE, mode='w+b')
+    try:
+        watermark = func(since, dest, last_id=last_id)
+        logger.debug('Copied {} in {:.3f}s'.format(name, time.time() - start))
+        return name, dest, watermark
+    except Exception:
+        logger.exception("Could not copy table {}".format(name))
+        dest.close()
+    finally:
+        connection.close()
+
+
+def _add_member(archive, name, fileobj, size):
+    info = tarfile.TarInfo('./' + name)
+    info.size = size
+    info.mtime = time.time()
+    archive.addfile(info, fileobj)
+
+
 def gather(dest=None, module=None, collection_type='scheduled'):
     """
     Gather all defined metrics and write them as JSON files in a .tgz
@@ -79,7 +135,7 @@ def gather(dest=None, module=None, collection_type='scheduled'):
     state = TowerAnalyticsState.get_solo()
     last_run = state.last_run
     logger.debug("Last analytics run was: {}".format(last_run))
-    
+
     max_interval = now() - timedelta(weeks=4)
     if last_run < max_interval or not last_run:
         last_run = max_interval
@@ -96,49 +152,58 @@ def gather(dest=None, module=None, collection_type='scheduled'):
         from awx.main.analytics import collectors
         module = collectors
 
-
-    dest = dest or tempfile.mkdtemp(prefix='awx_analytics')
+    collector_funcs, table_funcs = [], []
     for name, func in inspect.getmembers(module):
         if inspect.isfunction(func) and hasattr(func, '__awx_analytics_key__'):
-            key = func.__awx_analytics_key__
-            manifest['{}.json'.format(key)] = func.__awx_analytics_version__
-            path = '{}.json'.format(os.path.join(dest, key))
-            with open(path, 'w', encoding='utf-8') as f:
-                try:
-                    if func.__name__ == 'query_info':
-                        json.dump(func(last_run, collection_type=collection_type), f)
-                    else:
-                        json.dump(func(last_run), f)
-                except Exception:
-                    logger.exception("Could not generate metric {}.json".format(key))
-                    f.close()
-                    os.remove(f.name)
-    
-    path = os.path.join(dest, 'manifest.json')
-    with open(path, 'w', encoding='utf-8') as f:
-        try:
-            json.dump(manifest, f)
-        except Exception:
-            logger.exception("Could not generate manifest.json")
-            f.close()
-            os.remove(f.name)
+            manifest['{}.json'.format(func.__awx_analytics_key__)] = func.__awx_analytics_version__
+            collector_funcs.append(func)
+        elif inspect.isfunction(func) and hasattr(func, '__awx_analytics_table__'):
+            table_funcs.append(func)
 
-    try:
-        collectors.copy_tables(since=last_run, full_path=dest)
-    except Exception:
-        logger.exception("Could not copy tables")
-        
     # can't use isoformat() since it has colons, which GNU tar doesn't like
     tarname = '_'.join([
         settings.SYSTEM_UUID,
         run_now.strftime('%Y-%m-%d-%H%M%S%z')
     ])
-    tgz = shutil.make_archive(
-        os.path.join(os.path.dirname(dest), tarname),
-        'gztar',
-        dest
-    )
-    shutil.rmtree(dest)
+    tgz = os.path.join(dest or tempfile.gettempdir(), tarname + '.tar.gz')
+
+    watermarks = dict(state.table_watermarks)
+    with ThreadPoolExecutor(max_workers=settings.AUTOMATION_ANALYTICS_GATHER_WORKERS) as executor:
+        collector_results = [
+            executor.submit(_run_collector, func, last_run, collection_type)
+            for func in collector_funcs
+        ]
+        table_results = []
+        for func in table_funcs:
+            last_id = watermarks.get(func.__awx_analytics_table__)
+            # rows already shipped are excluded by id, so the window only has
+            # to cover what a failed upload could have left behind
+            since = max_interval if last_id is not None else last_run
+            table_results.append(executor.submit(_copy_table, func, since, last_id))
+
+        with tarfile.open(tgz, 'w:gz') as archive:
+            for future in collector_results:
+                result = future.result()
+                if result:
+                    name, data = result
+                    _add_member(archive, name, io.BytesIO(data), len(data))
+            try:
+                data = json.dumps(manifest).encode('utf-8')
+                _add_member(archive, 'manifest.json', io.BytesIO(data), len(data))
+            except Exception:
+                logger.exception("Could not generate manifest.json")
+            for future in table_results:
+                result = future.result()
+                if result:
+                    name, f, watermark = result
+                    with f:
+                        size = f.tell()
+                        f.seek(0)
+                        _add_member(archive, name, f, size)
+                    if watermark is not None:
+                        watermarks[name] = watermark
+
+    _pending_watermarks[tgz] = watermarks
     return tgz
 
 
@@ -176,7 +241,12 @@ def ship(path):
         run_now = now()
         state = TowerAnalyticsState.get_solo()
         state.last_run = run_now
-        state.save()
+        update_fields = ['last_run']
+        if path in _pending_watermarks:
+            state.table_watermarks = _pending_watermarks[path]
+            update_fields.append('table_watermarks')
+        state.save(update_fields=update_fields)
     finally:
+        _pending_watermarks.pop(path, None)
         # cleanup tar.gz
         os.remove(path)
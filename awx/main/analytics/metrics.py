@@ -1,4 +1,7 @@
+import time
+
 from django.conf import settings
+from django.core.cache import cache
 from prometheus_client import (
     REGISTRY,
     PROCESS_COLLECTOR,
@@ -8,9 +11,13 @@ from prometheus_client import (
     Info,
     generate_latest
 )
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily, HistogramMetricFamily
 
 from awx.conf.license import get_license
+from awx.main.models import Project, UnifiedJob
+from awx.main.dispatch.metrics import cumulative, get_node_metrics
 from awx.main.utils import (get_awx_version, get_ansible_version)
+from awx.main.utils.project_cache import get_checkout_cache_stats
 from awx.main.analytics.collectors import (
     counts, 
     instance_info,
@@ -50,9 +57,114 @@ INSTANCE_STATUS = Gauge('awx_instance_status_total', 'Status of Job launched', [
 LICENSE_INSTANCE_TOTAL = Gauge('awx_license_instance_total', 'Total number of managed hosts provided by your license')
 LICENSE_INSTANCE_FREE = Gauge('awx_license_instance_free', 'Number of remaining managed hosts provided by your license')
 
+SETTINGS_LOCAL_CACHE = Gauge('awx_settings_local_cache', 'In-process settings cache statistics of the serving process', ['type',])
+SCRAPE_DURATION = Gauge('awx_metrics_scrape_duration_seconds', 'Time spent collecting metrics for the last scrape of the serving process')
+PROJECT_CHECKOUT_CACHE = Gauge('awx_project_checkout_cache_total', 'Project checkouts served from or added to the checkout cache', ['project_id', 'type',])
+
+
+class DispatcherCollector(object):
+    '''
+    Exports the metrics recorded by the dispatcher and callback receiver
+    processes of this node (see awx.main.dispatch.metrics).  They are kept in
+    the node's own cache, so each node has to be scraped.
+    '''
+
+    COUNTERS = {
+        'events_saved': ('awx_callback_events_saved', 'Job events saved by the callback receiver', ['event']),
+    }
+    HISTOGRAMS = {
+        'task_duration_seconds': ('awx_dispatcher_task_duration_seconds', 'Time spent running dispatcher tasks', ['task']),
+        'event_save_seconds': ('awx_callback_event_save_seconds', 'Time spent saving job events to the database', []),
+        'event_lag_seconds': ('awx_callback_event_lag_seconds', 'Time from a job event being created to it being saved', []),
+    }
+
+    def describe(self):
+        # don't read the cache at registration time
+        return []
+
+    def collect(self):
+        counters = dict((name, CounterMetricFamily(*spec[:2], labels=['node'] + spec[2])) for name, spec in self.COUNTERS.items())
+        histograms = dict((name, {}) for name in self.HISTOGRAMS)
+        workers = GaugeMetricFamily('awx_dispatcher_workers', 'Worker processes in each pool', labels=['node', 'pool'])
+        depth = GaugeMetricFamily('awx_dispatcher_queue_depth', 'Messages delivered to workers and not finished yet', labels=['node', 'pool'])
+        messages = CounterMetricFamily('awx_dispatcher_worker_messages', 'Messages finished by each worker', labels=['node', 'pool', 'pid'])
+        lag = GaugeMetricFamily('awx_dispatcher_worker_lag_seconds', 'Age of the oldest unfinished message of each worker', labels=['node', 'pool', 'pid'])
+        autoscale = CounterMetricFamily('awx_dispatcher_autoscale', 'Workers added and removed by autoscaling', labels=['node', 'pool', 'direction'])
+
+        node = settings.CLUSTER_HOST_ID
+        series, pools = get_node_metrics(node)
+        for (name, labels), value in series.items():
+            labels = dict(labels)
+            if name in counters:
+                counters[name].add_metric([node] + [labels.get(label, '') for label in self.COUNTERS[name][2]], value)
+                continue
+            base, _, kind = name.rpartition('_')
+            if base not in histograms:
+                continue
+            le = labels.pop('le', None)
+            key = (node,) + tuple(labels.get(label, '') for label in self.HISTOGRAMS[base][2])
+            data = histograms[base].setdefault(key, {'buckets': {}, 'sum': 0})
+            if kind == 'bucket':
+                data['buckets'][le] = value
+            elif kind == 'sum':
+                data['sum'] = value / 1000000.0
+        for name, snapshot in pools.items():
+            workers.add_metric([node, name], len(snapshot['workers']))
+            depth.add_metric([node, name], sum(w['depth'] for w in snapshot['workers']))
+            for w in snapshot['workers']:
+                messages.add_metric([node, name, str(w['pid'])], w['messages_finished'])
+                lag.add_metric([node, name, str(w['pid'])], w['lag'])
+            autoscale.add_metric([node, name, 'up'], snapshot['scaled_up'])
+            autoscale.add_metric([node, name, 'down'], snapshot['scaled_down'])
+
+        families = list(counters.values()) + [workers, depth, messages, lag, autoscale]
+        for name, data_by_labels in histograms.items():
+            family = HistogramMetricFamily(*self.HISTOGRAMS[name][:2], labels=['node'] + self.HISTOGRAMS[name][2])
+            for key, data in data_by_labels.items():
+                family.add_metric(list(key), cumulative(data['buckets']), data['sum'])
+            families.append(family)
+        for family in families:
+            if family.samples:
+                yield family
+
+
+REGISTRY.register(DispatcherCollector())
+
+AGGREGATES_CACHE_KEY = 'awx-metrics-aggregates'
+JOB_STATUSES = [status for status, _ in UnifiedJob.STATUS_CHOICES]
+
+
+def get_aggregates():
+    """
+    Return the expensive (license, counts and GROUP BY) data behind the
+    metrics, cached for `AWX_METRICS_CACHE_TIMEOUT` seconds.
+    """
+    timeout = settings.AWX_METRICS_CACHE_TIMEOUT
+    aggregates = cache.get(AGGREGATES_CACHE_KEY) if timeout else None
+    if aggregates is None:
+        aggregates = {
+            'license': get_license(show_key=False),
+            'counts': counts(None),
+            'job_counts': job_counts(None),
+            'instance_info': instance_info(None, include_hostnames=True),
+            'job_instance_counts': job_instance_counts(None),
+        }
+        if timeout:
+            cache.set(AGGREGATES_CACHE_KEY, aggregates, timeout)
+    return aggregates
+
+
+def get_job_status_counts(aggregates):
+    # report every status, so a gauge drops back to zero when its last job moves on
+    statuses = dict.fromkeys(JOB_STATUSES, 0)
+    statuses.update(aggregates['job_counts'].get('status', {}))
+    return statuses
+
 
 def metrics():
-    license_info = get_license(show_key=False)
+    start = time.time()
+    aggregates = get_aggregates()
+    license_info = aggregates['license']
     SYSTEM_INFO.info({
         'install_uuid': settings.INSTALL_UUID,
         'insights_analytics': str(settings.INSIGHTS_TRACKING_STATE),
@@ -69,7 +181,12 @@ def metrics():
     LICENSE_INSTANCE_TOTAL.set(str(license_info.get('available_instances', 0)))
     LICENSE_INSTANCE_FREE.set(str(license_info.get('free_instances', 0)))
 
-    current_counts = counts(None)
+    settings_wrapper = getattr(settings, '_awx_conf_settings', None)
+    if settings_wrapper:
+        for stat, value in settings_wrapper.local_cache.stats().items():
+            SETTINGS_LOCAL_CACHE.labels(type=stat).set(value)
+
+    current_counts = aggregates['counts']
 
     ORG_COUNT.set(current_counts['organization'])
     USER_COUNT.set(current_counts['user'])
@@ -90,15 +207,19 @@ def metrics():
     USER_SESSIONS.labels(type='user').set(current_counts['active_user_sessions'])
     USER_SESSIONS.labels(type='anonymous').set(current_counts['active_anonymous_sessions'])
 
-    all_job_data = job_counts(None)
-    statuses = all_job_data.get('status', {})
+    statuses = get_job_status_counts(aggregates)
     for status, value in statuses.items():
         STATUS.labels(status=status).set(value)
 
-    RUNNING_JOBS.set(current_counts['running_jobs'])
-    PENDING_JOBS.set(current_counts['pending_jobs'])
+    project_ids = Project.objects.values_list('id', flat=True)
+    for project_id, stats in get_checkout_cache_stats(project_ids).items():
+        for stat, value in stats.items():
+            PROJECT_CHECKOUT_CACHE.labels(project_id=project_id, type=stat).set(value)
 
-    instance_data = instance_info(None, include_hostnames=True)
+    RUNNING_JOBS.set(statuses.get('running', 0) + statuses.get('waiting', 0))
+    PENDING_JOBS.set(statuses.get('pending', 0))
+
+    instance_data = aggregates['instance_info']
     for uuid, info in instance_data.items():
         hostname = info['hostname']
         INSTANCE_CAPACITY.labels(hostname=hostname, instance_uuid=uuid).set(instance_data[uuid]['capacity'])
@@ -111,7 +232,7 @@ def metrics():
             'version': instance_data[uuid]['version']
         })
 
-    instance_data = job_instance_counts(None)
+    instance_data = aggregates['job_instance_counts']
     for node in instance_data:
         # skipping internal execution node (for system jobs) 
         if node == '':
@@ -123,7 +244,7 @@ def metrics():
         for status, value in statuses.items():
             INSTANCE_STATUS.labels(node=node, status=status).set(value)
 
-
+    SCRAPE_DURATION.set(time.time() - start)
     return generate_latest()
 
 
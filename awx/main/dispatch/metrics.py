@@ -0,0 +1,182 @@
+import collections
+import hashlib
+import logging
+import os
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+logger = logging.getLogger('awx.main.dispatch')
+
+__all__ = ['WorkerMetrics', 'worker_metrics', 'report_pool', 'cumulative', 'get_node_metrics', 'get_node_series']
+
+# upper bounds (in seconds) of histogram buckets
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300, 900, 3600)
+
+SERIES_KEY = 'awx-{}-metrics-{}-{}'
+INDEX_KEY = 'awx-{}-metrics-{}-index'
+POOL_KEY = 'awx-dispatch-metrics-{}-pool-{}'
+POOL_NAMES = ('dispatcher', 'callback_receiver')
+
+# seconds between writes to the cache
+FLUSH_INTERVAL = 5
+# seconds between checks that the index still lists every series we write
+INDEX_CHECK_INTERVAL = 60
+# a pool that stops reporting (e.g., its service was stopped) disappears after
+POOL_TIMEOUT = 60
+# the most series recorded per namespace and node, which keeps the index well
+# under memcached's item size limit; new series beyond it are not recorded
+MAX_SERIES = 5000
+
+
+class WorkerMetrics(object):
+    '''
+    Counters and histograms recorded by dispatcher and callback receiver
+    worker processes.
+
+    Observations are accumulated in process memory, and periodically added to
+    per-node counters in the (memcached) cache with `incr`, so that every
+    process on a node contributes to the same series and the values survive
+    worker restarts.  The metrics endpoint reads them back with
+    `get_node_metrics`.
+
+    Each series is identified by a (name, labels) tuple, where labels is a
+    tuple of (key, value) pairs.  Histograms are stored as non-cumulative
+    `<name>_bucket` counters (with an `le` label) and a `<name>_sum` counter
+    in microseconds (or other units, with `scale`); `cumulative` turns the
+    buckets back into the layout Prometheus expects.
+
+    Series are kept apart by `namespace`, so that other processes (e.g., the
+    API) can record metrics of their own the same way.
+    '''
+
+    def __init__(self, namespace='dispatch'):
+        self.namespace = namespace
+        self.pending = collections.defaultdict(int)
+        self.keys = {}
+        self.last_flush = time.time()
+        self.last_index_check = 0
+        self.full = False
+
+    def inc(self, name, amount=1, **labels):
+        self.pending[(name, tuple(sorted(labels.items())))] += amount
+
+    def observe(self, name, value, buckets=BUCKETS, scale=1000000, **labels):
+        for bound in buckets:
+            if value <= bound:
+                le = str(bound)
+                break
+        else:
+            le = '+Inf'
+        self.inc(name + '_bucket', le=le, **labels)
+        self.inc(name + '_sum', int(value * scale), **labels)
+
+    def flush(self, force=False):
+        now = time.time()
+        if not force and now - self.last_flush < FLUSH_INTERVAL:
+            return
+        self.last_flush = now
+        if not self.pending:
+            return
+        pending, self.pending = self.pending, collections.defaultdict(int)
+        node = settings.CLUSTER_HOST_ID
+        try:
+            new_keys = False
+            for series, delta in pending.items():
+                key = SERIES_KEY.format(self.namespace, node, hashlib.md5(repr(series).encode('utf-8')).hexdigest())
+                if key not in self.keys:
+                    if len(self.keys) >= MAX_SERIES:
+                        if not self.full:
+                            logger.warning('not recording new {} metrics, over {} series'.format(self.namespace, MAX_SERIES))
+                            self.full = True
+                        continue
+                    self.keys[key] = series
+                    new_keys = True
+                if not cache.add(key, delta, timeout=None):
+                    try:
+                        cache.incr(key, delta)
+                    except ValueError:
+                        # evicted since the add()
+                        cache.set(key, delta, timeout=None)
+            if new_keys or now - self.last_index_check > INDEX_CHECK_INTERVAL:
+                self.update_index(node)
+                self.last_index_check = now
+        except Exception:
+            logger.exception('failed to record dispatcher metrics')
+
+    def update_index(self, node):
+        # concurrent writers can lose each other's additions; every process
+        # re-adds its own series on the next check
+        index_key = INDEX_KEY.format(self.namespace, node)
+        index = cache.get(index_key) or {}
+        missing = dict((key, series) for key, series in self.keys.items() if key not in index)
+        if missing and len(index) < MAX_SERIES:
+            index.update(missing)
+            cache.set(index_key, index, timeout=None)
+
+
+worker_metrics = WorkerMetrics()
+
+_last_pool_report = {}
+
+
+def report_pool(name, pool):
+    '''
+    Publish the state of a worker pool (as seen by the process that owns it)
+    for the metrics endpoint; called from the consumer loop.
+    '''
+    now = time.time()
+    if now - _last_pool_report.get(name, 0) < FLUSH_INTERVAL:
+        return
+    _last_pool_report[name] = now
+    workers = []
+    for w in pool.workers:
+        workers.append({
+            'pid': w.pid,
+            'messages_finished': w.finished.value,
+            'depth': w.depth,
+            'lag': w.lag,
+        })
+    snapshot = {
+        'pid': os.getpid(),
+        'workers': workers,
+        'scaled_up': pool.scaled_up,
+        'scaled_down': pool.scaled_down,
+    }
+    try:
+        cache.set(POOL_KEY.format(settings.CLUSTER_HOST_ID, name), snapshot, timeout=POOL_TIMEOUT)
+    except Exception:
+        logger.exception('failed to record {} pool metrics'.format(name))
+
+
+def cumulative(buckets, bounds=BUCKETS):
+    '''
+    Returns [(le, count)] of the observations at or below each bucket bound,
+    given {le: count} of the (non-cumulative) recorded buckets.
+    '''
+    result, total = [], 0
+    for le in [str(bound) for bound in bounds] + ['+Inf']:
+        total += buckets.get(le, 0)
+        result.append((le, total))
+    return result
+
+
+def get_node_series(node, namespace='dispatch'):
+    '''
+    Returns {series: value} for the metrics recorded on the given node.
+    '''
+    index = cache.get(INDEX_KEY.format(namespace, node)) or {}
+    values = cache.get_many(list(index.keys()))
+    return dict((index[key], value) for key, value in values.items())
+
+
+def get_node_metrics(node):
+    '''
+    Returns a ({series: value}, {pool name: snapshot}) tuple of the metrics
+    recorded on the given node.
+    '''
+    series = get_node_series(node)
+    pool_keys = dict((POOL_KEY.format(node, name), name) for name in POOL_NAMES)
+    pools = dict((pool_keys[key], snapshot) for key, snapshot in cache.get_many(list(pool_keys.keys())).items())
+    return series, pools
@@ -2,11 +2,13 @@ import logging
 import os
 import random
 import sys
+import time
 import traceback
 from uuid import uuid4
 
 import collections
-from multiprocessing import Process
+from ctypes import c_ulonglong
+from multiprocessing import Process, RawValue
 from multiprocessing import Queue as MPQueue
 from queue import Full as QueueFull, Empty as QueueEmpty
 
@@ -29,21 +31,26 @@ class PoolWorker(object):
     '''
     Used to track a worker child process and its pending and finished messages.
 
-    This class makes use of two distinct multiprocessing.Queues to track state:
+    This class makes use of a multiprocessing.Queue and a shared memory
+    counter to track state:
 
     - self.queue: this is a queue which represents pending messages that should
                   be handled by this worker process; as new AMQP messages come
                   in, a pool will put() them into this queue; the child
                   process that is forked will get() from this queue and handle
                   received messages in an endless loop
-    - self.finished: this is a queue which the worker process uses to signal
-                     that it has finished processing a message
+    - self.finished: this is an unsynchronized shared memory counter which
+                     the worker process increments every time it has finished
+                     processing a message; the child is its only writer, so
+                     no lock (and no pipe round trip) is needed to read it
 
     When a message is put() onto this worker, it is tracked in
     self.managed_tasks.
 
     Periodically, the worker will call .calculate_managed_tasks(), which will
-    cause messages in self.finished to be removed from self.managed_tasks.
+    compare the finished counter with the number of messages it has already
+    accounted for, and remove that many of the oldest messages from
+    self.managed_tasks (the child process handles its queue in order).
 
     In this way, self.managed_tasks represents a view of the messages assigned
     to a specific process.  The message at [0] is the least-recently inserted
@@ -58,7 +65,8 @@ class PoolWorker(object):
         self.messages_sent = 0
         self.messages_finished = 0
         self.managed_tasks = collections.OrderedDict()
-        self.finished = MPQueue(queue_size)
+        self.delivered_at = collections.deque()
+        self.finished = RawValue(c_ulonglong, 0)
         self.queue = MPQueue(queue_size)
         self.process = Process(target=target, args=(self.queue, self.finished) + args)
         self.process.daemon = True
@@ -72,13 +80,21 @@ class PoolWorker(object):
             if not body.get('uuid'):
                 body['uuid'] = str(uuid4())
             uuid = body['uuid']
-        logger.debug('delivered {} to worker[{}] qsize {}'.format(
-            uuid, self.pid, self.qsize
-        ))
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug('delivered {} to worker[{}] qsize {}'.format(
+                uuid, self.pid, self.qsize
+            ))
+        self.calculate_managed_tasks()
         self.managed_tasks[uuid] = body
-        self.queue.put(body, block=True, timeout=5)
+        try:
+            self.queue.put(body, block=True, timeout=5)
+        except Exception:
+            # the message was never delivered to this worker (e.g., its queue
+            # is full), so don't wait for it to be finished
+            del self.managed_tasks[uuid]
+            raise
         self.messages_sent += 1
-        self.calculate_managed_tasks()
+        self.delivered_at.append(time.time())
 
     def quit(self):
         '''
@@ -112,19 +128,17 @@ class PoolWorker(object):
         return str(self.process.exitcode)
 
     def calculate_managed_tasks(self):
-        # look to see if any tasks were finished
-        finished = []
-        for _ in range(self.finished.qsize()):
-            try:
-                finished.append(self.finished.get(block=False))
-            except QueueEmpty:
-                break  # qsize is not always _totally_ up to date
-
-        # if any tasks were finished, removed them from the managed tasks for
-        # this worker
-        for uuid in finished:
-            self.messages_finished += 1
-            del self.managed_tasks[uuid]
+        # look to see if any tasks were finished; messages are handled in the
+        # order they were delivered, so the oldest managed tasks are the ones
+        # that have finished
+        finished = self.finished.value - self.messages_finished
+        if finished <= 0:
+            return
+        for _ in range(min(finished, len(self.managed_tasks))):
+            self.managed_tasks.popitem(last=False)
+        for _ in range(min(finished, len(self.delivered_at))):
+            self.delivered_at.popleft()
+        self.messages_finished += finished
 
     @property
     def current_task(self):
@@ -163,9 +177,29 @@ class PoolWorker(object):
         return orphaned
 
     @property
-    def busy(self):
+    def depth(self):
+        '''
+        The number of messages delivered to this worker that it has not
+        finished yet (including the one it's running right now)
+        '''
+        return self.messages_sent - self.finished.value
+
+    @property
+    def lag(self):
+        '''
+        The number of seconds the oldest unfinished message has been waiting
+        on this worker
+        '''
         self.calculate_managed_tasks()
-        return len(self.managed_tasks) > 0
+        if self.delivered_at:
+            return time.time() - self.delivered_at[0]
+        return 0.0
+
+    @property
+    def busy(self):
+        # compare counters rather than calculate_managed_tasks() so that the
+        # pool can cheaply check every worker for every inbound message
+        return self.finished.value < self.messages_sent
 
     @property
     def idle(self):
@@ -201,6 +235,9 @@ class WorkerPool(object):
         self.min_workers = min_workers or settings.JOB_EVENT_WORKERS
         self.queue_size = queue_size or settings.JOB_EVENT_MAX_QUEUE_SIZE
         self.workers = []
+        # autoscaling events, reported by awx.main.dispatch.metrics
+        self.scaled_up = 0
+        self.scaled_down = 0
 
     def __len__(self):
         return len(self.workers)
@@ -237,6 +274,7 @@ class WorkerPool(object):
             ' sent={{ w.messages_sent }}'
             ' finished={{ w.messages_finished }}'
             ' qsize={{ w.managed_tasks|length }}'
+            ' lag={{ "%.3f"|format(w.lag) }}s'
             ' rss={{ w.mb }}MB'
             '{% for task in w.managed_tasks.values() %}'
             '\n     - {% if loop.index0 == 0 %}running {% else %}queued {% endif %}'
@@ -255,6 +293,9 @@ class WorkerPool(object):
         )
         return tmpl.render(pool=self, workers=self.workers, meta=self.debug_meta)
 
+    def cleanup(self):
+        pass
+
     def write(self, preferred_queue, body):
         queue_order = sorted(range(len(self.workers)), key=lambda x: -1 if x==preferred_queue else x)
         write_attempt_order = []
@@ -280,6 +321,89 @@ class WorkerPool(object):
             logger.exception('could not kill {}'.format(worker.pid))
 
 
+class AffinityPool(WorkerPool):
+    '''
+    A pool that sends every message with the same affinity key (e.g., all of
+    the events for a single job) to the same worker, so that they're handled
+    in the order they were received.
+
+    New keys are assigned to the least-loaded worker.  If a key's worker falls
+    behind the least-loaded worker by more than `rebalance_threshold`
+    messages, the key (and all of its subsequent messages) is moved to the
+    least-loaded worker; to keep its messages in order, this only happens
+    once its worker has finished every message it was sent for that key.
+
+    pool = AffinityPool(affinity_key=lambda body: body.get('job_id'))
+    '''
+
+    # the number of affinity keys to remember; least-recently used keys are
+    # forgotten first (unless they have messages in flight), and are assigned
+    # to a new worker if they're seen again
+    max_assignments = 1024
+
+    def __init__(self, *args, **kwargs):
+        self.affinity_key = kwargs.pop('affinity_key')
+        self.rebalance_threshold = kwargs.pop('rebalance_threshold', None)
+        super(AffinityPool, self).__init__(*args, **kwargs)
+        if self.rebalance_threshold is None:
+            self.rebalance_threshold = settings.JOB_EVENT_REBALANCE_THRESHOLD
+        # key -> (worker index, the worker's messages_sent after the key's
+        # most recent message)
+        self.assignments = collections.OrderedDict()
+        self.rebalanced = 0
+
+    @property
+    def debug_meta(self):
+        return 'keys={} rebalanced={} threshold={}'.format(
+            len(self.assignments), self.rebalanced, self.rebalance_threshold
+        )
+
+    def least_loaded(self):
+        return min(range(len(self.workers)), key=lambda i: self.workers[i].depth)
+
+    def in_flight(self, key):
+        '''
+        Whether the worker assigned to a key still has messages for it that
+        it hasn't finished (workers handle their messages in order)
+        '''
+        idx, sent = self.assignments[key]
+        return idx < len(self.workers) and self.workers[idx].finished.value < sent
+
+    def write(self, preferred_queue, body):
+        key = self.affinity_key(body) if len(self.workers) else None
+        if key is None:
+            return super(AffinityPool, self).write(preferred_queue, body)
+
+        idx = self.assignments[key][0] if key in self.assignments else None
+        if idx is None or idx >= len(self.workers):
+            idx = self.least_loaded()
+        elif not self.in_flight(key):
+            least_loaded = self.least_loaded()
+            skew = self.workers[idx].depth - self.workers[least_loaded].depth
+            if skew > self.rebalance_threshold:
+                logger.info('moving {} from worker[{}] to worker[{}], {} messages behind'.format(
+                    key, self.workers[idx].pid, self.workers[least_loaded].pid, skew
+                ))
+                self.rebalanced += 1
+                idx = least_loaded
+
+        queue_actual = super(AffinityPool, self).write(idx, body)
+        if queue_actual is not None:
+            self.assignments[key] = (queue_actual, self.workers[queue_actual].messages_sent)
+            self.assignments.move_to_end(key)
+            if len(self.assignments) > self.max_assignments:
+                self.forget()
+        return queue_actual
+
+    def forget(self):
+        # drop the least-recently used keys which have nothing in flight
+        for key in list(self.assignments):
+            if len(self.assignments) <= self.max_assignments:
+                break
+            if not self.in_flight(key):
+                del self.assignments[key]
+
+
 class AutoscalePool(WorkerPool):
     '''
     An extended pool implementation that automatically scales workers up and
@@ -360,6 +484,7 @@ class AutoscalePool(WorkerPool):
                 logger.warn('scaling down worker pid:{}'.format(w.pid))
                 w.quit()
                 self.workers.remove(w)
+                self.scaled_down += 1
 
         for m in orphaned:
             # if all the workers are dead, spawn at least one
@@ -383,6 +508,8 @@ class AutoscalePool(WorkerPool):
             idx = random.choice(range(len(self.workers)))
             return idx, self.workers[idx]
         else:
+            if len(self.workers) >= self.min_workers:
+                self.scaled_up += 1
             return super(AutoscalePool, self).up()
 
     def write(self, preferred_queue, body):
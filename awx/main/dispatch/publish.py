@@ -1,20 +1,97 @@
 import inspect
 import logging
+import os
 import sys
+import threading
 from uuid import uuid4
 
 from django.conf import settings
 from kombu import Exchange, Producer
+from kombu.utils.json import dumps
 
 from awx.main.dispatch.kombu import Connection
 
 logger = logging.getLogger('awx.main.dispatch')
 
+# Task payloads smaller than this (in bytes) are published uncompressed;
+# compressing a few hundred bytes of JSON costs more than it saves.
+COMPRESSION_THRESHOLD = 1024
+
 
 def serialize_task(f):
     return '.'.join([f.__module__, f.__name__])
 
 
+class Publisher(object):
+    '''
+    Publishes task messages over a broker connection that is kept open for
+    the life of the process (rather than one connection per message).
+
+    After a fork, the child opens its own connection; the parent's socket is
+    never used (or closed) by the child.
+    '''
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.pid = None
+        self.connection = None
+        self.producer = None
+        self.exchanges = {}
+
+    def reset(self):
+        if self.connection is not None and self.pid == os.getpid():
+            try:
+                self.connection.release()
+            except Exception:
+                logger.debug('could not close broker connection', exc_info=True)
+        self.connection = None
+        self.producer = None
+        self.exchanges = {}
+
+    def get_producer(self):
+        if self.pid != os.getpid():
+            # this is a forked child (or nothing has been published yet);
+            # drop any connection inherited from the parent without closing it
+            self.connection = None
+            self.exchanges = {}
+        if self.connection is None:
+            self.pid = os.getpid()
+            self.connection = Connection(settings.BROKER_URL)
+            self.producer = Producer(self.connection)
+        return self.producer
+
+    def get_exchange(self, name, exchange_type):
+        key = (name, exchange_type)
+        if key not in self.exchanges:
+            # kombu only declares an exchange once per connection
+            self.exchanges[key] = Exchange(name, type=exchange_type)
+        return self.exchanges[key]
+
+    def publish(self, obj, queue, exchange_type='direct'):
+        body = dumps(obj)
+        compression = 'zlib' if len(body) >= COMPRESSION_THRESHOLD else None
+        with self.lock:
+            producer = self.get_producer()
+            exchange = self.get_exchange(queue, exchange_type)
+            try:
+                producer.publish(body,
+                                 content_type='application/json',
+                                 content_encoding='utf-8',
+                                 compression=compression,
+                                 exchange=exchange,
+                                 declare=[exchange],
+                                 delivery_mode="persistent",
+                                 routing_key=queue,
+                                 retry=True,
+                                 retry_policy={'max_retries': 3})
+            except Exception:
+                self.reset()
+                raise
+
+
+publisher = Publisher()
+
+
 class task:
     """
     Used to decorate a function or class so that it can be run asynchronously
@@ -86,21 +163,12 @@ class task:
                 if callable(queue):
                     queue = queue()
                 if not settings.IS_TESTING(sys.argv):
-                    with Connection(settings.BROKER_URL) as conn:
-                        exchange = Exchange(queue, type=exchange_type or 'direct')
-                        producer = Producer(conn)
-                        logger.debug('publish {}({}, queue={})'.format(
-                            cls.name,
-                            task_id,
-                            queue
-                        ))
-                        producer.publish(obj,
-                                         serializer='json',
-                                         compression='bzip2',
-                                         exchange=exchange,
-                                         declare=[exchange],
-                                         delivery_mode="persistent",
-                                         routing_key=queue)
+                    logger.debug('publish {}({}, queue={})'.format(
+                        cls.name,
+                        task_id,
+                        queue
+                    ))
+                    publisher.publish(obj, queue, exchange_type=exchange_type or 'direct')
                 return (obj, queue)
 
         # If the object we're wrapping *is* a class (e.g., RunJob), return
@@ -1,7 +1,9 @@
 from datetime import timedelta
 import logging
 
-from django.db.models import Q
+from django.db import transaction
+from django.db.models import Q, TextField, Value
+from django.db.models.functions import Coalesce, Concat
 from django.utils.timezone import now as tz_now
 from django.contrib.contenttypes.models import ContentType
 
@@ -9,6 +11,14 @@ from awx.main.models import Instance, UnifiedJob, WorkflowJob
 
 logger = logging.getLogger('awx.main.dispatch')
 
+# the number of reaped jobs handled by each handle_reaped_jobs task
+REAP_BATCH_SIZE = 100
+
+REAP_EXPLANATION = ' '.join((
+    'Task was marked as running in Tower but was not present in',
+    'the job queue, so it has been marked as failed.',
+))
+
 
 def reap_job(j, status):
     if UnifiedJob.objects.get(id=j.id).status not in ('running', 'waiting'):
@@ -16,10 +26,7 @@ def reap_job(j, status):
         return
     j.status = status
     j.start_args = ''  # blank field to remove encrypted passwords
-    j.job_explanation += ' '.join((
-        'Task was marked as running in Tower but was not present in',
-        'the job queue, so it has been marked as failed.',
-    ))
+    j.job_explanation += REAP_EXPLANATION
     j.save(update_fields=['status', 'start_args', 'job_explanation'])
     if hasattr(j, 'send_notification_templates'):
         j.send_notification_templates('failed')
@@ -29,10 +36,32 @@ def reap_job(j, status):
     )
 
 
+def finish_reaped_job(j, status):
+    '''
+    Do what UnifiedJob.save() and reap_job() would have done for a job that
+    was marked as `status` by reap().
+    '''
+    if j.started and j.finished and not j.elapsed:
+        j.elapsed = round((j.finished - j.started).total_seconds(), 3)
+        UnifiedJob.objects.filter(pk=j.pk).update(elapsed=j.elapsed)
+    j._update_parent_instance()
+    if hasattr(j, 'send_notification_templates'):
+        j.send_notification_templates('failed')
+    j.websocket_emit_status(status)
+    logger.error(
+        '{} is no longer running; reaping'.format(j.log_format)
+    )
+
+
 def reap(instance=None, status='failed', excluded_uuids=[]):
     '''
     Reap all jobs in waiting|running for this instance.
+
+    The jobs are marked as `status` with a single UPDATE; notifications and
+    status updates are sent by handle_reaped_jobs tasks, for REAP_BATCH_SIZE
+    jobs at a time.
     '''
+    from awx.main.tasks import handle_reaped_jobs
     me = instance
     if me is None:
         (changed, me) = Instance.objects.get_or_register()
@@ -40,14 +69,36 @@ def reap(instance=None, status='failed', excluded_uuids=[]):
             logger.info("Registered tower node '{}'".format(me.hostname))
     now = tz_now()
     workflow_ctype_id = ContentType.objects.get_for_model(WorkflowJob).id
-    jobs = UnifiedJob.objects.filter(
-        (
-            Q(status='running') |
-            Q(status='waiting', modified__lte=now - timedelta(seconds=60))
-        ) & (
-            Q(execution_node=me.hostname) |
-            Q(controller_node=me.hostname)
-        ) & ~Q(polymorphic_ctype_id=workflow_ctype_id)
-    ).exclude(celery_task_id__in=excluded_uuids)
-    for j in jobs:
-        reap_job(j, status)
+    excluded_uuids = set(excluded_uuids)
+    active = (
+        Q(status='running') |
+        Q(status='waiting', modified__lte=now - timedelta(seconds=60))
+    ) & (
+        Q(execution_node=me.hostname) |
+        Q(controller_node=me.hostname)
+    ) & ~Q(polymorphic_ctype_id=workflow_ctype_id)
+    # find the orphaned jobs without locking anything, so that healthy jobs
+    # (which are often being updated by their workers) are never row-locked
+    orphaned = [
+        pk for pk, celery_task_id in UnifiedJob.objects.filter(active).values_list('pk', 'celery_task_id')
+        if celery_task_id not in excluded_uuids
+    ]
+    if not orphaned:
+        return
+    with transaction.atomic():
+        # lock the orphaned jobs, skipping any which have moved on since
+        job_ids = list(UnifiedJob.objects.filter(active, pk__in=orphaned).select_for_update().values_list('pk', flat=True))
+        if not job_ids:
+            return
+        UnifiedJob.objects.filter(pk__in=job_ids).update(
+            status=status,
+            failed=status in ('failed', 'error', 'canceled'),
+            start_args='',  # blank field to remove encrypted passwords
+            job_explanation=Concat('job_explanation', Value(REAP_EXPLANATION), output_field=TextField()),
+            finished=Coalesce('finished', Value(now)),
+            modified=now,
+        )
+
+    logger.error('Reaping {} jobs on {} that are no longer running'.format(len(job_ids), me.hostname))
+    for offset in range(0, len(job_ids), REAP_BATCH_SIZE):
+        handle_reaped_jobs.delay(job_ids[offset:(offset + REAP_BATCH_SIZE)], status)
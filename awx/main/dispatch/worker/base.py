@@ -12,6 +12,7 @@ from django import db
 from kombu import Producer
 from kombu.mixins import ConsumerMixin
 
+from awx.main.dispatch.metrics import report_pool, worker_metrics
 from awx.main.dispatch.pool import WorkerPool
 
 if 'run_callback_receiver' in sys.argv:
@@ -39,12 +40,21 @@ class WorkerSignalHandler:
 
 class AWXConsumer(ConsumerMixin):
 
-    def __init__(self, name, connection, worker, queues=[], pool=None):
+    def __init__(self, name, connection, worker, queues=[], pool=None, prefetch_count=None):
+        '''
+        :param prefetch_count: if set, the number of unacknowledged messages
+                               the broker will deliver at once; received
+                               messages are then acknowledged in bulk
+        '''
+        self.name = name
         self.connection = connection
         self.total_messages = 0
         self.queues = queues
         self.worker = worker
         self.pool = pool
+        self.prefetch_count = prefetch_count
+        self.unacked = None
+        self.unacked_count = 0
         if pool is None:
             self.pool = WorkerPool()
         self.pool.init_workers(self.worker.work_loop)
@@ -52,8 +62,14 @@ class AWXConsumer(ConsumerMixin):
     def get_consumers(self, Consumer, channel):
         logger.debug(self.listening_on)
         return [Consumer(queues=self.queues, accept=['json'],
+                         prefetch_count=self.prefetch_count,
                          callbacks=[self.process_task])]
 
+    def on_consume_ready(self, connection, channel, consumers, **kwargs):
+        # deliveries from a previous channel can't be acknowledged on this one
+        self.unacked = None
+        self.unacked_count = 0
+
     @property
     def listening_on(self):
         return 'listening on {}'.format([
@@ -90,6 +106,15 @@ class AWXConsumer(ConsumerMixin):
             except Exception:
                 logger.exception("Exception handling control message:")
                 return
+        if isinstance(body, list):
+            # a batch of job events published by CallbackQueueDispatcher
+            for item in body:
+                self.write(item)
+        else:
+            self.write(body)
+        self.ack(message)
+
+    def write(self, body):
         if len(self.pool):
             if "uuid" in body and body['uuid']:
                 try:
@@ -102,7 +127,31 @@ class AWXConsumer(ConsumerMixin):
             queue = 0
         self.pool.write(queue, body)
         self.total_messages += 1
-        message.ack()
+
+    def ack(self, message):
+        if not self.prefetch_count:
+            message.ack()
+            return
+        # acknowledge every message received so far at once, either when half
+        # of the prefetch window is used up, or on the next loop iteration
+        self.unacked = message
+        self.unacked_count += 1
+        if self.unacked_count >= max(self.prefetch_count // 2, 1):
+            self.flush_acks()
+
+    def flush_acks(self):
+        if self.unacked is None:
+            return
+        message, self.unacked = self.unacked, None
+        self.unacked_count = 0
+        try:
+            message.ack(multiple=True)
+        except Exception:
+            logger.exception('failed to acknowledge messages')
+
+    def on_iteration(self):
+        self.flush_acks()
+        report_pool(self.name, self.pool)
 
     def run(self, *args, **kwargs):
         signal.signal(signal.SIGINT, self.stop)
@@ -132,6 +181,7 @@ class BaseWorker(object):
                 if body == 'QUIT':
                     break
             except QueueEmpty:
+                worker_metrics.flush()
                 continue
             except Exception as e:
                 logger.error("Exception on worker {}, restarting: ".format(idx) + str(e))
@@ -143,10 +193,12 @@ class BaseWorker(object):
                     conn.close_if_unusable_or_obsolete()
                 self.perform_work(body, *args)
             finally:
-                if 'uuid' in body:
-                    uuid = body['uuid']
-                    logger.debug('task {} is finished'.format(uuid))
-                    finished.put(uuid)
+                if isinstance(body, dict) and 'uuid' in body:
+                    logger.debug('task {} is finished'.format(body['uuid']))
+                # this process is the only writer of its finished counter
+                finished.value += 1
+                worker_metrics.flush()
+        worker_metrics.flush(force=True)
         logger.warn('worker exiting gracefully pid:{}'.format(os.getpid()))
 
     def perform_work(self, body):
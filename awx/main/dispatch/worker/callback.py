@@ -5,8 +5,10 @@ import traceback
 from django.conf import settings
 from django.db import DatabaseError, OperationalError, connection as django_connection
 from django.db.utils import InterfaceError, InternalError
+from django.utils.timezone import now
 
 from awx.main.consumers import emit_channel_notification
+from awx.main.dispatch.metrics import worker_metrics
 from awx.main.models import (JobEvent, AdHocCommandEvent, ProjectUpdateEvent,
                              InventoryUpdateEvent, SystemJobEvent, UnifiedJob)
 
@@ -26,6 +28,31 @@ class CallbackBrokerWorker(BaseWorker):
 
     MAX_RETRIES = 2
 
+    JOB_IDENTIFIERS = (
+        'job_id', 'ad_hoc_command_id', 'project_update_id',
+        'inventory_update_id', 'system_job_id',
+    )
+
+    @classmethod
+    def job_identifier(cls, body):
+        '''
+        Returns a (key, id) tuple for the job that an event belongs to, e.g.,
+        ('job_id', 123), or None if the event has no job identifier
+        '''
+        if isinstance(body, dict):
+            for key in cls.JOB_IDENTIFIERS:
+                if key in body:
+                    return (key, body[key])
+        return None
+
+    def record_event_saved(self, body, event, duration):
+        worker_metrics.inc('events_saved', event=body.get('event') or 'unknown')
+        worker_metrics.observe('event_save_seconds', duration)
+        created = getattr(event, 'created', None)
+        if created:
+            # time from the event being emitted by the playbook to it being persisted
+            worker_metrics.observe('event_lag_seconds', max((now() - created).total_seconds(), 0))
+
     def perform_work(self, body):
         try:
             event_map = {
@@ -42,7 +69,7 @@ class CallbackBrokerWorker(BaseWorker):
             def _save_event_data():
                 for key, cls in event_map.items():
                     if key in body:
-                        cls.create_from_data(**body)
+                        return cls.create_from_data(**body)
 
             job_identifier = 'unknown job'
             job_key = 'unknown'
@@ -104,7 +131,9 @@ class CallbackBrokerWorker(BaseWorker):
             retries = 0
             while retries <= self.MAX_RETRIES:
                 try:
-                    _save_event_data()
+                    start = time.time()
+                    event = _save_event_data()
+                    self.record_event_saved(body, event, time.time() - start)
                     break
                 except (OperationalError, InterfaceError, InternalError):
                     if retries >= self.MAX_RETRIES:
@@ -2,10 +2,12 @@ import inspect
 import logging
 import importlib
 import sys
+import time
 import traceback
 
 
 from awx.main.tasks import dispatch_startup, inform_cluster_of_shutdown
+from awx.main.dispatch.metrics import worker_metrics
 
 from .base import BaseWorker
 
@@ -58,7 +60,11 @@ class TaskWorker(BaseWorker):
             _call = _call().run
         # don't print kwargs, they often contain launch-time secrets
         logger.debug('task {} starting {}(*{})'.format(uuid, task, args))
-        return _call(*args, **kwargs)
+        start = time.time()
+        try:
+            return _call(*args, **kwargs)
+        finally:
+            worker_metrics.observe('task_duration_seconds', time.time() - start, task=task)
 
     def perform_work(self, body):
         '''
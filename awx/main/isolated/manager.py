@@ -130,7 +130,8 @@ class IsolatedManager(object):
         '''
         Ship the runner payload to a remote host for isolated execution.
         '''
-        self.handled_events = set()
+        self.handled_events = 0
+        self.events_offset = 0
         self.started_at = time.time()
 
         # exclude certain files from the rsync
@@ -190,7 +191,7 @@ class IsolatedManager(object):
         :param interval: an interval (in seconds) to wait between status polls
         """
         interval = interval if interval is not None else settings.AWX_ISOLATED_CHECK_INTERVAL
-        extravars = {'src': self.private_data_dir}
+        extravars = {'src': self.private_data_dir, 'ident': self.ident}
         status = 'failed'
         rc = None
         last_check = time.time()
@@ -257,7 +258,7 @@ class IsolatedManager(object):
         # emit an EOF event
         event_data = {
             'event': 'EOF',
-            'final_counter': len(self.handled_events)
+            'final_counter': self.handled_events
         }
         event_data.setdefault(self.event_data_key, self.instance.id)
         dispatcher.dispatch(event_data)
@@ -265,39 +266,39 @@ class IsolatedManager(object):
         return status, rc
 
     def consume_events(self, dispatcher):
-        # discover new events and ingest them
-        events_path = self.path_to('artifacts', self.ident, 'job_events')
+        # `check_isolated.yml` appends new events on the isolated host to a
+        # single log (one JSON document per line) and only syncs back the
+        # bytes added since the previous check; pick up where we left off
+        events_path = self.path_to('job_events.log')
 
-        # it's possible that `events_path` doesn't exist *yet*, because runner
-        # hasn't actually written any events yet (if you ran e.g., a sleep 30)
-        # only attempt to consume events if any were rsynced back
+        # it's possible that `events_path` doesn't exist *yet*, because the
+        # first check hasn't completed
         if os.path.exists(events_path):
-            for event in set(os.listdir(events_path)) - self.handled_events:
-                path = os.path.join(events_path, event)
-                if os.path.exists(path):
+            with open(events_path, 'rb') as f:
+                f.seek(self.events_offset)
+                for line in iter(f.readline, b''):
+                    if not line.endswith(b'\n'):
+                        # partially synced, read it again on the next check
+                        break
+                    self.events_offset += len(line)
                     try:
-                        event_data = json.load(
-                            open(os.path.join(events_path, event), 'r')
-                        )
-                    except json.decoder.JSONDecodeError:
-                        # This means the event we got back isn't valid JSON
-                        # that can happen if runner is still partially
-                        # writing an event file while it's rsyncing
-                        # these event writes are _supposed_ to be atomic
-                        # but it doesn't look like they actually are in
-                        # practice
-                        # in this scenario, just ignore this event and try it
-                        # again on the next sync
-                        pass
+                        event_data = json.loads(line.decode('utf-8'))
+                    except ValueError:
+                        logger.exception('Skipping malformed event for isolated job {}.'.format(self.instance.id))
+                        continue
                     event_data.setdefault(self.event_data_key, self.instance.id)
                     dispatcher.dispatch(event_data)
-                    self.handled_events.add(event)
+                    self.handled_events += 1
 
                     # handle artifacts
                     if event_data.get('event_data', {}).get('artifact_data', {}):
                         self.instance.artifacts = event_data['event_data']['artifact_data']
                         self.instance.save(update_fields=['artifacts'])
 
+        # publish whatever is left of the last batch; the next sync is
+        # `AWX_ISOLATED_CHECK_INTERVAL` seconds away
+        dispatcher.flush()
+
 
     def cleanup(self):
         extravars = {
@@ -6,6 +6,7 @@ from django.core.management.base import BaseCommand
 from kombu import Exchange, Queue
 
 from awx.main.dispatch.kombu import Connection
+from awx.main.dispatch.pool import AffinityPool
 from awx.main.dispatch.worker import AWXConsumer, CallbackBrokerWorker
 
 
@@ -31,7 +32,9 @@ class Command(BaseCommand):
                             Exchange(settings.CALLBACK_QUEUE, type='direct'),
                             routing_key=settings.CALLBACK_QUEUE
                         )
-                    ]
+                    ],
+                    pool=AffinityPool(affinity_key=CallbackBrokerWorker.job_identifier),
+                    prefetch_count=settings.CALLBACK_PREFETCH_COUNT
                 )
                 consumer.run()
             except KeyboardInterrupt:
@@ -144,6 +144,21 @@ class InstanceManager(models.Manager):
     def all_non_isolated(self):
         return self.exclude(rampart_groups__controller__isnull=False)
 
+    def capacity_usage(self):
+        """Return consumed capacity and running job counts for every node
+        with active jobs, keyed by hostname, using a single aggregate query.
+        """
+        from awx.main.models.unified_jobs import UnifiedJob
+        usage = UnifiedJob.objects.filter(
+            status__in=('running', 'waiting')
+        ).exclude(execution_node='').order_by().values('execution_node').annotate(
+            consumed_capacity=models.Sum('task_impact'),
+            jobs_running=models.Count('id'))
+        return dict(
+            (row['execution_node'], (row['consumed_capacity'] or 0, row['jobs_running']))
+            for row in usage
+        )
+
 
 class InstanceGroupManager(models.Manager):
     """A custom manager class for the Instance model.
@@ -3,6 +3,7 @@
 
 import uuid
 import logging
+import random
 import threading
 import time
 import cProfile
@@ -24,6 +25,7 @@ from django.urls import reverse, resolve
 
 from awx.main.models import ActivityStream
 from awx.main.utils.named_url_graph import generate_graph, GraphNode
+from awx.main.utils.request_metrics import QueryRecorder, record_request
 from awx.conf import fields, register
 
 
@@ -33,12 +35,27 @@ perf_logger = logging.getLogger('awx.analytics.performance')
 
 
 class TimingMiddleware(threading.local, MiddlewareMixin):
+    """
+    Adds the total time, and the number and total time of the database
+    queries, of each request to its response headers and to the per-view
+    request metrics.
+
+    The statements run by a random `AWX_REQUEST_PROFILE_SAMPLE_RATE` fraction
+    of requests (or by every request, if `AWX_REQUEST_PROFILE` is set) are
+    also recorded, so that repeated (N+1) queries show up in the request
+    metrics.  Only `AWX_REQUEST_PROFILE` profiles requests with cProfile and
+    saves the profiles to disk.
+    """
 
     dest = '/var/log/tower/profile'
 
     def process_request(self, request):
         self.start_time = time.time()
-        if settings.AWX_REQUEST_PROFILE:
+        self.profiled = settings.AWX_REQUEST_PROFILE
+        sampled = self.profiled or random.random() < settings.AWX_REQUEST_PROFILE_SAMPLE_RATE
+        self.queries = QueryRecorder(statements=sampled)
+        connection.execute_wrappers.append(self.queries)
+        if self.profiled:
             self.prof = cProfile.Profile()
             self.prof.enable()
 
@@ -46,11 +63,18 @@ class TimingMiddleware(threading.local, MiddlewareMixin):
         if not hasattr(self, 'start_time'):  # some tools may not invoke process_request
             return response
         total_time = time.time() - self.start_time
+        if self.queries in connection.execute_wrappers:
+            connection.execute_wrappers.remove(self.queries)
         response['X-API-Total-Time'] = '%0.3fs' % total_time
-        if settings.AWX_REQUEST_PROFILE:
+        response['X-API-Query-Count'] = self.queries.count
+        response['X-API-Query-Time'] = '%0.3fs' % self.queries.seconds
+        if self.profiled:
             self.prof.disable()
             cprofile_file = self.save_profile_file(request)
             response['cprofile_file'] = cprofile_file
+        resolver_match = getattr(request, 'resolver_match', None)
+        if resolver_match:
+            record_request(resolver_match.view_name, total_time, self.queries)
         perf_logger.info('api response times', extra=dict(python_objects=dict(request=request, response=response)))
         return response
 
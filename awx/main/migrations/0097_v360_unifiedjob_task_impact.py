@@ -0,0 +1,21 @@
+# Generated by Django 2.2.4 on 2019-10-02 14:12
+
+from django.db import migrations, models
+
+from awx.main.migrations._task_impact import record_active_task_impact
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0096_v360_container_groups'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='unifiedjob',
+            name='task_impact',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Capacity units consumed by this job, computed when it is launched.'),
+        ),
+        migrations.RunPython(record_active_task_impact, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 2.2.4 on 2019-10-08 18:25
+
+import awx.main.fields
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0097_v360_unifiedjob_task_impact'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='toweranalyticsstate',
+            name='table_watermarks',
+            field=awx.main.fields.JSONField(blank=True, default=dict),
+        ),
+    ]
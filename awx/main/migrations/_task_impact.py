@@ -0,0 +1,35 @@
+ACTIVE_STATES = ('pending', 'waiting', 'running')
+
+
+def record_active_task_impact(apps, schema_editor):
+    '''
+    Jobs launched before task_impact was stored have none; this mirrors the
+    _get_task_impact() of each model, using only historical fields.  Workflow
+    jobs and approvals (and project updates which run a playbook) keep the
+    default of 0.
+    '''
+    Host = apps.get_model('main', 'Host')
+
+    def count_hosts(inventory_id, **kwargs):
+        return Host.objects.filter(inventory_id=inventory_id, **kwargs).count()
+
+    def forks_impact(hosts, forks):
+        return min(hosts, 5 if forks == 0 else forks) + 1
+
+    for job in apps.get_model('main', 'Job').objects.filter(status__in=ACTIVE_STATES):
+        if job.launch_type == 'callback':
+            hosts = 2
+        else:
+            hosts = count_hosts(job.inventory_id)
+            if job.job_slice_count > 1:
+                hosts = (hosts + job.job_slice_count - job.job_slice_number) // job.job_slice_count
+        job.task_impact = forks_impact(hosts, job.forks)
+        job.save(update_fields=['task_impact'])
+
+    for command in apps.get_model('main', 'AdHocCommand').objects.filter(status__in=ACTIVE_STATES):
+        command.task_impact = forks_impact(count_hosts(command.inventory_id, enabled=True), command.forks)
+        command.save(update_fields=['task_impact'])
+
+    apps.get_model('main', 'InventoryUpdate').objects.filter(status__in=ACTIVE_STATES).update(task_impact=1)
+    apps.get_model('main', 'ProjectUpdate').objects.filter(status__in=ACTIVE_STATES).exclude(job_type='run').update(task_impact=1)
+    apps.get_model('main', 'SystemJob').objects.filter(status__in=ACTIVE_STATES).update(task_impact=5)
@@ -188,11 +188,10 @@ class AdHocCommand(UnifiedJob, JobNotificationMixin):
     def get_passwords_needed_to_start(self):
         return self.passwords_needed_to_start
 
-    @property
-    def task_impact(self):
+    def _get_task_impact(self):
         # NOTE: We sorta have to assume the host count matches and that forks default to 5
         from awx.main.models.inventory import Host
-        count_hosts = Host.objects.filter( enabled=True, inventory__ad_hoc_commands__pk=self.pk).count()
+        count_hosts = Host.objects.filter(enabled=True, inventory_id=self.inventory_id).count()
         return min(count_hosts, 5 if self.forks == 0 else self.forks) + 1
 
     def copy(self):
@@ -27,6 +27,7 @@ from awx.main.fields import (ImplicitRoleField, CredentialInputField,
                              CredentialTypeInjectorField,
                              DynamicCredentialInputField,)
 from awx.main.utils import decrypt_field, classproperty
+from awx.main.utils.credential_lookups import get_external_secret
 from awx.main.utils.safe_yaml import safe_dump
 from awx.main.validators import validate_ssh_private_key
 from awx.main.models.base import (
@@ -1203,16 +1204,7 @@ class CredentialInputSource(PrimordialModel):
         return self.input_field_name
 
     def get_input_value(self):
-        backend = self.source_credential.credential_type.plugin.backend
-        backend_kwargs = {}
-        for field_name, value in self.source_credential.inputs.items():
-            if field_name in self.source_credential.credential_type.secret_fields:
-                backend_kwargs[field_name] = decrypt_field(self.source_credential, field_name)
-            else:
-                backend_kwargs[field_name] = value
-
-        backend_kwargs.update(self.metadata)
-        return backend(**backend_kwargs)
+        return get_external_secret(self.source_credential, self.metadata)
 
     def get_absolute_url(self, request=None):
         view_name = 'api:credential_input_source_detail'
@@ -14,6 +14,7 @@ from awx.api.versioning import reverse
 from awx.main.fields import JSONField
 from awx.main.models.base import CreatedModifiedModel
 from awx.main.utils import ignore_inventory_computed_fields
+from awx.main.utils.filters import external_logger_enabled
 
 analytics_logger = logging.getLogger('awx.analytics.job_events')
 
@@ -328,7 +329,8 @@ class BasePlaybookEvent(CreatedModifiedModel):
         job_event = cls.objects.create(**kwargs)
         if workflow_job_id:
             setattr(job_event, 'workflow_job_id', workflow_job_id)
-        analytics_logger.info('Event data saved.', extra=dict(python_objects=dict(job_event=job_event)))
+        if external_logger_enabled(analytics_logger.name):
+            analytics_logger.info('Event data saved.', extra=dict(python_objects=dict(job_event=job_event)))
         return job_event
 
     @property
@@ -621,7 +623,7 @@ class BaseCommandEvent(CreatedModifiedModel):
         sanitize_event_keys(kwargs, cls.VALID_KEYS)
         kwargs.pop('workflow_job_id', None)
         event = cls.objects.create(**kwargs)
-        if isinstance(event, AdHocCommandEvent):
+        if isinstance(event, AdHocCommandEvent) and external_logger_enabled(analytics_logger.name):
             analytics_logger.info(
                 'Event data saved.',
                 extra=dict(python_objects=dict(job_event=event))
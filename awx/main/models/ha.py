@@ -6,6 +6,7 @@ from decimal import Decimal
 
 from django.core.validators import MinValueValidator
 from django.db import models, connection
+from django.db.models import Sum
 from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
 from django.utils.translation import ugettext_lazy as _
@@ -102,10 +103,23 @@ class Instance(HasPolicyEditsMixin, BaseModel):
     def get_absolute_url(self, request=None):
         return reverse('api:instance_detail', kwargs={'pk': self.pk}, request=request)
 
+    # The task manager tracks the capacity consumed on each node in memory
+    # for a whole cycle, and assigns it to consumed_capacity and jobs_running;
+    # otherwise they are looked up whenever they are read.
+    _consumed_capacity = None
+    _jobs_running = None
+
     @property
     def consumed_capacity(self):
-        return sum(x.task_impact for x in UnifiedJob.objects.filter(execution_node=self.hostname,
-                                                                    status__in=('running', 'waiting')))
+        if self._consumed_capacity is not None:
+            return self._consumed_capacity
+        return UnifiedJob.objects.filter(execution_node=self.hostname,
+                                         status__in=('running', 'waiting')).aggregate(
+            consumed_capacity=Sum('task_impact'))['consumed_capacity'] or 0
+
+    @consumed_capacity.setter
+    def consumed_capacity(self, value):
+        self._consumed_capacity = value
 
     @property
     def remaining_capacity(self):
@@ -118,8 +132,14 @@ class Instance(HasPolicyEditsMixin, BaseModel):
 
     @property
     def jobs_running(self):
+        if self._jobs_running is not None:
+            return self._jobs_running
         return UnifiedJob.objects.filter(execution_node=self.hostname, status__in=('running', 'waiting',)).count()
 
+    @jobs_running.setter
+    def jobs_running(self, value):
+        self._jobs_running = value
+
     @property
     def jobs_total(self):
         return UnifiedJob.objects.filter(execution_node=self.hostname).count()
@@ -245,18 +265,25 @@ class InstanceGroup(HasPolicyEditsMixin, BaseModel, RelatedJobsMixin):
         app_label = 'main'
 
 
-    def fit_task_to_most_remaining_capacity_instance(self, task):
+    def schedulable_instances(self):
+        return self.instances.filter(capacity__gt=0, enabled=True).order_by('hostname')
+
+    def fit_task_to_most_remaining_capacity_instance(self, task, instances=None):
         instance_most_capacity = None
-        for i in self.instances.filter(capacity__gt=0, enabled=True).order_by('hostname'):
+        if instances is None:
+            instances = self.schedulable_instances()
+        for i in instances:
             if i.remaining_capacity >= task.task_impact and \
                     (instance_most_capacity is None or
                      i.remaining_capacity > instance_most_capacity.remaining_capacity):
                 instance_most_capacity = i
         return instance_most_capacity
 
-    def find_largest_idle_instance(self):
+    def find_largest_idle_instance(self, instances=None):
         largest_instance = None
-        for i in self.instances.filter(capacity__gt=0, enabled=True).order_by('hostname'):
+        if instances is None:
+            instances = self.schedulable_instances()
+        for i in instances:
             if i.jobs_running == 0:
                 if largest_instance is None:
                     largest_instance = i
@@ -277,6 +304,8 @@ class TowerScheduleState(SingletonModel):
 
 class TowerAnalyticsState(SingletonModel):
     last_run = models.DateTimeField(auto_now_add=True)
+    # highest row id shipped so far, per analytics table
+    table_watermarks = JSONField(blank=True, default=dict)
 
 
 def schedule_policy_task():
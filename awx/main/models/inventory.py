@@ -747,11 +747,23 @@ class Host(CommonModelNameNotUnique, RelatedJobsMixin):
             host_name = self.variables_dict['ansible_host']
         return host_name
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super(Host, cls).from_db(db, field_names, values)
+        # Remember the stored name, smart inventory membership depends on it
+        instance._saved_name = instance.__dict__.get('name')
+        return instance
+
     def _update_host_smart_inventory_memeberships(self):
         if settings.AWX_REBUILD_SMART_MEMBERSHIP:
+            host_id = self.pk
+            host_names = set([self.name, getattr(self, '_saved_name', None)]) - set([None])
+
             def on_commit():
                 from awx.main.tasks import update_host_smart_inventory_memberships
-                update_host_smart_inventory_memberships.delay()
+                update_host_smart_inventory_memberships.delay(
+                    host_ids=[host_id or self.pk], host_names=sorted(host_names)
+                )
             connection.on_commit(on_commit)
 
     def save(self, *args, **kwargs):
@@ -1754,8 +1766,7 @@ class InventoryUpdate(UnifiedJob, InventorySourceOptions, JobNotificationMixin,
     def event_class(self):
         return InventoryUpdateEvent
 
-    @property
-    def task_impact(self):
+    def _get_task_impact(self):
         return 1
 
     # InventoryUpdate credential required
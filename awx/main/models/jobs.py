@@ -328,11 +328,15 @@ class JobTemplate(UnifiedJobTemplate, JobOptions, SurveyJobTemplateMixin, Resour
             kwargs['_eager_fields'].setdefault('job_slice_count', 1)
         job = super(JobTemplate, self).create_unified_job(**kwargs)
         if slice_event:
-            for idx in range(slice_ct):
-                create_kwargs = dict(workflow_job=job,
-                                     unified_job_template=self,
-                                     ancestor_artifacts=dict(job_slice=idx + 1))
-                WorkflowJobNode.objects.create(**create_kwargs)
+            created = now()
+            WorkflowJobNode.objects.bulk_create([
+                WorkflowJobNode(workflow_job=job,
+                                unified_job_template=self,
+                                ancestor_artifacts=dict(job_slice=idx + 1),
+                                created=created,
+                                modified=created)
+                for idx in range(slice_ct)
+            ])
         return job
 
     def get_absolute_url(self, request=None):
@@ -627,14 +631,13 @@ class Job(UnifiedJob, JobOptions, SurveyJobMixin, JobNotificationMixin, TaskMana
             ).format(status_value=status))
         return self._get_hosts(**kwargs)
 
-    @property
-    def task_impact(self):
+    def _get_task_impact(self):
         # NOTE: We sorta have to assume the host count matches and that forks default to 5
         from awx.main.models.inventory import Host
         if self.launch_type == 'callback':
             count_hosts = 2
         else:
-            count_hosts = Host.objects.filter(inventory__jobs__pk=self.pk).count()
+            count_hosts = Host.objects.filter(inventory_id=self.inventory_id).count()
             if self.job_slice_count > 1:
                 # Integer division intentional
                 count_hosts = (count_hosts + self.job_slice_count - self.job_slice_number) // self.job_slice_count
@@ -1239,8 +1242,7 @@ class SystemJob(UnifiedJob, SystemJobOptions, JobNotificationMixin):
     def event_class(self):
         return SystemJobEvent
 
-    @property
-    def task_impact(self):
+    def _get_task_impact(self):
         return 5
 
     @property
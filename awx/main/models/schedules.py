@@ -2,6 +2,7 @@
 # All Rights Reserved.
 
 import datetime
+import functools
 import logging
 import re
 
@@ -34,6 +35,13 @@ __all__ = ['Schedule']
 UTC_TIMEZONES = {x: tzutc() for x in dateutil.parser.parserinfo().UTCZONE}
 
 
+@functools.lru_cache(maxsize=4096)
+def _compile_rrule(rrule):
+    # rrulesets are only iterated (never modified) once parsed, so the same
+    # compiled object is shared by every schedule with this rrule
+    return dateutil.rrule.rrulestr(rrule, tzinfos=UTC_TIMEZONES, forceset=True)
+
+
 class ScheduleFilterMethods(object):
 
     def enabled(self, enabled=True):
@@ -195,8 +203,11 @@ class Schedule(PrimordialModel, LaunchTimeConfig):
         Apply our own custom rrule parsing requirements
         """
         rrule = Schedule.coerce_naive_until(rrule)
-        kwargs['forceset'] = True
-        x = dateutil.rrule.rrulestr(rrule, tzinfos=UTC_TIMEZONES, **kwargs)
+        if kwargs:
+            kwargs['forceset'] = True
+            x = dateutil.rrule.rrulestr(rrule, tzinfos=UTC_TIMEZONES, **kwargs)
+        else:
+            x = _compile_rrule(rrule)
 
         for r in x._rrule:
             if r._dtstart and r._dtstart.tzinfo is None:
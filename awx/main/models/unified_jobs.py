@@ -596,6 +596,11 @@ class UnifiedJob(PolymorphicModel, PasswordFieldsModel, CommonModelNameNotUnique
         editable=False,
         help_text=_("The instance that managed the isolated execution environment."),
     )
+    task_impact = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        help_text=_("Capacity units consumed by this job, computed when it is launched."),
+    )
     notifications = models.ManyToManyField(
         'Notification',
         editable=False,
@@ -828,6 +833,14 @@ class UnifiedJob(PolymorphicModel, PasswordFieldsModel, CommonModelNameNotUnique
             if 'elapsed' not in update_fields:
                 update_fields.append('elapsed')
 
+        # Has the job just been launched? If so, record its task impact so
+        # capacity calculations do not have to recompute it on every read.
+        active_states = ('pending', 'waiting', 'running')
+        if self.status in active_states and (not self.pk or status_before not in active_states):
+            self.task_impact = self._get_task_impact()
+            if 'task_impact' not in update_fields:
+                update_fields.append('task_impact')
+
         # Ensure that the job template information is current.
         if self.unified_job_template != self._get_parent_instance():
             self.unified_job_template = self._get_parent_instance()
@@ -1179,8 +1192,7 @@ class UnifiedJob(PolymorphicModel, PasswordFieldsModel, CommonModelNameNotUnique
         except JobLaunchConfig.DoesNotExist:
             return False
 
-    @property
-    def task_impact(self):
+    def _get_task_impact(self):
         raise NotImplementedError # Implement in subclass.
 
     def websocket_emit_data(self):
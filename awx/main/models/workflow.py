@@ -11,6 +11,7 @@ from django.db import connection, models
 from django.conf import settings
 from django.utils.translation import ugettext_lazy as _
 from django.core.exceptions import ObjectDoesNotExist
+from django.utils.timezone import now
 #from django import settings as tower_settings
 
 # AWX
@@ -97,10 +98,7 @@ class WorkflowNodeBase(CreatedModifiedModel, LaunchTimeConfig):
                 'extra_data', 'survey_passwords',
                 'inventory', 'credentials', 'char_prompts']
 
-    def create_workflow_job_node(self, **kwargs):
-        '''
-        Create a new workflow job node based on this workflow node.
-        '''
+    def _get_workflow_job_node_kwargs(self, **kwargs):
         create_kwargs = {}
         for field_name in self._get_workflow_job_field_names():
             if field_name == 'credentials':
@@ -109,7 +107,13 @@ class WorkflowNodeBase(CreatedModifiedModel, LaunchTimeConfig):
                 create_kwargs[field_name] = kwargs[field_name]
             elif hasattr(self, field_name):
                 create_kwargs[field_name] = getattr(self, field_name)
-        new_node = WorkflowJobNode.objects.create(**create_kwargs)
+        return create_kwargs
+
+    def create_workflow_job_node(self, **kwargs):
+        '''
+        Create a new workflow job node based on this workflow node.
+        '''
+        new_node = WorkflowJobNode.objects.create(**self._get_workflow_job_node_kwargs(**kwargs))
         if self.pk:
             allowed_creds = self.credentials.all()
         else:
@@ -348,8 +352,47 @@ class WorkflowJobOptions(LaunchTimeConfigBase):
                     new_manager = getattr(new_node, relationship)
                     new_manager.add(new_child_node)
 
+    def _bulk_create_workflow_job_nodes(self, old_node_list):
+        '''
+        Create a job node for each node in old_node_list, and copy their
+        credentials and relationships, with one INSERT per table.
+        '''
+        if not connection.features.can_return_ids_from_bulk_insert:
+            # the new primary keys are needed to link the nodes
+            node_links = self._create_workflow_nodes(old_node_list)
+            self._inherit_node_relationships(old_node_list, node_links)
+            return
+        old_node_list = list(old_node_list)
+        created = now()
+        new_nodes = [
+            WorkflowJobNode(created=created, modified=created,
+                            **old_node._get_workflow_job_node_kwargs(workflow_job=self))
+            for old_node in old_node_list
+        ]
+        WorkflowJobNode.objects.bulk_create(new_nodes)
+        node_links = dict((old_node.pk, new_node) for old_node, new_node in zip(old_node_list, new_nodes))
+
+        for relationship in ['credentials', 'always_nodes', 'success_nodes', 'failure_nodes']:
+            field = WorkflowJobNode._meta.get_field(relationship)
+            through = field.remote_field.through
+            from_field = '{}_id'.format(field.m2m_field_name())
+            to_field = '{}_id'.format(field.m2m_reverse_field_name())
+            rows = []
+            for old_node in old_node_list:
+                for related in getattr(old_node, relationship).all():
+                    if relationship != 'credentials':
+                        related = node_links[related.pk]
+                    rows.append(through(**{from_field: node_links[old_node.pk].pk, to_field: related.pk}))
+            through.objects.bulk_create(rows)
+
     def copy_nodes_from_original(self, original=None, user=None):
-        old_node_list = original.workflow_nodes.prefetch_related('always_nodes', 'success_nodes', 'failure_nodes').all()
+        old_node_list = original.workflow_nodes.prefetch_related(
+            'always_nodes', 'success_nodes', 'failure_nodes', 'credentials'
+        ).all()
+        if user is None:
+            # new job nodes have no signal receivers, so they can be bulk created
+            self._bulk_create_workflow_job_nodes(old_node_list)
+            return
         node_links = self._create_workflow_nodes(old_node_list, user=user)
         self._inherit_node_relationships(old_node_list, node_links)
 
@@ -601,8 +644,7 @@ class WorkflowJob(UnifiedJob, WorkflowJobOptions, SurveyJobMixin, JobNotificatio
         result['body'] = '\n'.join(str_arr)
         return result
 
-    @property
-    def task_impact(self):
+    def _get_task_impact(self):
         return 0
 
     def get_ancestor_workflows(self):
@@ -709,6 +751,9 @@ class WorkflowApproval(UnifiedJob, JobNotificationMixin):
     def _get_parent_field_name(self):
         return 'workflow_approval_template'
 
+    def _get_task_impact(self):
+        return 0
+
     def approve(self, request=None):
         self.status = 'successful'
         self.save()
@@ -5,6 +5,8 @@
 import json
 import logging
 import os
+import time
+import urllib.parse
 
 # Django
 from django.conf import settings
@@ -37,18 +39,66 @@ registry.register(
 )
 
 
+def get_callback_compression(broker_url):
+    """
+    Compressing small event payloads costs more CPU than it saves on a local
+    connection; only compress when the broker is on another host.
+    """
+    hostname = urllib.parse.urlparse(broker_url).hostname
+    if hostname in (None, 'localhost', '127.0.0.1', '::1'):
+        return None
+    return 'zlib'
+
+
 class CallbackQueueDispatcher(object):
 
-    def __init__(self):
+    def __init__(self, batch_size=None, batch_interval=None):
         self.callback_connection = getattr(settings, 'BROKER_URL', None)
         self.connection_queue = getattr(settings, 'CALLBACK_QUEUE', '')
         self.connection = None
         self.exchange = None
+        self.producer = None
+        self.compression = get_callback_compression(self.callback_connection or '')
+        self.batch_size = batch_size or getattr(settings, 'CALLBACK_BATCH_SIZE', 1)
+        if batch_interval is None:
+            batch_interval = getattr(settings, 'CALLBACK_BATCH_INTERVAL', 0)
+        self.batch_interval = batch_interval
+        self.batch = []
+        self.batch_started = None
         self.logger = logging.getLogger('awx.main.queue.CallbackQueueDispatcher')
 
     def dispatch(self, obj):
+        """
+        Queue an event to be published.  Events are published together once
+        `batch_size` events are queued, the oldest queued event is older than
+        `batch_interval` seconds, or an EOF event is queued.
+        """
         if not self.callback_connection or not self.connection_queue:
             return
+        if self.batch_size <= 1:
+            return self.publish(obj)
+        if not self.batch:
+            self.batch_started = time.time()
+        self.batch.append(obj)
+        if len(self.batch) >= self.batch_size or obj.get('event') == 'EOF':
+            self.flush()
+        else:
+            self.flush_if_stale()
+
+    def flush_if_stale(self):
+        if self.batch and time.time() - self.batch_started >= self.batch_interval:
+            self.flush()
+
+    def flush(self):
+        """
+        Publish any queued events as a single message.
+        """
+        if not self.batch:
+            return
+        batch, self.batch = self.batch, []
+        self.publish(batch)
+
+    def publish(self, body):
         active_pid = os.getpid()
         for retry_count in range(4):
             try:
@@ -59,16 +109,18 @@ class CallbackQueueDispatcher(object):
                 if self.connection is None:
                     self.connection = Connection(self.callback_connection)
                     self.exchange = Exchange(self.connection_queue, type='direct')
+                    self.producer = Producer(self.connection)
 
-                producer = Producer(self.connection)
-                producer.publish(obj,
-                                 serializer='json-ansible',
-                                 compression='bzip2',
-                                 exchange=self.exchange,
-                                 declare=[self.exchange],
-                                 delivery_mode="persistent" if settings.PERSISTENT_CALLBACK_MESSAGES else "transient",
-                                 routing_key=self.connection_queue)
+                self.producer.publish(body,
+                                      serializer='json-ansible',
+                                      compression=self.compression,
+                                      exchange=self.exchange,
+                                      declare=[self.exchange],
+                                      delivery_mode="persistent" if settings.PERSISTENT_CALLBACK_MESSAGES else "transient",
+                                      routing_key=self.connection_queue)
                 return
             except Exception as e:
                 self.logger.info('Publish Job Event Exception: %r, retry=%d', e,
                                  retry_count, exc_info=True)
+                # reconnect on the next attempt
+                self.connection = None
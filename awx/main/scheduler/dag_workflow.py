@@ -4,6 +4,7 @@ from django.utils.encoding import smart_text
 
 # Python
 from awx.main.models import (
+    UnifiedJob,
     WorkflowJobTemplateNode,
     WorkflowJobNode,
 )
@@ -222,3 +223,90 @@ class WorkflowDAG(SimpleDAG):
                         nodes_marked_do_not_run.append(node)
 
         return [n['node_object'] for n in nodes_marked_do_not_run]
+
+
+class WorkflowDAGCache(object):
+    '''
+    Keeps the WorkflowDAG of each running workflow job between task manager
+    cycles.
+
+    The topology of a workflow job never changes once it has been created,
+    so each graph is built once; every cycle, a single query reads the state
+    of the nodes of all running workflow jobs (their job, the job's status,
+    do_not_run and unified job template) and applies it to the cached node
+    objects.  Workflow jobs whose nodes did not change since the previous
+    cycle have no new decisions to make, and are reported as unchanged.
+    '''
+
+    def __init__(self):
+        # {workflow job id: (created, WorkflowDAG, {node id: node})}
+        self.graphs = dict()
+        # {workflow job id: {node id: state}}, as read by the last refresh
+        self.states = dict()
+
+    def clear(self):
+        self.graphs.clear()
+        self.states.clear()
+
+    def get(self, workflow_job):
+        entry = self.graphs.get(workflow_job.id)
+        if entry is None or entry[0] != workflow_job.created:
+            return None
+        return entry[1]
+
+    def refresh(self, workflow_jobs):
+        '''
+        Bring the graphs of `workflow_jobs` up to date, and forget the graphs
+        of all other workflow jobs.
+
+        Returns the set of ids of the workflow jobs whose nodes changed.
+        '''
+        workflow_jobs = dict((wfj.id, wfj) for wfj in workflow_jobs)
+        for wfj_id in set(self.graphs) - set(workflow_jobs):
+            del self.graphs[wfj_id]
+            self.states.pop(wfj_id, None)
+        if not workflow_jobs:
+            return set()
+
+        states = dict((wfj_id, dict()) for wfj_id in workflow_jobs)
+        for node_id, wfj_id, job_id, status, do_not_run, ujt_id in WorkflowJobNode.objects.filter(
+            workflow_job_id__in=workflow_jobs.keys()
+        ).values_list('id', 'workflow_job_id', 'job_id', 'job__status', 'do_not_run', 'unified_job_template_id'):
+            states[wfj_id][node_id] = (job_id, status, do_not_run, ujt_id)
+
+        changed = set()
+        jobs_to_load = dict()
+        for wfj_id, workflow_job in workflow_jobs.items():
+            entry = self.graphs.get(wfj_id)
+            if entry is None or entry[0] != workflow_job.created or set(entry[2]) != set(states[wfj_id]):
+                dag = WorkflowDAG(workflow_job)
+                entry = (workflow_job.created, dag, dict((n['node_object'].id, n['node_object']) for n in dag.nodes))
+                self.graphs[wfj_id] = entry
+                self.states.pop(wfj_id, None)
+            if states[wfj_id] == self.states.get(wfj_id):
+                continue
+            changed.add(wfj_id)
+            nodes = entry[2]
+            for node_id, (job_id, status, do_not_run, ujt_id) in states[wfj_id].items():
+                node = nodes[node_id]
+                node.do_not_run = do_not_run
+                if node.unified_job_template_id != ujt_id:
+                    # the template was deleted
+                    node.unified_job_template_id = ujt_id
+                    if WorkflowJobNode.unified_job_template.is_cached(node):
+                        WorkflowJobNode.unified_job_template.field.delete_cached_value(node)
+                if job_id is None:
+                    node.job = None
+                elif WorkflowJobNode.job.is_cached(node) and node.job is not None and node.job.id == job_id:
+                    node.job.status = status
+                else:
+                    jobs_to_load.setdefault(job_id, []).append(node)
+            self.states[wfj_id] = states[wfj_id]
+
+        if jobs_to_load:
+            # base class instances are enough to follow job status
+            for job in UnifiedJob.objects.non_polymorphic().filter(id__in=jobs_to_load.keys()):
+                for node in jobs_to_load[job.id]:
+                    node.job = job
+        return changed
+
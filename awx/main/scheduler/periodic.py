@@ -0,0 +1,85 @@
+# Copyright (c) 2019 Ansible, Inc.
+# All Rights Reserved.
+
+# Python
+import heapq
+import logging
+import time
+
+# Django
+from django.db.models import Count, Max
+
+logger = logging.getLogger('awx.main.scheduler')
+
+__all__ = ['ScheduleIndex', 'schedule_index']
+
+# seconds after which the index is rebuilt even if no schedule was saved,
+# to catch changes made without Schedule.save (e.g., queryset updates)
+MAX_AGE = 600
+
+
+class ScheduleIndex(object):
+    """
+    An in-memory min-heap of (next_run, schedule id) for the enabled
+    schedules, so that the periodic scheduler only loads the schedules that
+    are due.
+
+    The scheduler runs on whichever node gets its lock, so each refresh
+    checks the database (the number of schedules and their latest
+    modification time) and rebuilds the heap if a schedule was created,
+    edited or deleted anywhere.  Entries are otherwise updated in place with
+    `push`; superseded heap items are skipped when popped.
+    Callers must re-check the `next_run` of the schedules `pop_due` returns,
+    because another process may have advanced them since the index was built.
+    """
+
+    def __init__(self):
+        self.heap = []
+        self.entries = {}
+        self.signature = None
+        self.loaded_at = 0
+
+    def refresh(self):
+        from awx.main.models import Schedule
+        # the scheduler's own updates of next_run don't change `modified`
+        signature = Schedule.objects.aggregate(Max('modified'), Count('id'))
+        signature = (signature['modified__max'], signature['id__count'])
+        if signature != self.signature or time.time() - self.loaded_at > MAX_AGE:
+            self.load()
+            self.signature = signature
+
+    def load(self):
+        from awx.main.models import Schedule
+        self.entries = dict(
+            Schedule.objects.enabled().exclude(next_run=None).values_list('pk', 'next_run')
+        )
+        self.heap = [(next_run, pk) for pk, next_run in self.entries.items()]
+        heapq.heapify(self.heap)
+        self.loaded_at = time.time()
+        logger.debug('Loaded {} schedules into the schedule index.'.format(len(self.entries)))
+
+    def reset(self):
+        self.signature = None
+
+    def push(self, pk, next_run):
+        if next_run is None:
+            self.entries.pop(pk, None)
+            return
+        self.entries[pk] = next_run
+        heapq.heappush(self.heap, (next_run, pk))
+
+    def pop_due(self, before):
+        """
+        Remove and return the ids of the schedules whose next run is before
+        the given time.
+        """
+        due = []
+        while self.heap and self.heap[0][0] < before:
+            next_run, pk = heapq.heappop(self.heap)
+            if self.entries.get(pk) == next_run:
+                del self.entries[pk]
+                due.append(pk)
+        return due
+
+
+schedule_index = ScheduleIndex()
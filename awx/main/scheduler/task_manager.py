@@ -16,6 +16,7 @@ from django.utils.timezone import now as tz_now
 # AWX
 from awx.main.models import (
     AdHocCommand,
+    Instance,
     InstanceGroup,
     InventorySource,
     InventoryUpdate,
@@ -27,7 +28,7 @@ from awx.main.models import (
     WorkflowJob,
     WorkflowJobTemplate
 )
-from awx.main.scheduler.dag_workflow import WorkflowDAG
+from awx.main.scheduler.dag_workflow import WorkflowDAG, WorkflowDAGCache
 from awx.main.utils.pglock import advisory_lock
 from awx.main.utils import get_type_for_model, task_manager_bulk_reschedule, schedule_task_manager
 from awx.main.signals import disable_activity_stream
@@ -37,15 +38,30 @@ from awx.main.utils import decrypt_field
 
 logger = logging.getLogger('awx.main.scheduler')
 
+# graphs of running workflow jobs, kept across task manager runs in this process
+workflow_dag_cache = WorkflowDAGCache()
+
 
 class TaskManager():
 
     def __init__(self):
         self.graph = dict()
+        # ids of the workflow jobs whose nodes changed since the last run;
+        # None to process every workflow job
+        self.changed_workflow_jobs = None
+        # Instances are shared between groups so that capacity consumed on a
+        # node during this cycle is visible to every group containing it.
+        self.instances = dict()
         for rampart_group in InstanceGroup.objects.prefetch_related('instances'):
+            schedulable_instances = []
+            for instance in sorted(rampart_group.instances.all(), key=lambda i: i.hostname):
+                instance = self.instances.setdefault(instance.hostname, instance)
+                if instance.capacity > 0 and instance.enabled:
+                    schedulable_instances.append(instance)
             self.graph[rampart_group.name] = dict(graph=DependencyGraph(rampart_group.name),
                                                   capacity_total=rampart_group.capacity,
-                                                  consumed_capacity=0)
+                                                  consumed_capacity=0,
+                                                  instances=schedulable_instances)
 
     def is_job_blocked(self, task):
         # TODO: I'm not happy with this, I think blocking behavior should be decided outside of the dependency graph
@@ -101,12 +117,26 @@ class TaskManager():
                 inventory_ids.add(task.inventory_id)
         return [invsrc for invsrc in InventorySource.objects.filter(inventory_id__in=inventory_ids, update_on_launch=True)]
 
+    def get_workflow_dag(self, workflow_job):
+        dag = None
+        if self.changed_workflow_jobs is not None:
+            # the cache was refreshed during this run
+            dag = workflow_dag_cache.get(workflow_job)
+        if dag is None:
+            dag = WorkflowDAG(workflow_job)
+        return dag
+
+    def workflow_job_changed(self, workflow_job):
+        return self.changed_workflow_jobs is None or workflow_job.id in self.changed_workflow_jobs
+
     def spawn_workflow_graph_jobs(self, workflow_jobs):
         for workflow_job in workflow_jobs:
             if workflow_job.cancel_flag:
                 logger.debug('Not spawning jobs for %s because it is pending cancelation.', workflow_job.log_format)
                 continue
-            dag = WorkflowDAG(workflow_job)
+            if not self.workflow_job_changed(workflow_job):
+                continue
+            dag = self.get_workflow_dag(workflow_job)
             spawn_nodes = dag.bfs_nodes_to_run()
             if spawn_nodes:
                 logger.debug('Spawning jobs for %s', workflow_job.log_format)
@@ -159,9 +189,10 @@ class TaskManager():
     def process_finished_workflow_jobs(self, workflow_jobs):
         result = []
         for workflow_job in workflow_jobs:
-            dag = WorkflowDAG(workflow_job)
             status_changed = False
             if workflow_job.cancel_flag:
+                # cancel the jobs as they are now, not as last seen
+                dag = WorkflowDAG(workflow_job)
                 workflow_job.workflow_nodes.filter(do_not_run=False, job__isnull=True).update(do_not_run=True)
                 logger.debug('Canceling spawned jobs of %s due to cancel flag.', workflow_job.log_format)
                 cancel_finished = dag.cancel_node_jobs()
@@ -172,6 +203,10 @@ class TaskManager():
                     workflow_job.save(update_fields=['status', 'start_args'])
                     status_changed = True
             else:
+                if not self.workflow_job_changed(workflow_job):
+                    # nothing happened that could mark nodes or finish it
+                    continue
+                dag = self.get_workflow_dag(workflow_job)
                 workflow_nodes = dag.mark_dnr_nodes()
                 for n in workflow_nodes:
                     n.save(update_fields=['do_not_run'])
@@ -447,13 +482,14 @@ class TaskManager():
             found_acceptable_queue = False
             idle_instance_that_fits = None
             for rampart_group in preferred_instance_groups:
+                instances = self.graph[rampart_group.name]['instances']
                 if idle_instance_that_fits is None:
-                    idle_instance_that_fits = rampart_group.find_largest_idle_instance()
+                    idle_instance_that_fits = rampart_group.find_largest_idle_instance(instances)
                 if not rampart_group.is_containerized and self.get_remaining_capacity(rampart_group.name) <= 0:
                     logger.debug("Skipping group {} capacity <= 0".format(rampart_group.name))
                     continue
 
-                execution_instance = rampart_group.fit_task_to_most_remaining_capacity_instance(task)
+                execution_instance = rampart_group.fit_task_to_most_remaining_capacity_instance(task, instances)
                 if execution_instance:
                     logger.debug("Starting dependent {} in group {} instance {}".format(
                                  task.log_format, rampart_group.name, execution_instance.hostname))
@@ -501,15 +537,16 @@ class TaskManager():
                     found_acceptable_queue = True
                     break
 
+                instances = self.graph[rampart_group.name]['instances']
                 if idle_instance_that_fits is None:
-                    idle_instance_that_fits = rampart_group.find_largest_idle_instance()
+                    idle_instance_that_fits = rampart_group.find_largest_idle_instance(instances)
                 remaining_capacity = self.get_remaining_capacity(rampart_group.name)
                 if not rampart_group.is_containerized and self.get_remaining_capacity(rampart_group.name) <= 0:
                     logger.debug("Skipping group {}, remaining_capacity {} <= 0".format(
                                  rampart_group.name, remaining_capacity))
                     continue
 
-                execution_instance = rampart_group.fit_task_to_most_remaining_capacity_instance(task)
+                execution_instance = rampart_group.fit_task_to_most_remaining_capacity_instance(task, instances)
                 if execution_instance:
                     logger.debug("Starting {} in group {} instance {} (remaining_capacity={})".format(
                                  task.log_format, rampart_group.name, execution_instance.hostname, remaining_capacity))
@@ -550,6 +587,9 @@ class TaskManager():
 
     def calculate_capacity_consumed(self, tasks):
         self.graph = InstanceGroup.objects.capacity_values(tasks=tasks, graph=self.graph)
+        usage = Instance.objects.capacity_usage()
+        for hostname, instance in self.instances.items():
+            instance.consumed_capacity, instance.jobs_running = usage.get(hostname, (0, 0))
 
     def would_exceed_capacity(self, task, instance_group):
         current_capacity = self.graph[instance_group]['consumed_capacity']
@@ -563,6 +603,10 @@ class TaskManager():
                      task.log_format, task.task_impact, instance_group,
                      self.graph[instance_group]['consumed_capacity']))
         self.graph[instance_group]['consumed_capacity'] += task.task_impact
+        instance = self.instances.get(task.execution_node)
+        if instance is not None:
+            instance.consumed_capacity += task.task_impact
+            instance.jobs_running += 1
 
     def get_remaining_capacity(self, instance_group):
         return (self.graph[instance_group]['capacity_total'] - self.graph[instance_group]['consumed_capacity'])
@@ -591,6 +635,7 @@ class TaskManager():
             self.all_inventory_sources = self.get_inventory_source_tasks(all_sorted_tasks)
 
             running_workflow_tasks = self.get_running_workflow_jobs()
+            self.changed_workflow_jobs = workflow_dag_cache.refresh(running_workflow_tasks)
             finished_wfjs = self.process_finished_workflow_jobs(running_workflow_tasks)
 
             previously_running_workflow_tasks = running_workflow_tasks
@@ -617,4 +662,9 @@ class TaskManager():
                     return
                 logger.debug("Starting Scheduler")
                 with task_manager_bulk_reschedule():
-                    self._schedule()
+                    try:
+                        self._schedule()
+                    except Exception:
+                        # the cached graphs may hold changes being rolled back
+                        workflow_dag_cache.clear()
+                        raise
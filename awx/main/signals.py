@@ -30,9 +30,9 @@ from crum.signals import current_user_getter
 
 # AWX
 from awx.main.models import (
-    ActivityStream, AdHocCommandEvent, Group, Host, InstanceGroup, Inventory,
-    InventorySource, InventoryUpdateEvent, Job, JobEvent, JobHostSummary,
-    JobTemplate, OAuth2AccessToken, Organization, Project, ProjectUpdateEvent,
+    ActivityStream, AdHocCommandEvent, Credential, CredentialInputSource,
+    Group, Host, InstanceGroup, Inventory, InventorySource, InventoryUpdateEvent,
+    Job, JobEvent, JobHostSummary, JobTemplate, OAuth2AccessToken, Organization, Project, ProjectUpdateEvent,
     Role, SystemJob, SystemJobEvent, SystemJobTemplate, UnifiedJob,
     UnifiedJobTemplate, User, UserSessionMembership, WorkflowJobTemplateNode,
     WorkflowApproval, WorkflowApprovalTemplate, ROLE_SINGLETON_SYSTEM_ADMINISTRATOR
@@ -40,6 +40,7 @@ from awx.main.models import (
 from awx.main.constants import CENSOR_VALUE
 from awx.main.utils import model_instance_diff, model_to_dict, camelcase_to_underscore, get_current_apps
 from awx.main.utils import ignore_inventory_computed_fields, ignore_inventory_group_removal, _inventory_updates
+from awx.main.utils.credential_lookups import invalidate_external_secrets
 from awx.main.tasks import update_inventory_computed_fields
 from awx.main.fields import (
     is_implicit_parent,
@@ -356,6 +357,20 @@ def update_host_last_job_after_job_deleted(sender, **kwargs):
         _update_host_last_jhs(host)
 
 
+# Drop external secrets cached in this process when their source changes
+
+@receiver(post_save, sender=Credential)
+@receiver(post_delete, sender=Credential)
+def invalidate_credential_external_secrets(sender, instance, **kwargs):
+    invalidate_external_secrets(instance.pk)
+
+
+@receiver(post_save, sender=CredentialInputSource)
+@receiver(post_delete, sender=CredentialInputSource)
+def invalidate_input_source_external_secrets(sender, instance, **kwargs):
+    invalidate_external_secrets(instance.source_credential_id)
+
+
 # Set via ActivityStreamRegistrar to record activity stream events
 
 
@@ -31,7 +31,8 @@ import urllib.parse as urlparse
 # Django
 from django.conf import settings
 from django.db import transaction, DatabaseError, IntegrityError
-from django.db.models.fields.related import ForeignKey
+from django.db.models import Q
+from django.db.models.fields.related import ForeignKey, ManyToManyField
 from django.utils.timezone import now, timedelta
 from django.utils.encoding import smart_str
 from django.core.mail import send_mail
@@ -57,7 +58,7 @@ from awx.main.access import access_registry
 from awx.main.models import (
     Schedule, TowerScheduleState, Instance, InstanceGroup,
     UnifiedJob, Notification,
-    Inventory, InventorySource, SmartInventoryMembership,
+    Host, Inventory, InventorySource, SmartInventoryMembership,
     Job, AdHocCommand, ProjectUpdate, InventoryUpdate, SystemJob,
     JobEvent, ProjectUpdateEvent, InventoryUpdateEvent, AdHocCommandEvent, SystemJobEvent,
     build_safe_env
@@ -72,11 +73,14 @@ from awx.main.utils import (get_ssh_version, update_scm_url,
                             get_licenser,
                             ignore_inventory_computed_fields,
                             ignore_inventory_group_removal, extract_ansible_vars, schedule_task_manager,
-                            get_awx_version)
+                            task_manager_bulk_reschedule, get_awx_version)
 from awx.main.utils.common import get_ansible_version, _get_ansible_version, get_custom_venv_choices
+from awx.main.utils.filters import SmartFilter
 from awx.main.utils.safe_yaml import safe_dump, sanitize_jinja
 from awx.main.utils.reload import stop_local_services
 from awx.main.utils.pglock import advisory_lock
+from awx.main.utils.project_cache import ProjectCheckoutCache
+from awx.main.utils.credential_lookups import lookup_scope
 from awx.main.consumers import emit_channel_notification
 from awx.main import analytics
 from awx.conf import settings_registry
@@ -274,6 +278,9 @@ def handle_setting_changes(setting_keys):
     cache_keys = set(setting_keys)
     logger.debug('cache delete_many(%r)', cache_keys)
     cache.delete_many(cache_keys)
+    settings_wrapper = getattr(settings, '_awx_conf_settings', None)
+    if settings_wrapper:
+        settings_wrapper.invalidate_local_cache(cache_keys)
 
 
 @task(queue='tower_broadcast_all', exchange_type='fanout')
@@ -484,6 +491,7 @@ def awx_isolated_heartbeat():
 
 @task()
 def awx_periodic_scheduler():
+    from awx.main.scheduler.periodic import schedule_index
     with advisory_lock('awx_periodic_scheduler_lock', wait=False) as acquired:
         if acquired is False:
             logger.debug("Not running periodic scheduler, another task holds lock")
@@ -497,10 +505,26 @@ def awx_periodic_scheduler():
         state.schedule_last_run = run_now
         state.save()
 
-        old_schedules = Schedule.objects.enabled().before(last_run)
-        for schedule in old_schedules:
-            schedule.update_computed_fields()
-        schedules = Schedule.objects.enabled().between(last_run, run_now)
+        # only the schedules that the index says are due are loaded; those
+        # that were due before the last run (e.g., while the scheduler was not
+        # running) are moved forward without launching a job
+        try:
+            schedule_index.refresh()
+            due = schedule_index.pop_due(run_now)
+            schedules = []
+            for schedule in Schedule.objects.enabled().filter(pk__in=due):
+                previous_run = schedule.next_run
+                if previous_run is None or previous_run >= run_now:
+                    # moved forward by another process since the index was built
+                    schedule_index.push(schedule.pk, previous_run)
+                    continue
+                schedule.update_computed_fields() # To update next_run timestamp.
+                schedule_index.push(schedule.pk, schedule.next_run)
+                if previous_run > last_run:
+                    schedules.append(schedule)
+        except Exception:
+            schedule_index.reset()
+            raise
 
         invalid_license = False
         try:
@@ -508,34 +532,42 @@ def awx_periodic_scheduler():
         except PermissionDenied as e:
             invalid_license = e
 
-        for schedule in schedules:
-            template = schedule.unified_job_template
-            schedule.update_computed_fields() # To update next_run timestamp.
-            if template.cache_timeout_blocked:
-                logger.warn("Cache timeout is in the future, bypassing schedule for template %s" % str(template.id))
-                continue
-            try:
-                job_kwargs = schedule.get_job_kwargs()
-                new_unified_job = schedule.unified_job_template.create_unified_job(**job_kwargs)
-                logger.debug('Spawned {} from schedule {}-{}.'.format(
-                    new_unified_job.log_format, schedule.name, schedule.pk))
-
-                if invalid_license:
+        # jobs are created in a single transaction, and the task manager is
+        # scheduled once after it commits
+        failed_jobs = []
+        with task_manager_bulk_reschedule(), transaction.atomic():
+            for schedule in schedules:
+                template = schedule.unified_job_template
+                if template.cache_timeout_blocked:
+                    logger.warn("Cache timeout is in the future, bypassing schedule for template %s" % str(template.id))
+                    continue
+                try:
+                    with transaction.atomic():
+                        job_kwargs = schedule.get_job_kwargs()
+                        new_unified_job = template.create_unified_job(**job_kwargs)
+                        logger.debug('Spawned {} from schedule {}-{}.'.format(
+                            new_unified_job.log_format, schedule.name, schedule.pk))
+
+                        if invalid_license:
+                            new_unified_job.status = 'failed'
+                            new_unified_job.job_explanation = str(invalid_license)
+                            new_unified_job.save(update_fields=['status', 'job_explanation'])
+                            failed_jobs.append(new_unified_job)
+                        else:
+                            can_start = new_unified_job.signal_start()
+                    if invalid_license:
+                        raise invalid_license
+                except Exception:
+                    logger.exception('Error spawning scheduled job.')
+                    continue
+                if not can_start:
                     new_unified_job.status = 'failed'
-                    new_unified_job.job_explanation = str(invalid_license)
+                    new_unified_job.job_explanation = "Scheduled job could not start because it was not in the right state or required manual credentials"
                     new_unified_job.save(update_fields=['status', 'job_explanation'])
-                    new_unified_job.websocket_emit_status("failed")
-                    raise invalid_license
-                can_start = new_unified_job.signal_start()
-            except Exception:
-                logger.exception('Error spawning scheduled job.')
-                continue
-            if not can_start:
-                new_unified_job.status = 'failed'
-                new_unified_job.job_explanation = "Scheduled job could not start because it was not in the right state or required manual credentials"
-                new_unified_job.save(update_fields=['status', 'job_explanation'])
-                new_unified_job.websocket_emit_status("failed")
-            emit_channel_notification('schedules-changed', dict(id=schedule.id, group_name="schedules"))
+                    failed_jobs.append(new_unified_job)
+                emit_channel_notification('schedules-changed', dict(id=schedule.id, group_name="schedules"))
+        for new_unified_job in failed_jobs:
+            new_unified_job.websocket_emit_status("failed")
         state.save()
 
 
@@ -592,6 +624,17 @@ def handle_work_error(task_id, *args, **kwargs):
         pass
 
 
+@task()
+def handle_reaped_jobs(job_ids, status):
+    for instance in UnifiedJob.objects.filter(pk__in=job_ids).order_by('pk'):
+        try:
+            reaper.finish_reaped_job(instance, status)
+        except Exception:
+            logger.exception('failed to finish reaping {}'.format(instance.log_format))
+    # let the task manager fail dependent jobs and advance workflows
+    schedule_task_manager()
+
+
 @task()
 def update_inventory_computed_fields(inventory_id, should_update_hosts=True):
     '''
@@ -615,6 +658,27 @@ def update_inventory_computed_fields(inventory_id, should_update_hosts=True):
 def update_smart_memberships_for_inventory(smart_inventory):
     current = set(SmartInventoryMembership.objects.filter(inventory=smart_inventory).values_list('host_id', flat=True))
     new = set(smart_inventory.hosts.values_list('id', flat=True))
+    return apply_smart_membership_changes(smart_inventory, current, new)
+
+
+def update_smart_memberships_for_hosts(smart_inventory, host_ids, host_names):
+    """
+    Re-test only the given hosts against the smart inventory filter. Smart
+    inventories hold one host per name, so all hosts sharing a name with a
+    changed host are considered as well.
+    """
+    hosts = SmartFilter.query_from_string(smart_inventory.host_filter)
+    if smart_inventory.organization_id:
+        hosts = hosts.filter(inventory__organization=smart_inventory.organization_id)
+    hosts = hosts.filter(name__in=host_names).order_by('name', 'pk').distinct('name')
+    current = set(SmartInventoryMembership.objects.filter(
+        Q(host_id__in=host_ids) | Q(host__name__in=host_names), inventory=smart_inventory
+    ).values_list('host_id', flat=True))
+    new = set(hosts.values_list('id', flat=True))
+    return apply_smart_membership_changes(smart_inventory, current, new)
+
+
+def apply_smart_membership_changes(smart_inventory, current, new):
     additions = new - current
     removals = current - new
     if additions or removals:
@@ -627,7 +691,7 @@ def update_smart_memberships_for_inventory(smart_inventory):
                     for host_id in additions
                 ]
                 SmartInventoryMembership.objects.bulk_create(add_for_inventory, ignore_conflicts=True)
-        logger.debug('Smart host membership cached for {}, {} additions, {} removals, {} total count.'.format(
+        logger.debug('Smart host membership cached for {}, {} additions, {} removals, {} evaluated count.'.format(
             smart_inventory.pk, len(additions), len(removals), len(new)
         ))
         return True  # changed
@@ -635,12 +699,17 @@ def update_smart_memberships_for_inventory(smart_inventory):
 
 
 @task()
-def update_host_smart_inventory_memberships():
+def update_host_smart_inventory_memberships(host_ids=None, host_names=None):
     smart_inventories = Inventory.objects.filter(kind='smart', host_filter__isnull=False, pending_deletion=False)
+    if host_ids is not None:
+        host_names = set(host_names or []) | set(Host.objects.filter(pk__in=host_ids).values_list('name', flat=True))
     changed_inventories = set([])
     for smart_inventory in smart_inventories:
         try:
-            changed = update_smart_memberships_for_inventory(smart_inventory)
+            if host_ids is None:
+                changed = update_smart_memberships_for_inventory(smart_inventory)
+            else:
+                changed = update_smart_memberships_for_hosts(smart_inventory, host_ids, host_names)
             if changed:
                 changed_inventories.add(smart_inventory)
         except IntegrityError:
@@ -708,6 +777,7 @@ class BaseTask(object):
     def __init__(self):
         self.cleanup_paths = []
         self.parent_workflow_job_id = None
+        self.dispatcher = None
 
     def update_model(self, pk, _attempt=0, **updates):
         """Reload the model instance from the database and update the
@@ -901,6 +971,9 @@ class BaseTask(object):
                     '/var/log',
                     settings.PROJECTS_ROOT,
                     settings.JOBOUTPUT_ROOT,
+                    # may be outside AWX_PROOT_BASE_PATH, and holds every
+                    # project's checkouts
+                    ProjectCheckoutCache().root,
                 ] + getattr(settings, 'AWX_PROOT_HIDE_PATHS', None) or [],
                 'process_isolation_ro_paths': [settings.ANSIBLE_VENV_PATH, settings.AWX_VENV_PATH],
             }
@@ -1130,6 +1203,10 @@ class BaseTask(object):
         '''
         Ansible runner callback to tell the job when/if it is canceled
         '''
+        # ansible-runner polls this regularly, even while a playbook is quiet;
+        # don't let a partial batch of events wait for the next event
+        if self.dispatcher:
+            self.dispatcher.flush_if_stale()
         self.instance = self.update_model(self.instance.pk)
         if self.instance.cancel_flag or self.instance.status == 'canceled':
             cancel_wait = (now() - self.instance.modified).seconds if self.instance.modified else 0
@@ -1236,74 +1313,77 @@ class BaseTask(object):
                     fact_modification_times,
                 )
 
-            # May have to serialize the value
-            private_data_files = self.build_private_data_files(self.instance, private_data_dir)
-            passwords = self.build_passwords(self.instance, kwargs)
-            self.build_extra_vars_file(self.instance, private_data_dir)
-            args = self.build_args(self.instance, private_data_dir, passwords)
-            cwd = self.build_cwd(self.instance, private_data_dir)
-            resource_profiling_params = self.build_params_resource_profiling(self.instance,
-                                                                             private_data_dir)
-            process_isolation_params = self.build_params_process_isolation(self.instance,
-                                                                           private_data_dir,
-                                                                           cwd)
-            env = self.build_env(self.instance, private_data_dir, isolated,
-                                 private_data_files=private_data_files)
-            self.safe_env = build_safe_env(env)
-
-            credentials = self.build_credentials_list(self.instance)
-
-            for credential in credentials:
-                if credential:
-                    credential.credential_type.inject_credential(
-                        credential, env, self.safe_cred_env, args, private_data_dir
-                    )
-
-            self.safe_env.update(self.safe_cred_env)
-
-            self.write_args_file(private_data_dir, args)
-
-            password_prompts = self.get_password_prompts(passwords)
-            expect_passwords = self.create_expect_passwords_data_struct(password_prompts, passwords)
-
-            params = {
-                'ident': self.instance.id,
-                'private_data_dir': private_data_dir,
-                'project_dir': cwd,
-                'playbook': self.build_playbook_path_relative_to_cwd(self.instance, private_data_dir),
-                'inventory': self.build_inventory(self.instance, private_data_dir),
-                'passwords': expect_passwords,
-                'envvars': env,
-                'event_handler': self.event_handler,
-                'cancel_callback': self.cancel_callback,
-                'finished_callback': self.finished_callback,
-                'status_handler': self.status_handler,
-                'settings': {
-                    'job_timeout': self.get_instance_timeout(self.instance),
-                    'pexpect_timeout': getattr(settings, 'PEXPECT_TIMEOUT', 5),
-                    'suppress_ansible_output': True,
-                    **process_isolation_params,
-                    **resource_profiling_params,
-                },
-            }
+            # look up each external credential input once, and only while the
+            # credentials and environment of the job are built
+            with lookup_scope():
+                # May have to serialize the value
+                private_data_files = self.build_private_data_files(self.instance, private_data_dir)
+                passwords = self.build_passwords(self.instance, kwargs)
+                self.build_extra_vars_file(self.instance, private_data_dir)
+                args = self.build_args(self.instance, private_data_dir, passwords)
+                cwd = self.build_cwd(self.instance, private_data_dir)
+                resource_profiling_params = self.build_params_resource_profiling(self.instance,
+                                                                                 private_data_dir)
+                process_isolation_params = self.build_params_process_isolation(self.instance,
+                                                                               private_data_dir,
+                                                                               cwd)
+                env = self.build_env(self.instance, private_data_dir, isolated,
+                                     private_data_files=private_data_files)
+                self.safe_env = build_safe_env(env)
+
+                credentials = self.build_credentials_list(self.instance)
+
+                for credential in credentials:
+                    if credential:
+                        credential.credential_type.inject_credential(
+                            credential, env, self.safe_cred_env, args, private_data_dir
+                        )
 
-            if isinstance(self.instance, AdHocCommand):
-                params['module'] = self.build_module_name(self.instance)
-                params['module_args'] = self.build_module_args(self.instance)
+                self.safe_env.update(self.safe_cred_env)
+
+                self.write_args_file(private_data_dir, args)
+
+                password_prompts = self.get_password_prompts(passwords)
+                expect_passwords = self.create_expect_passwords_data_struct(password_prompts, passwords)
+
+                params = {
+                    'ident': self.instance.id,
+                    'private_data_dir': private_data_dir,
+                    'project_dir': cwd,
+                    'playbook': self.build_playbook_path_relative_to_cwd(self.instance, private_data_dir),
+                    'inventory': self.build_inventory(self.instance, private_data_dir),
+                    'passwords': expect_passwords,
+                    'envvars': env,
+                    'event_handler': self.event_handler,
+                    'cancel_callback': self.cancel_callback,
+                    'finished_callback': self.finished_callback,
+                    'status_handler': self.status_handler,
+                    'settings': {
+                        'job_timeout': self.get_instance_timeout(self.instance),
+                        'pexpect_timeout': getattr(settings, 'PEXPECT_TIMEOUT', 5),
+                        'suppress_ansible_output': True,
+                        **process_isolation_params,
+                        **resource_profiling_params,
+                    },
+                }
+
+                if isinstance(self.instance, AdHocCommand):
+                    params['module'] = self.build_module_name(self.instance)
+                    params['module_args'] = self.build_module_args(self.instance)
+
+                if getattr(self.instance, 'use_fact_cache', False):
+                    # Enable Ansible fact cache.
+                    params['fact_cache_type'] = 'jsonfile'
+                else:
+                    # Disable Ansible fact cache.
+                    params['fact_cache_type'] = ''
 
-            if getattr(self.instance, 'use_fact_cache', False):
-                # Enable Ansible fact cache.
-                params['fact_cache_type'] = 'jsonfile'
-            else:
-                # Disable Ansible fact cache.
-                params['fact_cache_type'] = ''
-
-            '''
-            Delete parameters if the values are None or empty array
-            '''
-            for v in ['passwords', 'playbook', 'inventory']:
-                if not params[v]:
-                    del params[v]
+                '''
+                Delete parameters if the values are None or empty array
+                '''
+                for v in ['passwords', 'playbook', 'inventory']:
+                    if not params[v]:
+                        del params[v]
 
             if self.instance.is_isolated() or containerized:
                 module_args = None
@@ -1340,7 +1420,7 @@ class BaseTask(object):
                                                            module_args,
                                                            event_data_key=self.event_data_key,
                                                            ident=str(self.instance.pk))
-                self.event_ct = len(isolated_manager_instance.handled_events)
+                self.event_ct = isolated_manager_instance.handled_events
             else:
                 self.dispatcher = CallbackQueueDispatcher()
                 res = ansible_runner.interface.run(**params)
@@ -1360,6 +1440,8 @@ class BaseTask(object):
             extra_update_fields['result_traceback'] = traceback.format_exc()
             logger.exception('%s Exception occurred while running task', self.instance.log_format)
         finally:
+            if self.dispatcher:
+                self.dispatcher.flush()
             logger.debug('%s finished running, producing %s events.', self.instance.log_format, self.event_ct)
 
         try:
@@ -1765,7 +1847,7 @@ class RunJob(BaseTask):
             # Project update does not copy the folder, so copy here
             RunProjectUpdate.make_local_copy(
                 project_path, os.path.join(private_data_dir, 'project'),
-                job.project.scm_type, job_revision
+                job.project.scm_type, job_revision, project_id=job.project_id
             )
 
         if job.inventory.kind == 'smart':
@@ -2136,7 +2218,20 @@ class RunProjectUpdate(BaseTask):
                 self.original_branch = git_repo.active_branch
 
     @staticmethod
-    def make_local_copy(project_path, destination_folder, scm_type, scm_revision):
+    def make_local_copy(project_path, destination_folder, scm_type, scm_revision, project_id=None):
+        checkout_cache = ProjectCheckoutCache()
+        if scm_type and scm_revision and checkout_cache.enabled:
+            # materialize each revision once per node, then clone it for every job
+            checkout_cache.copy(
+                project_path, scm_revision, destination_folder,
+                lambda path: RunProjectUpdate.checkout_revision(project_path, path, scm_type, scm_revision),
+                project_id=project_id
+            )
+        else:
+            RunProjectUpdate.checkout_revision(project_path, destination_folder, scm_type, scm_revision)
+
+    @staticmethod
+    def checkout_revision(project_path, destination_folder, scm_type, scm_revision):
         if scm_type == 'git':
             git_repo = git.Repo(project_path)
             if not os.path.exists(destination_folder):
@@ -2170,7 +2265,7 @@ class RunProjectUpdate(BaseTask):
             # because some git-tree-specific resources (like submodules) might matter
             self.make_local_copy(
                 instance.get_project_path(check_if_exists=False), os.path.join(self.job_private_data_dir, 'project'),
-                instance.scm_type, self.playbook_new_revision
+                instance.scm_type, self.playbook_new_revision, project_id=instance.project_id
             )
             if self.original_branch:
                 # for git project syncs, non-default branches can be problems
@@ -2689,23 +2784,68 @@ class RunSystemJob(BaseTask):
 
 
 def _reconstruct_relationships(copy_mapping):
+    """
+    Point the relationships of deep copied objects at the copies of related
+    objects, where those were copied too.  Rows of many-to-many relationships
+    are read and inserted in bulk, with one pass per through table.
+    """
+    from awx.api.generics import CopyAPIView
+    batch_size = CopyAPIView.copy_batch_size
+    new_pks = {}
+    copied = OrderedDict()
     for old_obj, new_obj in copy_mapping.items():
-        model = type(old_obj)
+        new_pks[(old_obj._meta.concrete_model, old_obj.pk)] = new_obj.pk
+        copied.setdefault(type(old_obj), []).append((old_obj, new_obj))
+
+    def get_new_pk(model, pk):
+        return new_pks.get((model._meta.concrete_model, pk), pk)
+
+    # {(through model, source field, target field): set of (source pk, target pk)}
+    through_rows = OrderedDict()
+    for model, pairs in copied.items():
+        changed_fields = []
         for field_name in getattr(model, 'FIELDS_TO_PRESERVE_AT_COPY', []):
             field = model._meta.get_field(field_name)
             if isinstance(field, ForeignKey):
-                if getattr(new_obj, field_name, None):
-                    continue
-                related_obj = getattr(old_obj, field_name)
-                related_obj = copy_mapping.get(related_obj, related_obj)
-                setattr(new_obj, field_name, related_obj)
+                changed_fields.append(field.name)
+                for old_obj, new_obj in pairs:
+                    related_pk = getattr(old_obj, field.attname)
+                    if getattr(new_obj, field.attname, None) or not related_pk:
+                        continue
+                    setattr(new_obj, field.attname, get_new_pk(field.related_model, related_pk))
             elif field.many_to_many:
-                for related_obj in getattr(old_obj, field_name).all():
-                    logger.debug('Deep copy: Adding {} to {}({}).{} relationship'.format(
-                        related_obj, new_obj, model, field_name
-                    ))
-                    getattr(new_obj, field_name).add(copy_mapping.get(related_obj, related_obj))
-        new_obj.save()
+                m2m_field = field if isinstance(field, ManyToManyField) else field.remote_field
+                through = m2m_field.remote_field.through
+                if len(through._meta.concrete_fields) > 3:
+                    # extra columns (e.g., ordered relationships); keep the
+                    # related manager handle those
+                    for old_obj, new_obj in pairs:
+                        for related_obj in getattr(old_obj, field_name).all():
+                            getattr(new_obj, field_name).add(copy_mapping.get(related_obj, related_obj))
+                    continue
+                source = through._meta.get_field(m2m_field.m2m_field_name())
+                target = through._meta.get_field(m2m_field.m2m_reverse_field_name())
+                logger.debug('Deep copy: Adding {}({}).{} relationships'.format(
+                    len(pairs), model, field_name
+                ))
+                rows = through_rows.setdefault((through, source, target), set())
+                lookup = (source if field is m2m_field else target).attname + '__in'
+                old_pks = [old_obj.pk for old_obj, new_obj in pairs]
+                for offset in range(0, len(old_pks), batch_size):
+                    for source_pk, target_pk in through.objects.filter(
+                        **{lookup: old_pks[offset:(offset + batch_size)]}
+                    ).values_list(source.attname, target.attname):
+                        rows.add((get_new_pk(source.related_model, source_pk),
+                                  get_new_pk(target.related_model, target_pk)))
+        if changed_fields:
+            model.objects.bulk_update([new_obj for old_obj, new_obj in pairs], changed_fields,
+                                      batch_size=batch_size)
+
+    for (through, source, target), rows in through_rows.items():
+        through.objects.bulk_create([
+            through(**{source.attname: source_pk, target.attname: target_pk})
+            for source_pk, target_pk in sorted(rows)
+        ], batch_size=batch_size)
 
 
 @task()
@@ -2727,20 +2867,24 @@ def deep_copy_model_obj(
         logger.warning("Object or user no longer exists.")
         return
     with transaction.atomic(), ignore_inventory_computed_fields(), disable_activity_stream():
-        copy_mapping = {}
+        sub_obj_pks = OrderedDict()
         for sub_obj_setup in sub_obj_list:
             sub_model = getattr(importlib.import_module(sub_obj_setup[0]),
                                 sub_obj_setup[1], None)
             if sub_model is None:
                 continue
-            try:
-                sub_obj = sub_model.objects.get(pk=sub_obj_setup[2])
-            except ObjectDoesNotExist:
-                continue
-            copy_mapping.update(CopyAPIView.copy_model_obj(
-                obj, new_obj, sub_model, sub_obj, creater
+            sub_obj_pks.setdefault(sub_model, []).append(sub_obj_setup[2])
+        copy_mapping = {}
+        for sub_model, pks in sub_obj_pks.items():
+            sub_objs = sub_model.objects.in_bulk(pks)
+            copy_mapping.update(CopyAPIView.bulk_copy_model_objs(
+                obj, new_obj, sub_model, [sub_objs[pk] for pk in pks if pk in sub_objs], creater
             ))
         _reconstruct_relationships(copy_mapping)
+        new_host_pks = [new.pk for new in copy_mapping.values() if isinstance(new, Host)]
+        if new_host_pks and settings.AWX_REBUILD_SMART_MEMBERSHIP:
+            # copied hosts are inserted in bulk, bypassing Host.save()
+            transaction.on_commit(lambda: update_host_smart_inventory_memberships.delay(host_ids=new_host_pks))
         if permission_check_func:
             permission_check_func = getattr(getattr(
                 importlib.import_module(permission_check_func[0]), permission_check_func[1]
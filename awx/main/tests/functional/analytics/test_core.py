@@ -2,11 +2,13 @@ import importlib
 import json
 import os
 import tarfile
+import types
 from unittest import mock
 import pytest
 
 from django.conf import settings
-from awx.main.analytics import gather, register
+from awx.main.analytics import gather, register, ship, table_version
+from awx.main.models.ha import TowerAnalyticsState
 
 
 @register('example', '1.0')
@@ -56,4 +58,34 @@ def test_gather(mock_valid_license):
         os.remove(tgz)
     except Exception:
         pass
-        
+
+
+@pytest.mark.django_db
+def test_table_watermarks_saved_after_ship(mock_valid_license):
+    settings.INSIGHTS_TRACKING_STATE = True
+    settings.AUTOMATION_ANALYTICS_URL = 'https://example.org/'
+    settings.REDHAT_USERNAME = settings.REDHAT_PASSWORD = 'redhat'
+    calls = []
+
+    @table_version('example_table.csv', '1.0')
+    def example_table(since, dest, last_id=None):
+        calls.append(last_id)
+        dest.write(b'id\n43\n')
+        return 43
+
+    module = types.ModuleType('example_tables')
+    module.example_table = example_table
+
+    tgz = gather(module=module)
+    with tarfile.open(tgz, "r:gz") as archive:
+        assert archive.extractfile('./example_table.csv').read() == b'id\n43\n'
+    # nothing is recorded until the upload succeeds
+    assert TowerAnalyticsState.get_solo().table_watermarks == {}
+
+    with mock.patch('awx.main.analytics.core.requests.post') as post:
+        post.return_value = mock.Mock(status_code=202)
+        ship(tgz)
+    assert TowerAnalyticsState.get_solo().table_watermarks == {'example_table.csv': 43}
+
+    os.remove(gather(module=module))
+    assert calls == [None, 43]
@@ -1,8 +1,15 @@
 import pytest
+from unittest import mock
 
+from django.core.cache import cache
+from django.db import connection
 from prometheus_client.parser import text_string_to_metric_families
 from awx.main import models
 from awx.main.analytics.metrics import metrics
+from awx.main.dispatch.metrics import INDEX_KEY, WorkerMetrics
+from awx.main.middleware import TimingMiddleware
+from awx.main.utils import request_metrics
+from awx.main.utils.request_metrics import QueryRecorder, fingerprint, record_request
 from awx.api.versioning import reverse
 from awx.main.models.rbac import Role
 
@@ -31,9 +38,19 @@ EXPECTED_VALUES = {
     'awx_license_instance_total':0,
     'awx_license_instance_free':0,
     'awx_pending_jobs_total':0,
+    'awx_status_total':0,
 }
 
 
+def get_samples(output):
+    samples = {}
+    for gauge in text_string_to_metric_families(output.decode('UTF-8')):
+        for sample in gauge.samples:
+            name, labels, value, _, _ = sample
+            samples[(name, tuple(sorted(labels.items())))] = value
+    return samples
+
+
 @pytest.mark.django_db
 def test_metrics_counts(organization_factory, job_template_factory, workflow_job_template_factory):
     objs = organization_factory('org', superusers=['admin'])
@@ -58,9 +75,52 @@ def test_metrics_counts(organization_factory, job_template_factory, workflow_job
         for sample in gauge.samples:
             # name, label, value, timestamp, exemplar
             name, _, value, _, _ = sample
+            if name in ('awx_settings_local_cache', 'awx_project_checkout_cache_total', 'awx_metrics_scrape_duration_seconds'):
+                # cache counters and timings; values depend on prior lookups
+                continue
             assert EXPECTED_VALUES[name] == value
 
 
+@pytest.mark.django_db
+def test_metrics_aggregates_cached_between_scrapes(settings, organization):
+    settings.AWX_METRICS_CACHE_TIMEOUT = 60
+    metrics()
+
+    models.Organization(name='another-org').save()
+    models.Job(status='pending').save()
+    samples = get_samples(metrics())
+    # counts (including job statuses) are served from the cache until it expires
+    assert samples[('awx_organizations_total', ())] == 1
+    assert samples[('awx_pending_jobs_total', ())] == 0
+    assert samples[('awx_status_total', (('status', 'pending'),))] == 0
+    assert samples[('awx_metrics_scrape_duration_seconds', ())] > 0
+
+    settings.AWX_METRICS_CACHE_TIMEOUT = 0
+    samples = get_samples(metrics())
+    assert samples[('awx_organizations_total', ())] == 2
+    assert samples[('awx_pending_jobs_total', ())] == 1
+    assert samples[('awx_status_total', (('status', 'pending'),))] == 1
+
+
+@pytest.mark.django_db
+def test_dispatcher_metrics_of_this_node(settings):
+    worker_metrics = WorkerMetrics()
+    worker_metrics.inc('events_saved', 3, event='runner_on_ok')
+    worker_metrics.observe('task_duration_seconds', 0.2, task='awx.main.tasks.cluster_node_heartbeat')
+    worker_metrics.flush(force=True)
+
+    samples = get_samples(metrics())
+    node = settings.CLUSTER_HOST_ID
+    assert samples[('awx_callback_events_saved_total', (('event', 'runner_on_ok'), ('node', node)))] == 3
+    assert samples[('awx_dispatcher_task_duration_seconds_bucket', (
+        ('le', '0.25'), ('node', node), ('task', 'awx.main.tasks.cluster_node_heartbeat')
+    ))] == 1
+    assert set(
+        dict(labels)['node'] for name, labels in samples
+        if name.startswith(('awx_callback_', 'awx_dispatcher_'))
+    ) == set([node])
+
+
 @pytest.mark.django_db 
 def test_metrics_permissions(get, admin, org_admin, alice, bob, organization):
     assert get(reverse('api:metrics_view'), user=admin).status_code == 200
@@ -84,3 +144,75 @@ def test_metrics_http_methods(get, post, patch, put, options, admin):
     assert options(reverse('api:metrics_view'), user=admin).status_code == 200
 
 
+def test_query_fingerprint():
+    assert fingerprint(
+        "SELECT * FROM main_host WHERE id IN (%s, %s, %s) AND name = 'x''y' LIMIT 21"
+    ) == fingerprint(
+        "SELECT * FROM main_host  WHERE id IN (%s) AND name = 'z' LIMIT 5"
+    ) == "SELECT * FROM main_host WHERE id IN (...) AND name = ? LIMIT ?"
+
+
+@pytest.mark.django_db
+@mock.patch('awx.main.dispatch.metrics.FLUSH_INTERVAL', 0)
+def test_request_metrics(get, admin, settings, inventory):
+    for i in range(12):
+        models.Host.objects.create(inventory=inventory, name='host-{}'.format(i))
+
+    recorder = QueryRecorder(statements=True)
+    with connection.execute_wrapper(recorder):
+        for host in models.Host.objects.all():
+            host.inventory.name  # N+1
+    assert recorder.count == 13
+    record_request('api:host_list', 0.5, recorder)
+
+    response = get(reverse('api:request_metrics_view'), user=admin, expect=200)
+    view = dict((v['view'], v) for v in response.data)['api:host_list']
+    assert view['node'] == settings.CLUSTER_HOST_ID
+    assert view['requests'] == view['sampled_requests'] == 1
+    assert view['mean_queries'] == 13
+    assert view['mean_seconds'] == 0.5
+    assert dict(view['request_seconds_buckets'])['0.25'] == 0
+    assert dict(view['request_seconds_buckets'])['0.5'] == 1
+    assert dict(view['request_seconds_buckets'])['+Inf'] == 1
+    assert dict(view['queries_buckets'])['10'] == 0
+    assert dict(view['queries_buckets'])['25'] == 1
+    assert view['queries'][0]['executions_per_request'] == 12
+    assert view['queries'][0]['repeated'] is True
+    assert 'FROM "main_inventory"' in view['queries'][0]['sql']
+    assert view['queries'][1]['repeated'] is False
+
+
+@pytest.mark.django_db
+@mock.patch('awx.main.dispatch.metrics.FLUSH_INTERVAL', 0)
+@mock.patch('awx.main.utils.request_metrics.MAX_STATEMENTS', 3)
+def test_request_metrics_statements_are_capped(get, admin, settings):
+    for i in range(5):
+        recorder = QueryRecorder(statements=True)
+        recorder.statements.update(dict(
+            ('SELECT * FROM table_{}_{}'.format(i, j), j + 1) for j in range(5)
+        ))
+        record_request('api:capped_list', 0.1, recorder)
+
+    # fingerprints are kept out of the series index
+    index = cache.get(INDEX_KEY.format('api', settings.CLUSTER_HOST_ID))
+    assert set(name for name, labels in index.values()) == set([
+        'requests', 'sampled_requests', 'request_seconds_bucket', 'request_seconds_sum',
+        'query_seconds_bucket', 'query_seconds_sum', 'queries_bucket', 'queries_sum',
+    ])
+    stored = cache.get(request_metrics._statements_key(settings.CLUSTER_HOST_ID, 'api:capped_list'))
+    assert len(stored) == 3
+
+    response = get(reverse('api:request_metrics_view'), user=admin, expect=200)
+    view = dict((v['view'], v) for v in response.data)['api:capped_list']
+    assert len(view['queries']) == 3
+
+
+@pytest.mark.django_db
+def test_sampled_requests_are_not_saved_to_disk(get, admin, settings):
+    settings.AWX_REQUEST_PROFILE_SAMPLE_RATE = 1
+    middleware = TimingMiddleware()
+    with mock.patch.object(middleware, 'save_profile_file') as save_profile_file:
+        response = get(reverse('api:request_metrics_view'), user=admin, middleware=middleware, expect=200)
+    save_profile_file.assert_not_called()
+    assert 'cprofile_file' not in response
+    assert middleware.queries.statements is not None
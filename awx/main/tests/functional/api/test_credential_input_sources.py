@@ -1,6 +1,7 @@
 import pytest
 
 from awx.main.models import CredentialInputSource
+from awx.main.utils import credential_lookups
 from awx.api.versioning import reverse
 
 
@@ -349,3 +350,30 @@ def test_create_credential_input_source_with_already_used_input_returns_400(post
     }]
     all_responses = [post(list_url, params, admin) for params in all_params]
     assert all_responses.pop().status_code == 400
+
+
+@pytest.mark.django_db
+def test_cached_external_secrets_dropped_on_change(vault_credential, external_credential):
+    key = (external_credential.pk, external_credential.modified, '{"key": "some_example_key"}')
+
+    credential_lookups._secrets[key] = (float('inf'), 'cached')
+    input_source = CredentialInputSource.objects.create(
+        target_credential=vault_credential,
+        source_credential=external_credential,
+        input_field_name='vault_password',
+        metadata={'key': 'some_example_key'}
+    )
+    assert key not in credential_lookups._secrets
+
+    credential_lookups._secrets[key] = (float('inf'), 'cached')
+    input_source.delete()
+    assert key not in credential_lookups._secrets
+
+    credential_lookups._secrets[key] = (float('inf'), 'cached')
+    external_credential.inputs['url'] = 'http://otherhost.com'
+    external_credential.save()
+    assert key not in credential_lookups._secrets
+
+    credential_lookups._secrets[key] = (float('inf'), 'cached')
+    external_credential.delete()
+    assert key not in credential_lookups._secrets
@@ -5,14 +5,16 @@ import pytest
 from crum import impersonate
 
 # Django
+from django.apps import apps
 from django.contrib.contenttypes.models import ContentType
 
 # AWX
 from awx.main.models import (
     UnifiedJobTemplate, Job, JobTemplate, WorkflowJobTemplate,
     WorkflowApprovalTemplate, Project, WorkflowJob, Schedule,
-    Credential
+    Credential, SystemJob, UnifiedJob
 )
+from awx.main.migrations import _task_impact
 
 
 @pytest.mark.django_db
@@ -283,11 +285,11 @@ class TestTaskImpact:
 
     def test_limit_task_impact(self, job_host_limit):
         job = job_host_limit(5, 2)
-        assert job.task_impact == 2 + 1  # forks becomes constraint
+        assert job._get_task_impact() == 2 + 1  # forks becomes constraint
 
     def test_host_task_impact(self, job_host_limit):
         job = job_host_limit(3, 5)
-        assert job.task_impact == 3 + 1  # hosts becomes constraint
+        assert job._get_task_impact() == 3 + 1  # hosts becomes constraint
 
     def test_shard_task_impact(self, slice_job_factory):
         # factory creates on host per slice
@@ -301,11 +303,30 @@ class TestTaskImpact:
             len(jobs[0].inventory.get_script_data(slice_number=i + 1, slice_count=3)['all']['hosts'])
             for i in range(3)
         ] == [1, 1, 1]
-        assert [job.task_impact for job in jobs] == [2, 2, 2]  # plus one base task impact
+        assert [job._get_task_impact() for job in jobs] == [2, 2, 2]  # plus one base task impact
         # Uneven distribution - first job takes the extra host
         jobs[0].inventory.hosts.create(name='remainder_foo')
         assert [
             len(jobs[0].inventory.get_script_data(slice_number=i + 1, slice_count=3)['all']['hosts'])
             for i in range(3)
         ] == [2, 1, 1]
-        assert [job.task_impact for job in jobs] == [3, 2, 2]
+        assert [job._get_task_impact() for job in jobs] == [3, 2, 2]
+
+    def test_task_impact_recorded_on_launch(self, job_host_limit):
+        job = job_host_limit(3, 5)
+        assert job.task_impact == 0
+        job.status = 'pending'
+        job.save(update_fields=['status'])
+        job.inventory.hosts.create(name='late_foo')
+        job.refresh_from_db()
+        assert job.task_impact == 3 + 1  # not recomputed after launch
+
+    def test_task_impact_migration(self, job_host_limit):
+        job = job_host_limit(3, 5)
+        system_job = SystemJob.objects.create()
+        UnifiedJob.objects.filter(pk__in=[job.pk, system_job.pk]).update(status='running')
+        _task_impact.record_active_task_impact(apps, None)
+        job.refresh_from_db()
+        system_job.refresh_from_db()
+        assert job.task_impact == 3 + 1
+        assert system_job.task_impact == 5
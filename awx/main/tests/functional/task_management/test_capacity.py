@@ -3,6 +3,7 @@ from django.test import TransactionTestCase
 from awx.main.models import (
     Instance,
     InstanceGroup,
+    SystemJob,
 )
 
 
@@ -29,3 +30,25 @@ class TestCapacityMapping(TransactionTestCase):
         assert ig_map['ig_small'] == set(['ig_small'])
         assert ig_map['ig_large'] == set(['ig_large', 'tower'])
         assert ig_map['tower'] == set(['ig_large', 'tower'])
+
+
+    def test_capacity_usage(self):
+        self.sample_cluster()
+        SystemJob.objects.create(status='running', execution_node='i1')
+        SystemJob.objects.create(status='waiting', execution_node='i1')
+        SystemJob.objects.create(status='successful', execution_node='i2')
+        with self.assertNumQueries(1):
+            usage = Instance.objects.capacity_usage()
+        assert usage == {'i1': (10, 2)}
+
+    def test_instance_capacity_is_not_cached(self):
+        self.sample_cluster()
+        instance = Instance.objects.get(hostname='i1')
+        assert (instance.consumed_capacity, instance.jobs_running) == (0, 0)
+        SystemJob.objects.create(status='running', execution_node='i1')
+        assert (instance.consumed_capacity, instance.jobs_running) == (5, 1)
+
+        # the task manager tracks usage in memory during a cycle
+        instance.consumed_capacity, instance.jobs_running = 20, 2
+        assert instance.remaining_capacity == 180
+        assert instance.jobs_running == 2
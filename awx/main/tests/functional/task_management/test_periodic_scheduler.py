@@ -0,0 +1,74 @@
+from datetime import timedelta
+from unittest import mock
+
+import pytest
+from django.utils.timezone import now
+
+from awx.main.models import Schedule, TowerScheduleState, UnifiedJob
+from awx.main.scheduler.periodic import schedule_index
+from awx.main.tasks import awx_periodic_scheduler
+
+
+RRULE = 'DTSTART;TZID=UTC:20190101T000000 RRULE:FREQ=DAILY;INTERVAL=1'
+
+
+@pytest.fixture
+def schedules(job_template_factory):
+    jt = job_template_factory('jt', organization='org1', project='proj', inventory='inv').job_template
+    return [Schedule.objects.create(name='s{}'.format(i), unified_job_template=jt, rrule=RRULE) for i in range(3)]
+
+
+@pytest.mark.django_db
+@mock.patch('awx.main.tasks.emit_channel_notification')
+@mock.patch('awx.main.models.schedules.emit_channel_notification')
+def test_only_due_schedules_are_processed(emit_schedule, emit_task, schedules):
+    due, missed, future = schedules
+    last_run = now() - timedelta(minutes=1)
+    TowerScheduleState.get_solo()
+    TowerScheduleState.objects.update(schedule_last_run=last_run)
+    Schedule.objects.filter(pk=due.pk).update(next_run=last_run + timedelta(seconds=30))
+    Schedule.objects.filter(pk=missed.pk).update(next_run=last_run - timedelta(days=1))
+    schedule_index.reset()
+
+    awx_periodic_scheduler()
+
+    assert [j.schedule_id for j in UnifiedJob.objects.all()] == [due.pk]
+    for schedule in schedules:
+        schedule.refresh_from_db()
+        assert schedule.next_run > now()
+        assert schedule_index.entries[schedule.pk] == schedule.next_run
+
+
+@pytest.mark.django_db
+def test_schedule_index_is_rebuilt_on_save(schedules):
+    schedule_index.refresh()
+    schedule = schedules[0]
+    schedule.enabled = False
+    schedule.save()
+
+    schedule_index.refresh()
+    assert schedule.pk not in schedule_index.entries
+    assert schedule_index.pop_due(now() + timedelta(days=2)) == sorted(s.pk for s in schedules[1:])
+
+
+@pytest.mark.django_db
+@mock.patch('awx.main.tasks.emit_channel_notification')
+@mock.patch('awx.main.models.schedules.emit_channel_notification')
+def test_schedule_created_after_index_load_is_launched(emit_schedule, emit_task, schedules):
+    last_run = now() - timedelta(minutes=1)
+    TowerScheduleState.get_solo()
+    TowerScheduleState.objects.update(schedule_last_run=last_run)
+    schedule_index.reset()
+    schedule_index.refresh()
+
+    # created without Schedule.save, so that only the database shows it (as
+    # for a schedule created through the API of another node)
+    Schedule.objects.bulk_create([Schedule(
+        name='new', unified_job_template=schedules[0].unified_job_template, rrule=RRULE,
+        next_run=last_run + timedelta(seconds=30), created=now(), modified=now()
+    )])
+    schedule = Schedule.objects.get(name='new')
+
+    awx_periodic_scheduler()
+
+    assert [j.schedule_id for j in UnifiedJob.objects.all()] == [schedule.pk]
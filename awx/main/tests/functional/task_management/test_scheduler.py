@@ -4,8 +4,10 @@ import json
 from datetime import timedelta
 
 from awx.main.scheduler import TaskManager
+from awx.main.scheduler.dag_workflow import WorkflowDAG
+from awx.main.scheduler.task_manager import workflow_dag_cache
 from awx.main.utils import encrypt_field
-from awx.main.models import WorkflowJobTemplate, JobTemplate
+from awx.main.models import WorkflowJobTemplate, JobTemplate, WorkflowApprovalTemplate
 
 
 @pytest.mark.django_db
@@ -110,6 +112,56 @@ class TestJobLifeCycle:
                 self.run_tm(tm, expect_schedule=[mock.call()])
             wfjts[0].refresh_from_db()
 
+    def test_task_manager_workflow_approval_node(self):
+        wfjt = WorkflowJobTemplate.objects.create(name='foo')
+        approval_template = WorkflowApprovalTemplate.objects.create(name='approve me')
+        wfjt.workflow_nodes.create(unified_job_template=approval_template)
+        wj = wfjt.create_unified_job()
+        wj.signal_start()
+        tm = TaskManager()
+
+        self.run_tm(tm)  # workflow job starts running
+        self.run_tm(tm)  # spawns the approval
+        approval = approval_template.approvals.get()
+        assert approval.status == 'pending'
+        assert approval.task_impact == 0
+
+        approval.approve()
+        self.run_tm(tm)
+        wj.refresh_from_db()
+        assert wj.status == 'successful'
+
+    def test_task_manager_workflow_graph_cached(self, inventory, project, default_instance_group):
+        jt = JobTemplate.objects.create(
+            allow_simultaneous=True,
+            inventory=inventory,
+            project=project,
+            playbook='helloworld.yml'
+        )
+        wfjt = WorkflowJobTemplate.objects.create(name='foo')
+        first = wfjt.workflow_nodes.create(unified_job_template=jt)
+        first.success_nodes.add(wfjt.workflow_nodes.create(unified_job_template=jt))
+        wj = wfjt.create_unified_job()
+        wj.signal_start()
+        workflow_dag_cache.clear()
+        tm = TaskManager()
+
+        with mock.patch.object(WorkflowDAG, '_init_graph', autospec=True, side_effect=WorkflowDAG._init_graph) as init_graph:
+            self.run_tm(tm)  # workflow job starts running
+            self.run_tm(tm)  # spawns the first job
+            assert jt.jobs.count() == 1
+            self.run_tm(tm)
+            self.run_tm(tm)
+            assert jt.jobs.count() == 1
+
+            for job in jt.jobs.all():
+                job.status = 'successful'
+                job.save()
+            self.run_tm(tm)  # spawns the second job
+            assert jt.jobs.count() == 2
+
+        assert init_graph.call_count == 1
+
 
 @pytest.mark.django_db
 def test_single_jt_multi_job_launch_blocks_last(default_instance_group, job_template_factory, mocker):
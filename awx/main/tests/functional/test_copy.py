@@ -1,8 +1,12 @@
 import pytest
 from unittest import mock
 
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
 from awx.api.versioning import reverse
 from awx.main.utils import decrypt_field
+from awx.main.models.inventory import Host, Group
 from awx.main.models.workflow import (
     WorkflowJobTemplate, WorkflowJobTemplateNode, WorkflowApprovalTemplate
 )
@@ -135,6 +139,37 @@ def test_inventory_copy(inventory, group_factory, post, get, alice, organization
     assert set(group_2_2_copy.hosts.all()) == set()
 
 
+@pytest.mark.django_db
+def test_inventory_copy_relationships_in_bulk(inventory, group_factory, organization, alice):
+    parent, child = group_factory('parent'), group_factory('child')
+    child.parents.add(parent)
+    for i in range(20):
+        host = Host.objects.create(name='host-{}'.format(i), inventory=inventory)
+        parent.hosts.add(host)
+        child.hosts.add(host)
+    inventory_copy = type(inventory).objects.create(name='copy', organization=organization)
+    sub_objs = [
+        (type(sub_obj).__module__, type(sub_obj).__name__, sub_obj.pk)
+        for sub_obj in list(inventory.hosts.all()) + list(inventory.groups.all())
+    ]
+    with mock.patch.object(Host, 'save') as host_save, CaptureQueriesContext(connection) as ctx:
+        deep_copy_model_obj(
+            'awx.main.models.inventory', 'Inventory', inventory.pk, inventory_copy.pk, alice.pk, sub_objs
+        )
+    host_save.assert_not_called()
+    # every relationship of the copied hosts and groups is inserted at once,
+    # however many of them there are
+    inserts = [q['sql'] for q in ctx.captured_queries if q['sql'].startswith('INSERT INTO "main_group_')]
+    assert len(inserts) == 2
+    parent_copy = inventory_copy.groups.get(name='parent')
+    child_copy = inventory_copy.groups.get(name='child')
+    assert set(child_copy.parents.all()) == set([parent_copy])
+    assert set(parent_copy.hosts.all()) == set(inventory_copy.hosts.all())
+    assert set(child_copy.hosts.all()) == set(inventory_copy.hosts.all())
+    assert inventory_copy.hosts.count() == 20
+    assert Group.objects.filter(hosts__inventory=inventory).distinct().count() == 2
+
+
 @pytest.mark.django_db
 def test_workflow_job_template_copy(workflow_job_template, post, get, admin, organization):
     workflow_job_template.organization = organization
@@ -3,16 +3,19 @@ import multiprocessing
 import random
 import signal
 import time
+from queue import Full as QueueFull
 from unittest import mock
 
+from django.db.models.query import QuerySet
 from django.utils.timezone import now as tz_now
 import pytest
 
 from awx.main.models import Job, WorkflowJob, Instance
 from awx.main.dispatch import reaper
-from awx.main.dispatch.pool import PoolWorker, WorkerPool, AutoscalePool
-from awx.main.dispatch.publish import task
+from awx.main.dispatch.pool import PoolWorker, WorkerPool, AffinityPool, AutoscalePool
+from awx.main.dispatch.publish import task, Publisher, COMPRESSION_THRESHOLD
 from awx.main.dispatch.worker import BaseWorker, TaskWorker
+from awx.main.tasks import handle_reaped_jobs
 
 
 def restricted(a, b):
@@ -72,7 +75,8 @@ class TestPoolWorker:
         self.worker = PoolWorker(1000, self.tick, tuple())
 
     def tick(self):
-        self.worker.finished.put(self.worker.queue.get()['uuid'])
+        self.worker.queue.get()
+        self.worker.finished.value += 1
         time.sleep(.5)
 
     def test_qsize(self):
@@ -113,6 +117,25 @@ class TestPoolWorker:
         assert self.worker.busy is True
         assert self.worker.idle is False
 
+    def test_idle_after_finished(self):
+        self.worker.put({'task': 'abc123'})
+        self.worker.put({'task': 'abc456'})
+        self.tick()
+        assert self.worker.busy is True
+        assert self.worker.current_task['task'] == 'abc456'
+        self.tick()
+        assert self.worker.idle is True
+        assert self.worker.current_task is None
+        assert self.worker.messages_finished == 2
+
+    def test_undelivered_message_is_not_managed(self):
+        self.worker.queue = mock.Mock(**{'put.side_effect': QueueFull})
+        with pytest.raises(QueueFull):
+            self.worker.put({'task': 'abc123'})
+        assert len(self.worker.managed_tasks) == 0
+        assert self.worker.messages_sent == 0
+        assert self.worker.idle is True
+
 
 @pytest.mark.django_db
 class TestWorkerPool:
@@ -163,6 +186,79 @@ class TestWorkerPool:
         assert total_handled == 10
 
 
+@pytest.mark.usefixtures("disable_database_settings")
+class TestAffinityPool:
+
+    def setup_method(self, test_method):
+        self.pool = AffinityPool(
+            min_workers=3,
+            affinity_key=lambda body: body.get('job_id'),
+            rebalance_threshold=2
+        )
+        # workers are never started, so nothing they're sent is finished
+        self.pool.workers = [PoolWorker(1000, None, tuple()) for i in range(3)]
+
+    def test_same_key_same_worker(self):
+        assert self.pool.write(2, {'job_id': 1}) == 0
+        assert self.pool.write(2, {'job_id': 1}) == 0
+        assert self.pool.workers[0].depth == 2
+
+    def test_new_key_least_loaded_worker(self):
+        self.pool.write(0, {'job_id': 1})
+        assert self.pool.write(0, {'job_id': 2}) == 1
+        assert self.pool.write(0, {'job_id': 3}) == 2
+        assert self.pool.write(0, {'job_id': 1}) == 0
+
+    def test_no_key_preferred_worker(self):
+        assert self.pool.write(2, {'task': 'abc123'}) == 2
+        assert self.pool.assignments == {}
+
+    def test_rebalance(self):
+        assert self.pool.write(0, {'job_id': 1}) == 0
+        worker = self.pool.workers[0]
+        worker.finished.value += 1
+        for i in range(3):
+            worker.put({'job_id': 2})
+        assert self.pool.rebalanced == 0
+
+        # worker 0 is now more than 2 messages behind the other workers, and
+        # has finished every message for job 1
+        assert self.pool.write(0, {'job_id': 1}) == 1
+        assert self.pool.write(0, {'job_id': 1}) == 1
+        assert self.pool.rebalanced == 1
+        assert self.pool.assignments[1] == (1, 2)
+
+    def test_no_rebalance_in_flight(self):
+        # messages for a key are never handled by two workers at once
+        for i in range(5):
+            assert self.pool.write(0, {'job_id': 1}) == 0
+        assert self.pool.rebalanced == 0
+
+    def test_forget_idle_keys(self):
+        self.pool.max_assignments = 2
+        for job_id in (1, 2, 3):
+            self.pool.write(0, {'job_id': job_id})
+        # every key is in flight, so none of them are forgotten
+        assert list(self.pool.assignments) == [1, 2, 3]
+
+        self.pool.workers[0].finished.value += 1
+        self.pool.write(0, {'job_id': 4})
+        assert list(self.pool.assignments) == [2, 3, 4]
+
+    def test_depth_and_lag(self):
+        worker = self.pool.workers[0]
+        assert worker.lag == 0.0
+        self.pool.write(0, {'job_id': 1})
+        self.pool.write(0, {'job_id': 1})
+        assert worker.depth == 2
+        assert len(worker.delivered_at) == 2
+        assert worker.lag >= 0
+
+        worker.finished.value += 2
+        assert worker.depth == 0
+        assert worker.lag == 0.0
+
+
 @pytest.mark.django_db
 class TestAutoScaling:
 
@@ -357,6 +453,57 @@ class TestTaskPublisher:
 yesterday = tz_now() - datetime.timedelta(days=1)
 
 
+@mock.patch('awx.main.dispatch.publish.Producer')
+@mock.patch('awx.main.dispatch.publish.Connection')
+class TestPublisher:
+
+    def test_connection_is_reused(self, Connection, Producer):
+        publisher = Publisher()
+        publisher.publish({'task': 'abc123'}, 'some-queue')
+        publisher.publish({'task': 'abc123'}, 'some-queue')
+        assert Connection.call_count == 1
+        assert Producer.return_value.publish.call_count == 2
+
+    def test_reconnect_after_fork(self, Connection, Producer):
+        publisher = Publisher()
+        publisher.publish({'task': 'abc123'}, 'some-queue')
+        publisher.pid = -1  # pretend this happened in the parent process
+        publisher.publish({'task': 'abc123'}, 'some-queue')
+        assert Connection.call_count == 2
+        Connection.return_value.release.assert_not_called()
+
+    def test_reconnect_after_error(self, Connection, Producer):
+        publisher = Publisher()
+        Producer.return_value.publish.side_effect = IOError
+        with pytest.raises(IOError):
+            publisher.publish({'task': 'abc123'}, 'some-queue')
+        Connection.return_value.release.assert_called_once_with()
+
+        Producer.return_value.publish.side_effect = None
+        publisher.publish({'task': 'abc123'}, 'some-queue')
+        assert Connection.call_count == 2
+
+    def test_exchanges_are_cached(self, Connection, Producer):
+        publisher = Publisher()
+        publisher.publish({'task': 'abc123'}, 'some-queue')
+        publisher.publish({'task': 'abc123'}, 'some-queue')
+        publisher.publish({'task': 'abc123'}, 'broadcast', exchange_type='fanout')
+        assert len(publisher.exchanges) == 2
+        exchanges = [c[1]['exchange'] for c in Producer.return_value.publish.call_args_list]
+        assert exchanges[0] is exchanges[1]
+        assert exchanges[2].type == 'fanout'
+
+    @pytest.mark.parametrize('size, compression', [
+        (10, None),
+        (COMPRESSION_THRESHOLD, 'zlib'),
+    ])
+    def test_compression_by_size(self, Connection, Producer, size, compression):
+        Publisher().publish({'args': ['x' * size]}, 'some-queue')
+        kwargs = Producer.return_value.publish.call_args[1]
+        assert kwargs['compression'] == compression
+        assert kwargs['content_type'] == 'application/json'
+
+
 @pytest.mark.django_db
 class TestJobReaper(object):
 
@@ -419,6 +566,24 @@ class TestJobReaper(object):
         else:
             assert job.status == 'running'
 
+    def test_only_orphaned_jobs_are_locked(self):
+        i = Instance(hostname='awx')
+        i.save()
+        healthy = Job.objects.create(status='running', execution_node='awx', celery_task_id='abc123')
+        orphaned = Job.objects.create(status='running', execution_node='awx', celery_task_id='def456')
+
+        locked = []
+
+        def select_for_update(qs, *args, **kwargs):
+            locked.extend(qs.values_list('pk', flat=True))
+            return qs
+
+        with mock.patch.object(QuerySet, 'select_for_update', autospec=True, side_effect=select_for_update):
+            reaper.reap(i, excluded_uuids=['abc123'])
+        assert locked == [orphaned.pk]
+        assert Job.objects.get(pk=healthy.pk).status == 'running'
+        assert Job.objects.get(pk=orphaned.pk).status == 'failed'
+
     def test_workflow_does_not_reap(self):
         i = Instance(hostname='awx')
         i.save()
@@ -430,3 +595,32 @@ class TestJobReaper(object):
         reaper.reap(i)
 
         assert WorkflowJob.objects.first().status == 'running'
+
+    def test_reap_in_bulk(self):
+        i = Instance(hostname='awx')
+        i.save()
+        started = tz_now() - datetime.timedelta(minutes=5)
+        jobs = [
+            Job.objects.create(status='running', execution_node='awx', start_args='SENSITIVE', started=started)
+            for _ in range(3)
+        ]
+        with mock.patch.object(reaper, 'REAP_BATCH_SIZE', 2), \
+                mock.patch('awx.main.tasks.handle_reaped_jobs.delay') as delay:
+            reaper.reap(i)
+        assert [c[0] for c in delay.call_args_list] == [
+            ([jobs[0].pk, jobs[1].pk], 'failed'),
+            ([jobs[2].pk], 'failed'),
+        ]
+        for job in Job.objects.all():
+            assert job.status == 'failed'
+            assert job.failed is True
+            assert job.finished is not None
+            assert job.start_args == ''
+            assert 'marked as failed' in job.job_explanation
+
+        with mock.patch.object(Job, 'websocket_emit_status') as emit, \
+                mock.patch('awx.main.tasks.schedule_task_manager') as schedule_task_manager:
+            handle_reaped_jobs([job.pk for job in jobs], 'failed')
+        assert emit.call_count == 3
+        schedule_task_manager.assert_called_once_with()
+        assert Job.objects.filter(elapsed__gte=300).count() == 3
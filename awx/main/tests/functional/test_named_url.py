@@ -2,9 +2,11 @@ import pytest
 
 from django.core.exceptions import ImproperlyConfigured
 from django.conf import settings
+from django.http import Http404
 
 from awx.api.versioning import reverse
 from awx.main.middleware import URLModificationMiddleware
+from awx.main.utils.named_url_graph import get_named_url
 from awx.main.models import (  # noqa
     Credential, CustomInventoryScript, Group, Host, Instance, InstanceGroup,
     Inventory, InventorySource, JobTemplate, NotificationTemplate,
@@ -199,3 +201,45 @@ def test_credential(get, admin_user, credentialtype_ssh):
     url = reverse('api:credential_detail', kwargs={'pk': test_cred.pk})
     response = get(url, user=admin_user, expect=200)
     assert response.data['related']['named_url'].endswith('/test_cred++Machine+ssh++/')
+
+
+@pytest.mark.django_db
+def test_named_url_cache_invalidated_on_save(django_assert_num_queries):
+    node = settings.NAMED_URL_GRAPH[Inventory]
+    test_org = Organization.objects.create(name='test_org')
+    test_inv = Inventory.objects.create(name='test_inv', organization=test_org)
+    other_inv = Inventory.objects.create(name='other_inv', organization=test_org)
+    assert get_named_url(node, Inventory.objects.get(pk=test_inv.pk)) == 'test_inv++test_org'
+    test_inv = Inventory.objects.get(pk=test_inv.pk)
+    with django_assert_num_queries(0):
+        assert get_named_url(node, test_inv) == 'test_inv++test_org'
+
+    # saving another object of the same model keeps the entry
+    other_inv.save()
+    with django_assert_num_queries(0):
+        assert get_named_url(node, test_inv) == 'test_inv++test_org'
+
+    # renaming the organization changes the named URL of the inventory
+    test_org.name = 'new_org'
+    test_org.save()
+    assert get_named_url(node, Inventory.objects.get(pk=test_inv.pk)) == 'test_inv++new_org'
+
+    # renames which don't send signals (e.g., made on another node) are seen too
+    Inventory.objects.filter(pk=test_inv.pk).update(name='new_inv')
+    assert get_named_url(node, Inventory.objects.get(pk=test_inv.pk)) == 'new_inv++new_org'
+
+
+@pytest.mark.django_db
+def test_named_url_resolved_after_user_rename():
+    middleware = URLModificationMiddleware.__new__(URLModificationMiddleware)
+    test_user = User.objects.create(username='test_user')
+    assert middleware._convert_named_url('/api/v2/users/test_user/') == '/api/v2/users/{}/'.format(test_user.pk)
+
+    test_user.username = 'new_user'
+    test_user.save()
+    assert middleware._convert_named_url('/api/v2/users/new_user/') == '/api/v2/users/{}/'.format(test_user.pk)
+    with pytest.raises(Http404):
+        middleware._convert_named_url('/api/v2/users/test_user/')
+
+    other_user = User.objects.create(username='test_user')
+    assert middleware._convert_named_url('/api/v2/users/test_user/') == '/api/v2/users/{}/'.format(other_user.pk)
@@ -0,0 +1,62 @@
+"""
+Measure how many messages per second can be handed to dispatcher workers
+through WorkerPool.write (as the callback receiver does) and
+AutoscalePool.write (as the task dispatcher does).
+
+    $ awx-python awx/main/tests/manual/benchmarks/dispatch_pool.py [messages]
+"""
+import os
+import sys
+import time
+from uuid import uuid4
+
+
+def run(pool_cls, workers, messages):
+    from awx.main.dispatch.pool import AutoscalePool
+    from awx.main.dispatch.worker import BaseWorker
+
+    class NoopWorker(BaseWorker):
+
+        def perform_work(self, body):
+            pass
+
+    kwargs = dict(min_workers=workers, queue_size=messages)
+    if pool_cls is AutoscalePool:
+        kwargs['max_workers'] = workers
+    pool = pool_cls(**kwargs)
+    pool.init_workers(NoopWorker().work_loop)
+    bodies = [
+        {'uuid': str(uuid4()), 'task': 'awx.main.tasks.noop', 'args': [i]}
+        for i in range(messages)
+    ]
+    try:
+        start = time.time()
+        for i, body in enumerate(bodies):
+            pool.write(i % workers, body)
+        written = time.time() - start
+        while sum(w.finished.value for w in pool.workers) < messages:
+            time.sleep(.01)
+        drained = time.time() - start
+    finally:
+        for w in pool.workers:
+            w.quit()
+    return messages / written, messages / drained
+
+
+def main(messages):
+    from awx.main.dispatch.pool import WorkerPool, AutoscalePool
+
+    print('{:<14} {:>8} {:>16} {:>16}'.format('pool', 'workers', 'write msg/s', 'handled msg/s'))
+    for pool_cls in (WorkerPool, AutoscalePool):
+        for workers in (4, 16, 64):
+            written, drained = run(pool_cls, workers, messages)
+            print('{:<14} {:>8} {:>16.0f} {:>16.0f}'.format(
+                pool_cls.__name__, workers, written, drained
+            ))
+
+
+if __name__ == '__main__':
+    import django
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'awx.settings.development')
+    django.setup()
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
@@ -0,0 +1,83 @@
+"""
+Measure the cost of the periodic scheduler with many schedules: building the
+schedule index, finding the due schedules on each tick, and computing the
+next run of a schedule with and without the compiled rrule cache.
+
+The schedules are created (and deleted afterwards) for a throwaway job
+template in the development database.
+
+    $ awx-python awx/main/tests/manual/benchmarks/periodic_scheduler.py [schedules]
+"""
+import os
+import sys
+import time
+from datetime import timedelta
+
+
+def timed(fn, repeat=1):
+    start = time.time()
+    for _ in range(repeat):
+        result = fn()
+    return (time.time() - start) / repeat, result
+
+
+def main(count):
+    from django.utils.timezone import now
+    from awx.main.models import JobTemplate, Schedule
+    from awx.main.models import schedules as schedule_models
+    from awx.main.scheduler.periodic import ScheduleIndex
+
+    rrules = [
+        'DTSTART;TZID=America/New_York:20190101T{:02d}{:02d}00 RRULE:FREQ=DAILY;INTERVAL=1'.format(i // 60 % 24, i % 60)
+        for i in range(1440)
+    ]
+    base = now()
+    jt = JobTemplate.objects.create(name='periodic-scheduler-benchmark-{}'.format(base.timestamp()))
+    try:
+        Schedule.objects.bulk_create([
+            Schedule(
+                name='s{}'.format(i), unified_job_template=jt, rrule=rrules[i % len(rrules)],
+                created=base, modified=base, next_run=base + timedelta(seconds=i * 86400 // count)
+            )
+            for i in range(count)
+        ], batch_size=1000)
+
+        index = ScheduleIndex()
+        elapsed, _ = timed(index.load)
+        print('{:<40} {:>10.3f}s'.format('build index ({} schedules)'.format(count), elapsed))
+
+        # one 30 second tick of the scheduler, a day from now
+        tick = base + timedelta(days=1)
+        index.pop_due(tick - timedelta(seconds=30))
+        elapsed, due = timed(lambda: index.pop_due(tick))
+        print('{:<40} {:>10.6f}s ({} due)'.format('find due schedules (index)', elapsed, len(due)))
+        elapsed, due = timed(lambda: list(Schedule.objects.enabled().between(tick - timedelta(seconds=30), tick)), repeat=10)
+        print('{:<40} {:>10.6f}s ({} due)'.format('find due schedules (query)', elapsed, len(due)))
+
+        schedules = list(Schedule.objects.filter(unified_job_template=jt)[:200])
+        for cached in (False, True):
+            schedule_models._compile_rrule.cache_clear()
+            if cached:
+                for schedule in schedules:
+                    schedule.update_computed_fields_no_save()
+
+            def compute():
+                for schedule in schedules:
+                    if not cached:
+                        schedule_models._compile_rrule.cache_clear()
+                    schedule.update_computed_fields_no_save()
+            elapsed, _ = timed(compute)
+            print('{:<40} {:>10.3f}s'.format(
+                'compute next run x{} ({})'.format(len(schedules), 'cached rrules' if cached else 'parsed rrules'),
+                elapsed
+            ))
+    finally:
+        Schedule.objects.filter(unified_job_template=jt).delete()
+        jt.delete()
+
+
+if __name__ == '__main__':
+    import django
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'awx.settings.development')
+    django.setup()
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10000)
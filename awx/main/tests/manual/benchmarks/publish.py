@@ -0,0 +1,68 @@
+"""
+Compare task publishes per second using a new broker connection for every
+message (how tasks used to be published) with the per-process Publisher.
+
+Requires a running broker at settings.BROKER_URL; messages are published to
+a throwaway queue which is deleted afterwards.
+
+    $ awx-python awx/main/tests/manual/benchmarks/publish.py [messages]
+"""
+import os
+import sys
+import time
+from uuid import uuid4
+
+QUEUE = 'awx_publish_benchmark'
+
+
+def connection_per_message(obj):
+    from django.conf import settings
+    from kombu import Exchange, Producer
+    from awx.main.dispatch.kombu import Connection
+
+    with Connection(settings.BROKER_URL) as conn:
+        exchange = Exchange(QUEUE, type='direct')
+        producer = Producer(conn)
+        producer.publish(obj,
+                         serializer='json',
+                         compression='bzip2',
+                         exchange=exchange,
+                         declare=[exchange],
+                         delivery_mode="persistent",
+                         routing_key=QUEUE)
+
+
+def persistent_publisher(obj):
+    from awx.main.dispatch.publish import publisher
+    publisher.publish(obj, QUEUE)
+
+
+def main(messages):
+    from django.conf import settings
+    from kombu import Exchange, Queue
+    from awx.main.dispatch.kombu import Connection
+
+    with Connection(settings.BROKER_URL) as conn:
+        queue = Queue(QUEUE, Exchange(QUEUE, type='direct'), routing_key=QUEUE)
+        queue(conn.default_channel).declare()
+        try:
+            for fn in (connection_per_message, persistent_publisher):
+                start = time.time()
+                for i in range(messages):
+                    fn({
+                        'uuid': str(uuid4()),
+                        'args': [i],
+                        'kwargs': {},
+                        'task': 'awx.main.tasks.update_inventory_computed_fields',
+                    })
+                elapsed = time.time() - start
+                print('{:<24} {:>10.0f} publishes/s'.format(fn.__name__, messages / elapsed))
+        finally:
+            queue(conn.default_channel).delete()
+
+
+if __name__ == '__main__':
+    import django
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'awx.settings.development')
+    django.setup()
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
@@ -97,6 +97,40 @@ class TestWorkflowJobInheritNodesMixin():
             for i in range(0, 8):
                 node_ids_map[i].success_nodes.add.assert_any_call(node_ids_map[i + 1])
 
+    class TestBulkCreateWorkflowJobNodes():
+        @pytest.fixture
+        def job_template_nodes(self, mocker, credential):
+            nodes = [mocker.MagicMock(id=i, pk=i) for i in range(0, 3)]
+            for i, node in enumerate(nodes):
+                node._get_workflow_job_node_kwargs.return_value = {}
+                node.credentials.all.return_value = [credential] if i == 0 else []
+                node.always_nodes.all.return_value = []
+                node.failure_nodes.all.return_value = []
+                node.success_nodes.all.return_value = nodes[i + 1:i + 2]
+            return nodes
+
+        def test_one_insert_per_table(self, mocker, job_template_nodes, credential):
+            def assign_ids(new_nodes):
+                for i, node in enumerate(new_nodes):
+                    node.id = 100 + i
+
+            mocker.patch('awx.main.models.workflow.connection.features.can_return_ids_from_bulk_insert', True)
+            node_create = mocker.patch('awx.main.models.workflow.WorkflowJobNode.objects.bulk_create', side_effect=assign_ids)
+            inserts = {}
+            for relationship in ('credentials', 'success_nodes', 'failure_nodes', 'always_nodes'):
+                through = getattr(WorkflowJobNode, relationship).through
+                inserts[relationship] = mocker.patch.object(through.objects, 'bulk_create')
+
+            WorkflowJob()._bulk_create_workflow_job_nodes(job_template_nodes)
+
+            assert node_create.call_count == 1
+            assert len(node_create.call_args[0][0]) == 3
+            rows = inserts['success_nodes'].call_args[0][0]
+            assert [(r.from_workflowjobnode_id, r.to_workflowjobnode_id) for r in rows] == [(100, 101), (101, 102)]
+            rows = inserts['credentials'].call_args[0][0]
+            assert [(r.workflowjobnode_id, r.credential_id) for r in rows] == [(100, credential.pk)]
+            assert inserts['failure_nodes'].call_args[0][0] == []
+
 
 @pytest.fixture
 def workflow_job_unit():
@@ -0,0 +1,59 @@
+from unittest import mock
+
+import pytest
+from django.core.cache import cache
+
+from awx.main.dispatch.metrics import WorkerMetrics, get_node_metrics, report_pool
+
+
+@pytest.fixture(autouse=True)
+def node(settings):
+    settings.CLUSTER_HOST_ID = 'awx-1'
+    return 'awx-1'
+
+
+def test_worker_metrics_accumulate_across_processes():
+    for _ in range(2):
+        # e.g., two worker processes on the same node
+        metrics = WorkerMetrics()
+        metrics.inc('events_saved', event='runner_on_ok')
+        metrics.observe('event_save_seconds', 0.02)
+        metrics.flush(force=True)
+
+    series, _ = get_node_metrics('awx-1')
+    assert series[('events_saved', (('event', 'runner_on_ok'),))] == 2
+    assert series[('event_save_seconds_bucket', (('le', '0.025'),))] == 2
+    assert series[('event_save_seconds_sum', ())] == 40000
+
+
+def test_worker_metrics_flush_is_rate_limited():
+    metrics = WorkerMetrics()
+    metrics.inc('events_saved', event='runner_on_ok')
+    metrics.flush()
+    assert get_node_metrics('awx-1')[0] == {}
+    metrics.flush(force=True)
+    assert len(get_node_metrics('awx-1')[0]) == 1
+
+
+def test_lost_index_is_repaired():
+    metrics = WorkerMetrics()
+    metrics.inc('events_saved', event='runner_on_ok')
+    metrics.flush(force=True)
+    cache.delete('awx-dispatch-metrics-awx-1-index')
+
+    metrics.last_index_check = 0
+    metrics.inc('events_saved', event='runner_on_ok')
+    metrics.flush(force=True)
+    assert get_node_metrics('awx-1')[0] == {('events_saved', (('event', 'runner_on_ok'),)): 2}
+
+
+def test_report_pool():
+    worker = mock.Mock(pid=123, depth=3, lag=1.5)
+    worker.finished.value = 10
+    pool = mock.Mock(workers=[worker], scaled_up=2, scaled_down=1)
+    with mock.patch('awx.main.dispatch.metrics._last_pool_report', {}):
+        report_pool('dispatcher', pool)
+
+    _, pools = get_node_metrics('awx-1')
+    assert pools['dispatcher']['workers'] == [{'pid': 123, 'messages_finished': 10, 'depth': 3, 'lag': 1.5}]
+    assert pools['dispatcher']['scaled_up'] == 2
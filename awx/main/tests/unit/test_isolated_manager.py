@@ -0,0 +1,71 @@
+import json
+from unittest import mock
+
+import pytest
+
+from awx.main.isolated.manager import IsolatedManager
+
+
+@pytest.fixture
+def manager(tmpdir):
+    mgr = IsolatedManager()
+    mgr.private_data_dir = tmpdir.strpath
+    mgr.instance = mock.Mock(id=42)
+    mgr.event_data_key = 'job_id'
+    mgr.handled_events = 0
+    mgr.events_offset = 0
+    return mgr
+
+
+def write_events(manager, *lines):
+    with open(manager.path_to('job_events.log'), 'a') as f:
+        for line in lines:
+            f.write(line)
+
+
+class TestConsumeEvents:
+
+    def test_no_event_log_yet(self, manager):
+        dispatcher = mock.Mock()
+        manager.consume_events(dispatcher)
+        dispatcher.dispatch.assert_not_called()
+        dispatcher.flush.assert_called_once_with()
+
+    def test_only_new_events_are_dispatched(self, manager):
+        dispatcher = mock.Mock()
+        write_events(manager, json.dumps({'counter': 1}) + '\n')
+        manager.consume_events(dispatcher)
+        write_events(manager, json.dumps({'counter': 2}) + '\n')
+        manager.consume_events(dispatcher)
+        assert [c[0][0] for c in dispatcher.dispatch.call_args_list] == [
+            {'counter': 1, 'job_id': 42},
+            {'counter': 2, 'job_id': 42},
+        ]
+        assert manager.handled_events == 2
+
+    def test_partial_line_is_read_again(self, manager):
+        dispatcher = mock.Mock()
+        event = json.dumps({'counter': 1}) + '\n'
+        write_events(manager, event[:5])
+        manager.consume_events(dispatcher)
+        dispatcher.dispatch.assert_not_called()
+        assert manager.events_offset == 0
+
+        write_events(manager, event[5:])
+        manager.consume_events(dispatcher)
+        dispatcher.dispatch.assert_called_once_with({'counter': 1, 'job_id': 42})
+        assert manager.events_offset == len(event)
+
+    def test_malformed_event_is_skipped(self, manager):
+        dispatcher = mock.Mock()
+        write_events(manager, '{"counter": \n', json.dumps({'counter': 2}) + '\n')
+        manager.consume_events(dispatcher)
+        dispatcher.dispatch.assert_called_once_with({'counter': 2, 'job_id': 42})
+        assert manager.handled_events == 1
+
+    def test_artifacts_are_saved(self, manager):
+        dispatcher = mock.Mock()
+        write_events(manager, json.dumps({'event_data': {'artifact_data': {'foo': 'bar'}}}) + '\n')
+        manager.consume_events(dispatcher)
+        assert manager.instance.artifacts == {'foo': 'bar'}
+        manager.instance.save.assert_called_once_with(update_fields=['artifacts'])
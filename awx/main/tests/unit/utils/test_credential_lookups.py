@@ -0,0 +1,69 @@
+from unittest import mock
+
+import pytest
+
+from awx.main.utils import credential_lookups
+
+
+@pytest.fixture
+def source():
+    credential = mock.Mock(pk=1, modified='2019-10-01T00:00:00Z', inputs={'url': 'https://vault.example.org'})
+    credential.credential_type.secret_fields = []
+    credential.credential_type.plugin.backend.side_effect = lambda **kw: 'secret-' + kw['secret_path']
+    return credential
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    yield
+    credential_lookups.end_lookup_scope()
+    credential_lookups.invalidate_external_secrets()
+
+
+def test_lookups_are_memoized_within_scope(source):
+    backend = source.credential_type.plugin.backend
+    credential_lookups.begin_lookup_scope()
+    for _ in range(3):
+        assert credential_lookups.get_external_secret(source, {'secret_path': 'a'}) == 'secret-a'
+    assert credential_lookups.get_external_secret(source, {'secret_path': 'b'}) == 'secret-b'
+    assert backend.call_count == 2
+    backend.assert_called_with(url='https://vault.example.org', secret_path='b')
+
+    credential_lookups.end_lookup_scope()
+    credential_lookups.get_external_secret(source, {'secret_path': 'a'})
+    assert backend.call_count == 3
+
+
+def test_lookup_scope_ends_after_block(source):
+    backend = source.credential_type.plugin.backend
+    with credential_lookups.lookup_scope():
+        for _ in range(2):
+            credential_lookups.get_external_secret(source, {'secret_path': 'a'})
+        assert backend.call_count == 1
+    credential_lookups.get_external_secret(source, {'secret_path': 'a'})
+    assert backend.call_count == 2
+
+
+def test_ttl_cache(source, settings):
+    settings.AWX_CREDENTIAL_PLUGIN_CACHE_TTL = 30
+    backend = source.credential_type.plugin.backend
+    for _ in range(2):
+        credential_lookups.get_external_secret(source, {'secret_path': 'a'})
+    assert backend.call_count == 1
+
+    # an edited source credential is looked up again
+    source.modified = '2019-10-02T00:00:00Z'
+    credential_lookups.get_external_secret(source, {'secret_path': 'a'})
+    assert backend.call_count == 2
+
+    credential_lookups.invalidate_external_secrets(source.pk)
+    credential_lookups.get_external_secret(source, {'secret_path': 'a'})
+    assert backend.call_count == 3
+
+
+def test_no_ttl_cache_by_default(source, settings):
+    settings.AWX_CREDENTIAL_PLUGIN_CACHE_TTL = 0
+    backend = source.credential_type.plugin.backend
+    for _ in range(2):
+        credential_lookups.get_external_secret(source, {'secret_path': 'a'})
+    assert backend.call_count == 2
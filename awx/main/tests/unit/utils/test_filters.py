@@ -1,10 +1,11 @@
 
 # Python
 import pytest
+from collections import OrderedDict
 from unittest import mock
 
 # AWX
-from awx.main.utils.filters import SmartFilter, ExternalLoggerEnabled
+from awx.main.utils.filters import SmartFilter, ExternalLoggerEnabled, external_logger_enabled
 from awx.main.models import Host
 
 # Django
@@ -29,6 +30,19 @@ def test_base_logging_handler_skip_log(params, logger_name, expected, dummy_log_
     assert filter.filter(dummy_log_record) is expected, (params, logger_name)
 
 
+@pytest.mark.parametrize('enabled, loggers, level, expected', [
+    (False, ['job_events'], 'INFO', False),
+    (True, ['activity_stream'], 'INFO', False),
+    (True, ['job_events'], 'WARNING', False),
+    (True, ['job_events'], 'INFO', True),
+])
+def test_external_logger_enabled(settings, enabled, loggers, level, expected):
+    settings.LOG_AGGREGATOR_ENABLED = enabled
+    settings.LOG_AGGREGATOR_LOGGERS = loggers
+    settings.LOG_AGGREGATOR_LEVEL = level
+    assert external_logger_enabled('awx.analytics.job_events') is expected
+
+
 class Field(object):
 
     def __init__(self, name, related_model=None, __prevent_search__=None):
@@ -222,6 +236,30 @@ class TestSmartFilterQueryFromStringNoDB():
         assert str(q.query) == str(Host.objects.filter(q_expected).query)
 
 
+class TestSmartFilterCompile():
+    def test_grammar_built_once(self):
+        grammar = SmartFilter.get_grammar()
+        SmartFilter.compile('name=compile_once')
+        assert SmartFilter.get_grammar() is grammar
+
+    def test_expression_reused(self):
+        expression = SmartFilter.compile('name=foo and groups__name=bar')
+        assert SmartFilter.compile('name=foo and groups__name=bar') is expression
+        assert SmartFilter.compile('name=foo or groups__name=bar') is not expression
+
+    def test_invalid_expression_not_cached(self):
+        with pytest.raises(RuntimeError):
+            SmartFilter.compile('name=foo and')
+        assert 'name=foo and' not in SmartFilter._expressions
+
+    def test_cache_is_bounded(self, mocker):
+        mocker.patch.object(SmartFilter, 'MAX_CACHED_EXPRESSIONS', 2)
+        mocker.patch.object(SmartFilter, '_expressions', OrderedDict())
+        for i in range(3):
+            SmartFilter.compile('name=host%d' % i)
+        assert list(SmartFilter._expressions) == ['name=host1', 'name=host2']
+
+
 '''
 #('"facts__quoted_val"="f\"oo"', 1),
 #('facts__facts__arr[]="foo"', 1),
@@ -23,3 +23,11 @@ def test_log_from_job_event_object():
         assert fd in data_for_log
 
     assert data_for_log['job'] == 4
+
+
+def test_event_field_map_is_computed_once():
+    formatter = LogstashFormatter()
+    field_map = formatter.get_event_field_map(JobEvent)
+    assert formatter.get_event_field_map(JobEvent) is field_map
+    assert ('job', 'job_id', False) in field_map
+    assert ('created', 'created', True) in field_map
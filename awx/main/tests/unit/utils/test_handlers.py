@@ -1,5 +1,6 @@
 # -*- coding: utf-8 -*-
 import base64
+import json
 import logging
 import socket
 import datetime
@@ -18,7 +19,7 @@ from requests_futures.sessions import FuturesSession
 from awx.main.utils.handlers import (BaseHandler, BaseHTTPSHandler as HTTPSHandler,
                                      TCPHandler, UDPHandler, _encode_payload_for_socket,
                                      PARAM_NAMES, LoggingConnectivityException,
-                                     AWXProxyHandler)
+                                     AWXProxyHandler, LogShipper)
 from awx.main.utils.formatters import LogstashFormatter
 
 
@@ -391,3 +392,66 @@ def test_tcp_handler_log_exception(fake_socket, dummy_log_record):
         logger_mock.exception.assert_called_once()
         fake_socket.close.assert_called_once()
         assert not fake_socket.send.called
+
+
+def test_log_shipper_batches_records():
+    handler = mock.Mock()
+    handler._send_batch.return_value = True
+    shipper = LogShipper(max_size=100, batch_size=10, policy='drop')
+    shipper.put(handler, ['a', 'b', 'c'])
+    assert shipper.flush(timeout=5)
+    sent = [payload for c in handler._send_batch.call_args_list for payload in c[0][0]]
+    assert sent == ['a', 'b', 'c']
+    assert shipper.stats() == {'sent': 3, 'dropped': 0, 'failed': 0, 'queued': 0}
+
+
+def test_log_shipper_drops_when_full():
+    handler = mock.Mock()
+    shipper = LogShipper(max_size=2, batch_size=10, policy='drop')
+    with mock.patch.object(LogShipper, 'run'):
+        shipper.put(handler, ['a', 'b', 'c'])
+    assert shipper.stats() == {'sent': 0, 'dropped': 1, 'failed': 0, 'queued': 2}
+
+
+def test_log_shipper_counts_failures():
+    handler = mock.Mock()
+    handler._send_batch.side_effect = Exception('aggregator is down')
+    shipper = LogShipper(max_size=100, batch_size=10, policy='drop')
+    shipper.put(handler, ['a', 'b'])
+    assert shipper.flush(timeout=5)
+    assert shipper.stats()['failed'] == 2
+
+
+def test_https_handler_send_batch(https_adapter):
+    handler = HTTPSHandler(host='127.0.0.1', message_type='splunk')
+    handler.session.mount('https://', https_adapter)
+    assert handler._send_batch([{'a': 1}, {'b': 2}]) is True
+
+    assert len(https_adapter.requests) == 1
+    body = https_adapter.requests[0].body
+    assert body.splitlines() == ['{"event": {"a": 1}}', '{"event": {"b": 2}}']
+
+
+@pytest.mark.parametrize('message_type', ['logstash', 'loggly', 'other', None])
+def test_https_handler_send_batch_one_record_per_request(https_adapter, message_type):
+    handler = HTTPSHandler(host='127.0.0.1', message_type=message_type)
+    handler.session.mount('https://', https_adapter)
+    assert handler._send_batch([{'a': 1}, {'b': 2}]) is True
+
+    bodies = sorted(request.body for request in https_adapter.requests)
+    assert [json.loads(body) for body in bodies] == [{'a': 1}, {'b': 2}]
+
+    https_adapter.status = 400
+    assert handler._send_batch([{'c': 3}]) is False
+
+
+def test_tcp_handler_send_batch_reuses_connection():
+    handler = TCPHandler(host='127.0.0.1', port=4399, tcp_timeout=5)
+    with mock.patch('socket.create_connection') as create_connection:
+        handler._send_batch(['foo', {'bar': 'baz'}])
+        handler._send_batch(['qux'])
+        create_connection.assert_called_once_with(('127.0.0.1', 4399), timeout=5.0)
+        sok = create_connection.return_value
+        assert sok.sendall.call_args_list == [
+            mock.call(b'foo\n{"bar": "baz"}\n'), mock.call(b'qux\n')
+        ]
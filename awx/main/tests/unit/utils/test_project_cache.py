@@ -0,0 +1,74 @@
+import os
+from unittest import mock
+
+import pytest
+
+from awx.main.utils.project_cache import ProjectCheckoutCache
+
+
+def materialize(path):
+    os.makedirs(path)
+    with open(os.path.join(path, 'site.yml'), 'w') as f:
+        f.write('- hosts: all\n')
+
+
+@pytest.fixture
+def checkout_cache(tmpdir):
+    return ProjectCheckoutCache(root=tmpdir.join('cache').strpath, max_size=1024, link='copy')
+
+
+@mock.patch('awx.main.utils.project_cache.record_checkout')
+def test_revision_materialized_once(record_checkout, checkout_cache, tmpdir):
+    populate = mock.Mock(side_effect=materialize)
+    for i in range(3):
+        dest = tmpdir.join('job{}'.format(i), 'project').strpath
+        checkout_cache.copy('/var/lib/awx/projects/_6__demo', 'abc123', dest, populate, project_id=6)
+        with open(os.path.join(dest, 'site.yml')) as f:
+            assert f.read() == '- hosts: all\n'
+    assert populate.call_count == 1
+    assert [c[1]['hit'] for c in record_checkout.call_args_list] == [False, True, True]
+
+
+@mock.patch('awx.main.utils.project_cache.record_checkout')
+def test_failed_checkout_is_not_cached(record_checkout, checkout_cache, tmpdir):
+    def broken(path):
+        os.makedirs(path)
+        raise RuntimeError('boom')
+
+    with pytest.raises(RuntimeError):
+        checkout_cache.copy('_6__demo', 'abc123', tmpdir.join('job').strpath, broken)
+    assert os.listdir(checkout_cache.checkouts_dir) == []
+
+
+@mock.patch('awx.main.utils.project_cache.record_checkout')
+def test_least_recently_used_checkout_evicted(record_checkout, checkout_cache, tmpdir):
+    def large(path):
+        os.makedirs(path)
+        with open(os.path.join(path, 'data'), 'w') as f:
+            f.write('x' * 600)
+
+    checkout_cache.copy('_6__demo', 'rev1', tmpdir.join('job1').strpath, large)
+    checkout_cache.copy('_6__demo', 'rev2', tmpdir.join('job2').strpath, large)
+    assert os.listdir(checkout_cache.checkouts_dir) == ['_6__demo_rev2']
+
+
+def test_disabled_without_budget(tmpdir):
+    assert not ProjectCheckoutCache(root=tmpdir.strpath, max_size=0, link='copy').enabled
+
+
+@mock.patch('awx.main.utils.project_cache.record_checkout')
+def test_cache_is_private(record_checkout, checkout_cache, tmpdir):
+    checkout_cache.copy('_6__demo', 'abc123', tmpdir.join('job').strpath, materialize)
+    for d in (checkout_cache.root, checkout_cache.checkouts_dir, checkout_cache.meta_dir):
+        assert os.stat(d).st_mode & 0o077 == 0
+
+
+@mock.patch('awx.main.utils.project_cache.record_checkout')
+def test_job_copies_do_not_share_files(record_checkout, tmpdir):
+    checkout_cache = ProjectCheckoutCache(root=tmpdir.join('cache').strpath, max_size=1024, link='hardlink')
+    dest = tmpdir.join('job').strpath
+    checkout_cache.copy('_6__demo', 'abc123', dest, materialize)
+    with open(os.path.join(dest, 'site.yml'), 'a') as f:
+        f.write('  tasks: []\n')
+    with open(os.path.join(checkout_cache.checkout_path('_6__demo_abc123'), 'site.yml')) as f:
+        assert f.read() == '- hosts: all\n'
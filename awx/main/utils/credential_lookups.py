@@ -0,0 +1,136 @@
+# Copyright (c) 2019 Ansible by Red Hat
+# All Rights Reserved.
+
+# Python
+import contextlib
+import json
+import logging
+import threading
+import time
+
+# Django
+from django.conf import settings
+
+# AWX
+from awx.main.utils.encryption import decrypt_field
+
+logger = logging.getLogger('awx.main.utils.credential_lookups')
+
+__all__ = ['begin_lookup_scope', 'end_lookup_scope', 'lookup_scope',
+           'get_external_secret', 'invalidate_external_secrets']
+
+# values resolved while the current thread launches a job
+_scope = threading.local()
+
+# opt-in cache of external secret values, shared by the threads of a process;
+# {(source credential pk, modified, metadata): (expires, value)}
+_secrets = {}
+_secrets_lock = threading.Lock()
+
+
+def begin_lookup_scope():
+    """
+    Start memoizing external lookups on this thread; every credential input
+    backed by the same source credential and metadata is looked up once until
+    `end_lookup_scope` is called.
+    """
+    _scope.backend_kwargs = {}
+    _scope.values = {}
+
+
+def end_lookup_scope():
+    _scope.backend_kwargs = None
+    _scope.values = None
+
+
+@contextlib.contextmanager
+def lookup_scope():
+    """
+    Memoize external lookups on this thread for the duration of the block, and
+    drop the decrypted values it held afterwards.
+    """
+    begin_lookup_scope()
+    try:
+        yield
+    finally:
+        end_lookup_scope()
+
+
+def invalidate_external_secrets(source_credential_id=None):
+    """
+    Discard cached external secret values in this process, either all of them
+    or only those looked up with the given source credential.  Connected to
+    changes of credentials and their input sources in `awx.main.signals`.
+    """
+    with _secrets_lock:
+        if source_credential_id is None:
+            _secrets.clear()
+        else:
+            for key in [k for k in _secrets if k[0] == source_credential_id]:
+                del _secrets[key]
+    for values in (getattr(_scope, 'backend_kwargs', None), getattr(_scope, 'values', None)):
+        if values:
+            for key in [k for k in values if source_credential_id in (None, k[0])]:
+                del values[key]
+
+
+def get_backend_kwargs(source_credential):
+    backend_kwargs = {}
+    for field_name, value in source_credential.inputs.items():
+        if field_name in source_credential.credential_type.secret_fields:
+            backend_kwargs[field_name] = decrypt_field(source_credential, field_name)
+        else:
+            backend_kwargs[field_name] = value
+    return backend_kwargs
+
+
+def _memoize(values, key, fn):
+    if values is None:
+        return fn()
+    if key not in values:
+        values[key] = fn()
+    return values[key]
+
+
+def get_external_secret(source_credential, metadata):
+    """
+    Look up a secret with the backend of an external `source_credential`.
+
+    The decrypted inputs of each source credential are reused for all of the
+    lookups made with it.  Values are memoized within a lookup scope and, if
+    `AWX_CREDENTIAL_PLUGIN_CACHE_TTL` is set, cached in memory for that many
+    seconds.  Editing the source credential changes its `modified` time, so
+    it never serves a stale cached value.
+    """
+    if source_credential.pk is None:
+        backend_kwargs = get_backend_kwargs(source_credential)
+        backend_kwargs.update(metadata)
+        return source_credential.credential_type.plugin.backend(**backend_kwargs)
+
+    source_key = (source_credential.pk, source_credential.modified)
+    key = source_key + (json.dumps(metadata, sort_keys=True),)
+
+    def lookup():
+        ttl = getattr(settings, 'AWX_CREDENTIAL_PLUGIN_CACHE_TTL', 0)
+        if ttl:
+            with _secrets_lock:
+                expires, value = _secrets.get(key, (0, None))
+            if expires > time.monotonic():
+                return value
+
+        backend_kwargs = dict(_memoize(
+            getattr(_scope, 'backend_kwargs', None), source_key,
+            lambda: get_backend_kwargs(source_credential)
+        ))
+        backend_kwargs.update(metadata)
+        value = source_credential.credential_type.plugin.backend(**backend_kwargs)
+
+        if ttl:
+            now = time.monotonic()
+            with _secrets_lock:
+                for expired in [k for k, (expires, _) in _secrets.items() if expires <= now]:
+                    del _secrets[expired]
+                _secrets[key] = (now + ttl, value)
+        return value
+
+    return _memoize(getattr(_scope, 'values', None), key, lookup)
@@ -1,4 +1,5 @@
 import base64
+import functools
 import hashlib
 import logging
 from collections import namedtuple
@@ -45,14 +46,29 @@ def get_encryption_key(field_name, pk=None):
                that is not database-persistent (like a read-only setting)
     '''
     from django.conf import settings
+    return _derive_encryption_key(
+        smart_bytes(settings.SECRET_KEY),
+        smart_bytes(field_name),
+        None if pk is None else smart_bytes(str(pk))
+    )
+
+
+@functools.lru_cache(maxsize=4096)
+def _derive_encryption_key(secret_key, field_name, pk):
+    # SECRET_KEY is part of the cache key, so a rotated key is never served
     h = hashlib.sha512()
-    h.update(smart_bytes(settings.SECRET_KEY))
+    h.update(secret_key)
     if pk is not None:
-        h.update(smart_bytes(str(pk)))
-    h.update(smart_bytes(field_name))
+        h.update(pk)
+    h.update(field_name)
     return base64.urlsafe_b64encode(h.digest())
 
 
+@functools.lru_cache(maxsize=4096)
+def _get_fernet(key):
+    return Fernet256(key)
+
+
 def encrypt_value(value, pk=None):
     TransientField = namedtuple('TransientField', ['pk', 'value'])
     return encrypt_field(TransientField(pk=pk, value=value), 'value')
@@ -77,7 +93,7 @@ def encrypt_field(instance, field_name, ask=False, subfield=None):
     if not value or value.startswith('$encrypted$') or (ask and value == 'ASK'):
         return value
     key = get_encryption_key(field_name, getattr(instance, 'pk', None))
-    f = Fernet256(key)
+    f = _get_fernet(key)
     encrypted = f.encrypt(smart_bytes(value))
     b64data = smart_str(base64.b64encode(encrypted))
     tokens = ['$encrypted', 'UTF8', 'AESCBC', b64data]
@@ -94,7 +110,7 @@ def decrypt_value(encryption_key, value):
     if algo != 'AESCBC':
         raise ValueError('unsupported algorithm: %s' % algo)
     encrypted = base64.b64decode(b64data)
-    f = Fernet256(encryption_key)
+    f = _get_fernet(encryption_key)
     value = f.decrypt(encrypted)
     return smart_str(value)
 
@@ -1,4 +1,7 @@
 import re
+import sys
+import threading
+from collections import OrderedDict, namedtuple
 from functools import reduce
 from pyparsing import (
     infixNotation,
@@ -18,7 +21,8 @@ from django.conf import settings
 from awx.main.constants import LOGGER_BLACKLIST
 from awx.main.utils.common import get_search_fields
 
-__all__ = ['SmartFilter', 'ExternalLoggerEnabled', 'DynamicLevelFilter']
+__all__ = ['SmartFilter', 'ExternalLoggerEnabled', 'DynamicLevelFilter',
+           'external_logger_enabled']
 
 logger = logging.getLogger('awx.main.utils')
 
@@ -120,6 +124,19 @@ class DynamicLevelFilter(Filter):
         return bool(record.levelno >= cutoff_level)
 
 
+# the only record attributes the external logger filters look at
+LogProbe = namedtuple('LogProbe', ['name', 'levelno'])
+
+
+def external_logger_enabled(logger_name, level=logging.INFO):
+    """Return True if a record logged to `logger_name` at `level` would
+    pass the external logger filters, so that callers can skip building
+    records that would only be thrown away
+    """
+    probe = LogProbe(logger_name, level)
+    return ExternalLoggerEnabled().filter(probe) and DynamicLevelFilter().filter(probe)
+
+
 def string_to_type(t):
     if t == u'null':
         return None
@@ -144,25 +161,35 @@ def get_model(name):
 class SmartFilter(object):
     SEARCHABLE_RELATIONSHIP = 'ansible_facts'
 
+    # Parsed expressions only depend on the filter string, so they are kept
+    # per process and turned into querysets on demand.
+    MAX_CACHED_EXPRESSIONS = 1024
+    _grammar = None
+    _expressions = OrderedDict()
+    _lock = threading.Lock()
+
     class BoolOperand(object):
         def __init__(self, t):
-            kwargs = dict()
             k, v = self._extract_key_value(t)
-            k, v = self._json_path_to_contains(k, v)
+            self.key, self.value = self._json_path_to_contains(k, v)
+
+        def build(self):
+            kwargs = dict()
+            k, v = self.key, self.value
 
             Host = get_model('host')
             search_kwargs = self._expand_search(k, v)
             if search_kwargs:
                 kwargs.update(search_kwargs)
                 q = reduce(lambda x, y: x | y, [models.Q(**{u'%s__icontains' % _k:_v}) for _k, _v in kwargs.items()])
-                self.result = Host.objects.filter(q)
+                return Host.objects.filter(q)
             else:
                 # detect loops and restrict access to sensitive fields
                 # this import is intentional here to avoid a circular import
                 from awx.api.filters import FieldLookupBackend
                 FieldLookupBackend().get_field_from_lookup(Host, k)
                 kwargs[k] = v
-                self.result = Host.objects.filter(**kwargs)
+                return Host.objects.filter(**kwargs)
 
         def strip_quotes_traditional_logic(self, v):
             if type(v) is str and v.startswith('"') and v.endswith('"'):
@@ -304,18 +331,20 @@ class SmartFilter(object):
 
     class BoolBinOp(object):
         def __init__(self, t):
-            self.result = None
-            i = 2
-            while i < len(t[0]):
+            self.operands = list(t[0][0::2])
+
+        def build(self):
+            result = None
+            for operand in self.operands:
                 '''
-                Do NOT observe self.result. It will cause the sql query to be executed.
+                Do NOT observe result. It will cause the sql query to be executed.
                 We do not want that. We only want to build the query.
                 '''
-                if isinstance(self.result, type(None)):
-                    self.result = t[0][0].result
-                right = t[0][i].result
-                self.result = self.execute_logic(self.result, right)
-                i += 2
+                if result is None:
+                    result = operand.build()
+                else:
+                    result = self.execute_logic(result, operand.build())
+            return result
 
 
     class BoolAnd(BoolBinOp):
@@ -328,6 +357,48 @@ class SmartFilter(object):
             return left | right
 
 
+    @classmethod
+    def get_grammar(cls):
+        if cls._grammar is None:
+            unicode_spaces = [c for c in map(chr, range(sys.maxunicode + 1)) if c.isspace()]
+            unicode_spaces_other = unicode_spaces + [u'(', u')', u'=', u'"']
+            atom = CharsNotIn(''.join(unicode_spaces_other))
+            atom_inside_quotes = CharsNotIn(u'"')
+            atom_quoted = Literal('"') + Optional(atom_inside_quotes) + Literal('"')
+            EQUAL = Literal('=')
+
+            grammar = ((atom_quoted | atom) + EQUAL + Optional((atom_quoted | atom)))
+            grammar.setParseAction(cls.BoolOperand)
+
+            cls._grammar = infixNotation(grammar, [
+                ("and", 2, opAssoc.LEFT, cls.BoolAnd),
+                ("or",  2, opAssoc.LEFT, cls.BoolOr),
+            ])
+        return cls._grammar
+
+    @classmethod
+    def compile(cls, filter_string):
+        '''
+        Parse filter_string into an expression tree, reusing the tree from
+        an earlier call with the same string when possible.
+        '''
+        with cls._lock:
+            expression = cls._expressions.get(filter_string)
+            if expression is not None:
+                cls._expressions.move_to_end(filter_string)
+                return expression
+            try:
+                res = cls.get_grammar().parseString('(' + filter_string + ')')
+            except ParseException:
+                raise RuntimeError(u"Invalid query %s" % filter_string)
+            if len(res) == 0:
+                raise RuntimeError("Parsing the filter_string %s went terribly wrong" % filter_string)
+            expression = res[0]
+            cls._expressions[filter_string] = expression
+            if len(cls._expressions) > cls.MAX_CACHED_EXPRESSIONS:
+                cls._expressions.popitem(last=False)
+            return expression
+
     @classmethod
     def query_from_string(cls, filter_string):
 
@@ -340,27 +411,8 @@ class SmartFilter(object):
         filter_string_raw = filter_string
         filter_string = str(filter_string)
 
-        unicode_spaces = list(set(str(c) for c in filter_string if c.isspace()))
-        unicode_spaces_other = unicode_spaces + [u'(', u')', u'=', u'"']
-        atom = CharsNotIn(unicode_spaces_other)
-        atom_inside_quotes = CharsNotIn(u'"')
-        atom_quoted = Literal('"') + Optional(atom_inside_quotes) + Literal('"')
-        EQUAL = Literal('=')
-
-        grammar = ((atom_quoted | atom) + EQUAL + Optional((atom_quoted | atom)))
-        grammar.setParseAction(cls.BoolOperand)
-
-        boolExpr = infixNotation(grammar, [
-            ("and", 2, opAssoc.LEFT, cls.BoolAnd),
-            ("or",  2, opAssoc.LEFT, cls.BoolOr),
-        ])
-
+        expression = cls.compile(filter_string)
         try:
-            res = boolExpr.parseString('(' + filter_string + ')')
+            return expression.build()
         except ParseException:
             raise RuntimeError(u"Invalid query %s" % filter_string_raw)
-
-        if len(res) > 0:
-            return res[0].result
-
-        raise RuntimeError("Parsing the filter_string %s went terribly wrong" % filter_string)
@@ -107,6 +107,18 @@ class LogstashFormatterBase(logging.Formatter):
 
 class LogstashFormatter(LogstashFormatterBase):
 
+    # (key, attribute, is_timestamp) for each field, computed once per event class
+    event_field_maps = {}
+
+    @classmethod
+    def get_event_field_map(cls, event_class):
+        if event_class not in cls.event_field_maps:
+            cls.event_field_maps[event_class] = [
+                (field_object.name, field_object.attname, field_object.name in ('created', 'modified'))
+                for field_object in event_class._meta.concrete_fields
+            ]
+        return cls.event_field_maps[event_class]
+
     def reformat_data_for_log(self, raw_data, kind=None):
         '''
         Process dictionaries from various contexts (job events, activity stream
@@ -161,23 +173,10 @@ class LogstashFormatter(LogstashFormatterBase):
 
         if kind == 'job_events':
             job_event = raw_data['python_objects']['job_event']
-            for field_object in job_event._meta.fields:
-
-                if not field_object.__class__ or not field_object.__class__.__name__:
-                    field_class_name = ''
-                else:
-                    field_class_name = field_object.__class__.__name__
-                if field_class_name in ['ManyToOneRel', 'ManyToManyField']:
-                    continue
-
-                fd = field_object.name
-                key = fd
-                if field_class_name == 'ForeignKey':
-                    fd = '{}_id'.format(field_object.name)
-
+            for key, attname, is_timestamp in self.get_event_field_map(job_event.__class__):
                 try:
-                    data_for_log[key] = getattr(job_event, fd)
-                    if fd in ['created', 'modified'] and data_for_log[key] is not None:
+                    data_for_log[key] = getattr(job_event, attname)
+                    if is_timestamp and data_for_log[key] is not None:
                         time_float = time.mktime(data_for_log[key].timetuple())
                         data_for_log[key] = self.format_timestamp(time_float)
                 except Exception as e:
@@ -202,8 +201,7 @@ class LogstashFormatter(LogstashFormatterBase):
             response = raw_data['python_objects']['response']
 
             # Note: All of the below keys may not be in the response "dict"
-            # For example, X-API-Query-Time and X-API-Query-Count will only
-            # exist if SQL_DEBUG is turned on in settings.
+            # For example, X-API-Time and X-API-Node are only set by API views.
             headers = [
                 (float, 'X-API-Time'),  # may end with an 's' "0.33s"
                 (float, 'X-API-Total-Time'),
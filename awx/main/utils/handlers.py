@@ -2,8 +2,11 @@
 # All Rights Reserved.
 
 # Python
+import atexit
 import logging
 import json
+import os
+import queue
 import requests
 import time
 import threading
@@ -24,7 +27,7 @@ from awx.main.utils.formatters import LogstashFormatter
 
 
 __all__ = ['BaseHTTPSHandler', 'TCPHandler', 'UDPHandler',
-           'AWXProxyHandler']
+           'AWXProxyHandler', 'LogShipper']
 
 
 logger = logging.getLogger('awx.main.utils.handlers')
@@ -104,10 +107,18 @@ class BaseHandler(logging.Handler):
         """
         return payload
 
-    def _format_and_send_record(self, record):
+    def _send_batch(self, payloads):
+        """Send several payloads to the log aggregator; returns True on success.
+        """
+        return all([self._send(payload).result().ok for payload in payloads])
+
+    def _format_record(self, record):
         if self.indv_facts:
-            return [self._send(json.loads(self.format(record)))]
-        return [self._send(self.format(record))]
+            return [json.loads(self.format(record))]
+        return [self.format(record)]
+
+    def _format_and_send_record(self, record):
+        return [self._send(payload) for payload in self._format_record(record)]
 
     def emit(self, record):
         """
@@ -152,6 +163,12 @@ class BaseHTTPSHandler(BaseHandler):
     Non-blocking request accomplished by FuturesSession, similar
     to the loggly-python-handler library
     '''
+
+    # aggregators whose HTTP inputs accept several newline-delimited JSON
+    # events in one request; the others (e.g., loggly, or logstash's http
+    # input with the json codec) are sent one record per request
+    batch_message_types = ('splunk', 'sumologic')
+
     def _add_auth_information(self):
         if self.message_type == 'logstash':
             if not self.username:
@@ -206,6 +223,26 @@ class BaseHTTPSHandler(BaseHandler):
         return self.session.post(self._get_host(scheme='https'),
                                  **self._get_post_kwargs(payload))
 
+    def _send_batch(self, payloads):
+        if self.message_type not in self.batch_message_types:
+            responses = [future.result() for future in [self._send(payload) for payload in payloads]]
+            rejected = [resp for resp in responses if not resp.ok]
+            if rejected:
+                logger.warning('External log aggregator rejected {} of {} records: {} {}'.format(
+                    len(rejected), len(payloads), rejected[0].status_code, rejected[0].reason or ''))
+            return not rejected
+
+        # one POST per batch, with newline-delimited JSON events
+        lines = [self._get_post_kwargs(payload)['data'] for payload in payloads]
+        kwargs = dict(data='\n'.join(lines), timeout=self.tcp_timeout)
+        if self.verify_cert is False:
+            kwargs['verify'] = False
+        resp = self.session.post(self._get_host(scheme='https'), **kwargs).result()
+        if not resp.ok:
+            logger.warning('External log aggregator rejected {} records: {} {}'.format(
+                len(payloads), resp.status_code, resp.reason or ''))
+        return resp.ok
+
 
 def _encode_payload_for_socket(payload):
     encoded_payload = payload
@@ -219,8 +256,39 @@ def _encode_payload_for_socket(payload):
 class TCPHandler(BaseHandler):
     def __init__(self, tcp_timeout=5, **kwargs):
         self.tcp_timeout = tcp_timeout
+        self._batch_socket = None
         super(TCPHandler, self).__init__(**kwargs)
 
+    def _send_batch(self, payloads):
+        # batches share one connection, with newline-delimited events
+        data = b''.join([_encode_payload_for_socket(payload) + b'\n' for payload in payloads])
+        for attempt in range(2):
+            try:
+                if self._batch_socket is None:
+                    self._batch_socket = socket.create_connection(
+                        (self._get_host(hostname_only=True), self.port or 0),
+                        timeout=float(self.tcp_timeout)
+                    )
+                self._batch_socket.sendall(data)
+                return True
+            except Exception:
+                self._close_batch_socket()
+                if attempt:
+                    logger.exception('Error sending {} records from {}'.format(len(payloads), TCPHandler.__name__))
+        return False
+
+    def _close_batch_socket(self):
+        if self._batch_socket is not None:
+            try:
+                self._batch_socket.close()
+            except Exception:
+                pass
+            self._batch_socket = None
+
+    def close(self):
+        self._close_batch_socket()
+        super(TCPHandler, self).close()
+
     def _send(self, payload):
         payload = _encode_payload_for_socket(payload)
         sok = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
@@ -257,6 +325,119 @@ class UDPHandler(BaseHandler):
         return SocketResult(True, reason=self.message)
 
 
+class LogShipper(object):
+    '''
+    Ships formatted records to the external log aggregator from a background
+    thread, so that logging never waits on the network.
+
+    Records are held in a bounded queue and sent in batches of up to
+    `LOG_AGGREGATOR_BATCH_SIZE`.  When the queue is full, new records are
+    dropped (`LOG_AGGREGATOR_QUEUE_FULL_POLICY = 'drop'`) or the caller waits
+    up to `LOG_AGGREGATOR_TCP_TIMEOUT` seconds for room (`'block'`).
+    '''
+
+    def __init__(self, max_size=None, batch_size=None, policy=None):
+        self.max_size = max_size or settings.LOG_AGGREGATOR_MAX_QUEUE_SIZE
+        self.batch_size = batch_size or settings.LOG_AGGREGATOR_BATCH_SIZE
+        self.policy = policy or settings.LOG_AGGREGATOR_QUEUE_FULL_POLICY
+        self.sent = 0
+        self.dropped = 0
+        self.failed = 0
+        self.pid = None
+        self.queue = None
+        self.thread = None
+        self.lock = threading.Lock()
+        self.reported_drops = 0
+
+    def start(self):
+        # threads do not survive a fork, so each process drains its own queue
+        with self.lock:
+            if self.pid != os.getpid():
+                self.queue = queue.Queue(maxsize=self.max_size)
+                self.thread = threading.Thread(target=self.run, name='awx-log-shipper')
+                self.thread.daemon = True
+                self.thread.start()
+                if self.pid is None:
+                    atexit.register(self.flush, timeout=1)
+                self.pid = os.getpid()
+
+    def put(self, handler, payloads):
+        if self.pid != os.getpid():
+            self.start()
+        for payload in payloads:
+            try:
+                if self.policy == 'block':
+                    self.queue.put((handler, payload), timeout=float(settings.LOG_AGGREGATOR_TCP_TIMEOUT))
+                else:
+                    self.queue.put_nowait((handler, payload))
+            except queue.Full:
+                self.dropped += 1
+
+    def get_batch(self):
+        batch = [self.queue.get()]
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self.queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def run(self):
+        # errors logged while shipping must not be shipped themselves
+        AWXProxyHandler.thread_local.enabled = False
+        while True:
+            batch = self.get_batch()
+            # preserve ordering, but never mix records bound for different
+            # handlers (e.g., across a settings change) in one request
+            start = 0
+            for i in range(1, len(batch) + 1):
+                if i == len(batch) or batch[i][0] is not batch[start][0]:
+                    self.ship(batch[start][0], [payload for _, payload in batch[start:i]])
+                    start = i
+            for _ in batch:
+                self.queue.task_done()
+            if self.dropped > self.reported_drops:
+                logger.warning('External log queue full, dropped {} records.'.format(
+                    self.dropped - self.reported_drops))
+                self.reported_drops = self.dropped
+
+    def ship(self, handler, payloads):
+        try:
+            ok = handler._send_batch(payloads)
+        except RequestException:
+            # already logged (periodically) by VerboseThreadPoolExecutor
+            ok = False
+        except Exception:
+            logger.exception('Failed to ship {} records to external log aggregator'.format(len(payloads)))
+            ok = False
+        if ok:
+            self.sent += len(payloads)
+        else:
+            self.failed += len(payloads)
+
+    def flush(self, timeout=None):
+        '''
+        Wait (up to `timeout` seconds) for queued records to be shipped;
+        returns True if the queue was drained.
+        '''
+        if self.pid != os.getpid():
+            return True
+        deadline = time.time() + timeout if timeout is not None else None
+        while self.queue.unfinished_tasks:
+            if deadline is not None and time.time() > deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+    def stats(self):
+        return {
+            'sent': self.sent,
+            'dropped': self.dropped,
+            'failed': self.failed,
+            'queued': self.queue.qsize() if self.pid == os.getpid() else 0,
+        }
+
+
 class AWXNullHandler(logging.NullHandler):
     '''
     Only additional this does is accept arbitrary __init__ params because
@@ -294,6 +475,7 @@ class AWXProxyHandler(logging.Handler):
         super(AWXProxyHandler, self).__init__(**kwargs)
         self._handler = None
         self._old_kwargs = {}
+        self.shipper = LogShipper()
         self._auditor = logging.handlers.RotatingFileHandler(
             filename='/var/log/tower/external.log',
             maxBytes=1024 * 1024 * 50, # 50 MB
@@ -342,7 +524,15 @@ class AWXProxyHandler(logging.Handler):
             if settings.LOG_AGGREGATOR_AUDIT:
                 self._auditor.setLevel(settings.LOG_AGGREGATOR_LEVEL)
                 self._auditor.emit(record)
-            return actual_handler.emit(record)
+            if not isinstance(actual_handler, BaseHandler):
+                return actual_handler.emit(record)
+            # format here, while the record is intact, and ship it later
+            try:
+                self.shipper.put(actual_handler, actual_handler._format_record(record))
+            except (KeyboardInterrupt, SystemExit):
+                raise
+            except Exception:
+                self.handleError(record)
 
     def perform_test(self, custom_settings):
         """
@@ -1,8 +1,13 @@
 # Python
+import threading
+import time
 import urllib.parse
-from collections import deque
+from collections import deque, OrderedDict
+from uuid import uuid4
 # Django
+from django.core.cache import cache
 from django.db import models
+from django.db.models.signals import post_save, post_delete
 from django.conf import settings
 from django.contrib.contenttypes.models import ContentType
 
@@ -16,6 +21,11 @@ for c in ';/?:@=&[]':
 FK_NAME = 0
 NEXT_NODE = 1
 
+NAMED_URL_CACHE_SIZE = 10000
+# seconds; a backstop for changes made without signals (e.g., queryset updates)
+NAMED_URL_CACHE_TIMEOUT = 300
+NAMED_URL_VERSION_KEY = 'awx-named-url-version-{}-{}'
+
 NAME_EXCEPTIONS = {
     "custom_inventory_scripts": "inventory_scripts"
 }
@@ -65,6 +75,21 @@ class GraphNode(object):
                 stack.append(to_append)
         return NAMED_URL_RES_DILIMITER.join(named_url_components)
 
+    def related_objects(self, obj):
+        '''
+        `obj` and the objects whose fields make up its named URL.
+        '''
+        objects = []
+        stack = [(self, obj)]
+        while stack:
+            node, obj = stack.pop()
+            objects.append(obj)
+            for fk_name, next_node in node.adj_list:
+                next_obj = getattr(obj, fk_name, None)
+                if next_obj is not None:
+                    stack.append((next_node, next_obj))
+        return objects
+
     @property
     def named_url_repr(self):
         ret = {}
@@ -163,6 +188,10 @@ class GraphNode(object):
             settings.NAMED_URL_FORMATS[self.model_url_name] = self.named_url_format
             settings.NAMED_URL_GRAPH_NODES[self.model_url_name] = self.named_url_repr
             settings.NAMED_URL_MAPPINGS[self.model_url_name] = self.model
+        # named URLs of this model (and of those made from it) are cached
+        uid = 'named_url_{}'.format(self.model._meta.label_lower)
+        post_save.connect(invalidate_named_urls, sender=self.model, dispatch_uid=uid)
+        post_delete.connect(invalidate_named_urls, sender=self.model, dispatch_uid=uid)
 
     def remove_bindings(self):
         if self.model_url_name in settings.NAMED_URL_FORMATS:
@@ -171,6 +200,85 @@ class GraphNode(object):
             settings.NAMED_URL_MAPPINGS.pop(self.model_url_name)
 
 
+class NamedURLCache(object):
+    '''
+    A bounded LRU cache of pk -> named URL, shared by the threads of a
+    process.
+
+    Each entry records a version token of every object its named URL is made
+    of (e.g., an inventory and its organization), kept in the shared cache
+    and dropped whenever that object is saved or deleted (see
+    `invalidate_named_urls`); entries whose tokens are out of date are
+    discarded when they are read.
+    '''
+
+    def __init__(self, size=NAMED_URL_CACHE_SIZE, timeout=NAMED_URL_CACHE_TIMEOUT):
+        self.size = size
+        self.timeout = timeout
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            value, versions, expires = entry
+            if expires < time.monotonic():
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+        if cache.get_many(list(versions)) != versions:
+            with self.lock:
+                self.entries.pop(key, None)
+            return None
+        return value
+
+    def set(self, key, value, objects):
+        keys = [named_url_version_key(obj) for obj in objects]
+        versions = cache.get_many(keys)
+        for version_key in keys:
+            if version_key not in versions:
+                cache.add(version_key, uuid4().hex, timeout=self.timeout)
+        versions = cache.get_many(keys)
+        if len(versions) != len(keys):
+            return
+        with self.lock:
+            self.entries[key] = (value, versions, time.monotonic() + self.timeout)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.size:
+                self.entries.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+named_url_cache = NamedURLCache()
+
+
+def named_url_version_key(obj):
+    return NAMED_URL_VERSION_KEY.format(obj._meta.label_lower, obj.pk)
+
+
+def get_named_url(node, obj):
+    '''
+    The named URL identifier of `obj`, a `node.model` object.
+    '''
+    # the object's own fields are part of the key, so that a rename is seen
+    # even if it was made on another node (whose shared cache is not ours)
+    key = (node.model, obj.pk, tuple(getattr(obj, field, '') for field in node.fields))
+    named_url = named_url_cache.get(key)
+    if named_url is None:
+        named_url = node.generate_named_url(obj)
+        named_url_cache.set(key, named_url, node.related_objects(obj))
+    return named_url
+
+
+def invalidate_named_urls(sender, instance, **kwargs):
+    cache.delete(named_url_version_key(instance))
+
+
 def _get_all_unique_togethers(model):
     queue = deque()
     queue.append(model)
@@ -0,0 +1,194 @@
+# Copyright (c) 2019 Ansible by Red Hat
+# All Rights Reserved.
+
+# Python
+import errno
+import fcntl
+import logging
+import os
+import shutil
+import subprocess
+from contextlib import contextmanager
+from distutils.dir_util import copy_tree
+
+# Django
+from django.conf import settings
+from django.core.cache import cache
+
+logger = logging.getLogger('awx.main.utils.project_cache')
+
+__all__ = ['ProjectCheckoutCache', 'get_checkout_cache_stats']
+
+STATS_KEY = 'awx-project-checkout-cache-{}-{}'
+
+
+def _tree_size(path):
+    size = 0
+    for root, dirs, files in os.walk(path):
+        for name in files:
+            try:
+                size += os.lstat(os.path.join(root, name)).st_size
+            except OSError:
+                pass
+    return size
+
+
+def record_checkout(project_id, hit):
+    if project_id is None:
+        return
+    key = STATS_KEY.format(project_id, 'hits' if hit else 'misses')
+    try:
+        cache.add(key, 0, timeout=None)
+        cache.incr(key)
+    except Exception:
+        logger.exception('Failed to record project checkout cache statistics.')
+
+
+def get_checkout_cache_stats(project_ids):
+    """
+    Return {project_id: {'hits': n, 'misses': n}} for the projects that have
+    used the checkout cache on this node.
+    """
+    keys = {}
+    for project_id in project_ids:
+        for stat in ('hits', 'misses'):
+            keys[STATS_KEY.format(project_id, stat)] = (project_id, stat)
+    stats = {}
+    for key, value in cache.get_many(list(keys.keys())).items():
+        project_id, stat = keys[key]
+        stats.setdefault(project_id, {'hits': 0, 'misses': 0})[stat] = value
+    return stats
+
+
+class ProjectCheckoutCache(object):
+    """
+    A per-node cache of project checkouts, keyed by project and revision.
+
+    Each revision is materialized once (under an exclusive lock) and jobs
+    receive a copy of it, made with reflinks where possible.  Jobs never share
+    files with the cache, so a playbook that modifies its project can't change
+    the checkout later jobs get.
+    Checkouts are evicted in least recently used order once the cache grows
+    past `AWX_PROJECT_CHECKOUT_CACHE_MAX_SIZE` bytes.
+    """
+
+    def __init__(self, root=None, max_size=None, link=None):
+        self.root = root or settings.AWX_PROJECT_CHECKOUT_CACHE_PATH or os.path.join(
+            settings.AWX_PROOT_BASE_PATH, 'awx_project_cache'
+        )
+        self.max_size = max_size if max_size is not None else settings.AWX_PROJECT_CHECKOUT_CACHE_MAX_SIZE
+        self.link = link or settings.AWX_PROJECT_CHECKOUT_CACHE_LINK
+        self.checkouts_dir = os.path.join(self.root, 'checkouts')
+        self.meta_dir = os.path.join(self.root, 'meta')
+
+    @property
+    def enabled(self):
+        return self.max_size > 0
+
+    def key(self, project_path, revision):
+        return '{}_{}'.format(os.path.basename(os.path.normpath(project_path)), revision)
+
+    def checkout_path(self, key):
+        return os.path.join(self.checkouts_dir, key)
+
+    @contextmanager
+    def lock(self, key, operation):
+        with open(os.path.join(self.meta_dir, key + '.lock'), 'a') as f:
+            fcntl.flock(f, operation)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def populate(self, key, materialize):
+        path = self.checkout_path(key)
+        partial_path = path + '.partial'
+        with self.lock(key, fcntl.LOCK_EX):
+            if os.path.isdir(path):
+                return False
+            shutil.rmtree(partial_path, ignore_errors=True)
+            try:
+                materialize(partial_path)
+            except Exception:
+                shutil.rmtree(partial_path, ignore_errors=True)
+                raise
+            with open(os.path.join(self.meta_dir, key + '.size'), 'w') as f:
+                f.write(str(_tree_size(partial_path)))
+            os.rename(partial_path, path)
+        return True
+
+    def copy(self, project_path, revision, destination_folder, materialize, project_id=None):
+        """
+        Copy the checkout of `revision` into `destination_folder`, calling
+        `materialize(path)` to create it first if it is not cached yet.
+        """
+        # only the AWX user may read checkouts of other projects
+        for d in (self.root, self.checkouts_dir, self.meta_dir):
+            os.makedirs(d, mode=0o700, exist_ok=True)
+        key = self.key(project_path, revision)
+        path = self.checkout_path(key)
+        populated = False
+        while True:
+            with self.lock(key, fcntl.LOCK_SH):
+                if os.path.isdir(path):
+                    os.utime(path, None)
+                    self.clone_tree(path, destination_folder)
+                    break
+            # not cached (or evicted between populating and copying)
+            populated = self.populate(key, materialize) or populated
+        record_checkout(project_id, hit=not populated)
+        if populated:
+            self.evict(keep=key)
+
+    def clone_tree(self, src, dest):
+        if self.link == 'reflink':
+            if not os.path.exists(dest):
+                os.mkdir(dest)
+            try:
+                subprocess.check_output(
+                    ['cp', '-a', '--reflink=auto', os.path.join(src, '.'), dest],
+                    stderr=subprocess.STDOUT
+                )
+                return
+            except (OSError, subprocess.CalledProcessError):
+                logger.exception('Failed to link {} into {}, copying instead.'.format(src, dest))
+        copy_tree(src, dest, preserve_symlinks=1)
+
+    def entries(self):
+        entries = []
+        for key in os.listdir(self.checkouts_dir):
+            if key.endswith('.partial'):
+                continue
+            try:
+                last_used = os.stat(self.checkout_path(key)).st_mtime
+            except OSError:
+                continue
+            try:
+                with open(os.path.join(self.meta_dir, key + '.size'), 'r') as f:
+                    size = int(f.read())
+            except (IOError, ValueError):
+                size = _tree_size(self.checkout_path(key))
+            entries.append((last_used, key, size))
+        return sorted(entries)
+
+    def evict(self, keep=None):
+        entries = self.entries()
+        total = sum(size for _, _, size in entries)
+        for _, key, size in entries:
+            if total <= self.max_size:
+                break
+            if key == keep:
+                continue
+            try:
+                with self.lock(key, fcntl.LOCK_EX | fcntl.LOCK_NB):
+                    shutil.rmtree(self.checkout_path(key), ignore_errors=True)
+                    try:
+                        os.remove(os.path.join(self.meta_dir, key + '.size'))
+                    except OSError:
+                        pass
+            except (IOError, OSError) as e:
+                if e.errno not in (errno.EAGAIN, errno.EACCES):
+                    raise
+                continue  # in use by a job copying it right now
+            logger.debug('Evicted project checkout {} ({} bytes) from cache.'.format(key, size))
+            total -= size
@@ -0,0 +1,206 @@
+# Copyright (c) 2019 Ansible by Red Hat
+# All Rights Reserved.
+
+# Python
+import collections
+import hashlib
+import logging
+import re
+import threading
+import time
+
+# Django
+from django.conf import settings
+from django.core.cache import cache
+
+# AWX
+from awx.main.dispatch import metrics as dispatch_metrics
+from awx.main.dispatch.metrics import BUCKETS, WorkerMetrics, cumulative, get_node_series
+
+logger = logging.getLogger('awx.main.utils.request_metrics')
+
+__all__ = ['QueryRecorder', 'fingerprint', 'record_request', 'get_request_metrics']
+
+NAMESPACE = 'api'
+FINGERPRINT_KEY = 'awx-api-query-fingerprint-{}'
+STATEMENTS_KEY = 'awx-api-query-statements-{}-{}'
+
+# a statement run at least this many times per request is reported as an
+# N+1 query candidate
+REPEATED_QUERY_THRESHOLD = 10
+
+# fingerprints listed for each view
+TOP_QUERIES = 10
+
+# upper bounds of the buckets of the per-request query count histogram
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 25, 50, 100, 250, 500, 1000)
+
+# histograms recorded for each view, and their bucket bounds
+HISTOGRAMS = {
+    'request_seconds': BUCKETS,
+    'query_seconds': BUCKETS,
+    'queries': QUERY_COUNT_BUCKETS,
+}
+
+# fingerprints kept for each view on each node; the least frequently run are
+# dropped whenever a process writes its new executions back
+MAX_STATEMENTS = 50
+
+# fingerprints whose SQL this process remembers having stored
+MAX_KNOWN_FINGERPRINTS = 10000
+
+_metrics = WorkerMetrics(namespace=NAMESPACE)
+_metrics_lock = threading.Lock()
+_known_fingerprints = set()
+_statements = collections.defaultdict(collections.Counter)
+_last_statements_flush = time.time()
+
+
+def _statements_key(node, view):
+    return STATEMENTS_KEY.format(node, hashlib.md5(view.encode('utf-8')).hexdigest())
+
+
+def fingerprint(sql):
+    """
+    Reduce a SQL statement to its shape, so that the same query run with
+    different parameters (or IN lists of different lengths) is counted once.
+    """
+    sql = re.sub(r"'(?:[^']|'')*'", '?', sql)
+    sql = re.sub(r'\b\d+\b', '?', sql)
+    sql = sql.replace('%s', '?')
+    sql = re.sub(r'\(\s*\?(?:\s*,\s*\?)*\s*\)', '(...)', sql)
+    return re.sub(r'\s+', ' ', sql).strip()
+
+
+class QueryRecorder(object):
+    """
+    A database execute wrapper (see `connection.execute_wrapper`) which counts
+    and times the queries of a request, and optionally the number of times
+    each statement was run.
+    """
+
+    def __init__(self, statements=False):
+        self.count = 0
+        self.seconds = 0.0
+        self.statements = collections.Counter() if statements else None
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.time()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.seconds += time.time() - start
+            if self.statements is not None:
+                self.statements[sql] += 1
+
+
+def record_request(view, seconds, recorder):
+    """
+    Add the time and queries of a request to the per-view metrics of this
+    node; the statements of sampled requests are recorded by fingerprint.
+    """
+    try:
+        with _metrics_lock:
+            _metrics.inc('requests', view=view)
+            _metrics.observe('request_seconds', seconds, view=view)
+            _metrics.observe('query_seconds', recorder.seconds, view=view)
+            _metrics.observe('queries', recorder.count, buckets=QUERY_COUNT_BUCKETS, scale=1, view=view)
+            if recorder.statements is not None:
+                _metrics.inc('sampled_requests', view=view)
+                executions = collections.Counter()
+                for sql, count in recorder.statements.items():
+                    executions[fingerprint(sql)] += count
+                for sql, count in executions.most_common(MAX_STATEMENTS):
+                    digest = hashlib.md5(sql.encode('utf-8')).hexdigest()
+                    if digest not in _known_fingerprints:
+                        if len(_known_fingerprints) >= MAX_KNOWN_FINGERPRINTS:
+                            _known_fingerprints.clear()
+                        cache.set(FINGERPRINT_KEY.format(digest), sql, timeout=None)
+                        _known_fingerprints.add(digest)
+                    _statements[view][digest] += count
+            _metrics.flush()
+            _flush_statements()
+    except Exception:
+        logger.exception('Failed to record request metrics.')
+
+
+def _flush_statements(force=False):
+    """
+    Add the statement executions recorded since the last flush to the
+    per-view fingerprint counts of this node.  These are kept out of the
+    metrics index (which would grow with every fingerprint), and concurrent
+    writers may lose each other's additions, which is fine for a sample.
+    """
+    global _last_statements_flush
+    now = time.time()
+    if not force and now - _last_statements_flush < dispatch_metrics.FLUSH_INTERVAL:
+        return
+    _last_statements_flush = now
+    pending = dict(_statements)
+    _statements.clear()
+    for view, executions in pending.items():
+        key = _statements_key(settings.CLUSTER_HOST_ID, view)
+        stored = collections.Counter(cache.get(key) or {})
+        stored.update(executions)
+        cache.set(key, dict(stored.most_common(MAX_STATEMENTS)), timeout=None)
+
+
+def get_request_metrics():
+    """
+    Return the request metrics recorded on this node, as a list with an entry
+    per view, slowest (on average) first.  They are kept in this node's cache,
+    so each node only reports its own requests.
+    """
+    node = settings.CLUSTER_HOST_ID
+    views = {}
+    for (name, labels), value in get_node_series(node, namespace=NAMESPACE).items():
+        labels = dict(labels)
+        view = views.setdefault(labels.pop('view'), {
+            'requests': 0, 'queries_sum': 0, 'request_seconds_sum': 0, 'query_seconds_sum': 0,
+            'sampled_requests': 0, 'statements': collections.Counter(),
+            'buckets': dict((histogram, {}) for histogram in HISTOGRAMS),
+        })
+        if name.endswith('_bucket') and name[:-len('_bucket')] in HISTOGRAMS:
+            view['buckets'][name[:-len('_bucket')]][labels['le']] = value
+        elif name in view:
+            view[name] += value
+    statement_keys = dict((_statements_key(node, name), name) for name in views)
+    for key, executions in cache.get_many(list(statement_keys.keys())).items():
+        views[statement_keys[key]]['statements'].update(executions)
+
+    statements = set()
+    for view in views.values():
+        view['statements'] = view['statements'].most_common(TOP_QUERIES)
+        statements.update(digest for digest, _ in view['statements'])
+    sql = dict(
+        (key[len(FINGERPRINT_KEY.format('')):], value)
+        for key, value in cache.get_many([FINGERPRINT_KEY.format(digest) for digest in statements]).items()
+    )
+
+    results = []
+    for name, view in views.items():
+        requests = view['requests'] or 1
+        sampled = view['sampled_requests'] or 1
+        queries = []
+        for digest, executions in view['statements']:
+            per_request = float(executions) / sampled
+            queries.append({
+                'fingerprint': digest,
+                'sql': sql.get(digest, ''),
+                'executions_per_request': round(per_request, 2),
+                'repeated': per_request >= REPEATED_QUERY_THRESHOLD,
+            })
+        results.append({
+            'view': name,
+            'node': node,
+            'requests': view['requests'],
+            'mean_seconds': view['request_seconds_sum'] / 1000000.0 / requests,
+            'mean_queries': float(view['queries_sum']) / requests,
+            'mean_query_seconds': view['query_seconds_sum'] / 1000000.0 / requests,
+            'sampled_requests': view['sampled_requests'],
+            'queries': queries,
+        })
+        for histogram, bounds in HISTOGRAMS.items():
+            results[-1][histogram + '_buckets'] = cumulative(view['buckets'][histogram], bounds)
+    return sorted(results, key=lambda v: v['mean_seconds'], reverse=True)
@@ -0,0 +1,99 @@
+import json
+import os
+
+from ansible.module_utils.basic import AnsibleModule
+
+
+#
+# the purpose of this plugin is to append job events written by
+# ansible-runner on the isolated host to a single append-only log, so the
+# controller only has to sync (and parse) the bytes added since its last check
+#
+
+
+def event_counter(filename):
+    # runner names event files `<counter>-<uuid>.json`
+    try:
+        return int(filename.split('-', 1)[0])
+    except ValueError:
+        return 0
+
+
+def logged_counter(dest):
+    # the counter of the last event in the log, or 0
+    counter = 0
+    if os.path.exists(dest):
+        with open(dest, 'r') as log:
+            for line in log:
+                try:
+                    counter = json.loads(line).get('counter', counter)
+                except ValueError:
+                    pass
+    return counter
+
+
+def main():
+    module = AnsibleModule(
+        argument_spec={
+            'events_dir': {'required': True, 'type': 'str'},
+            'dest': {'required': True, 'type': 'str'}
+        },
+        supports_check_mode=False
+    )
+
+    events_dir = module.params['events_dir']
+    dest = module.params['dest']
+    # the index holds the counter of the last event appended to the log
+    index_path = dest + '.index'
+
+    last_counter = 0
+    if os.path.exists(index_path):
+        with open(index_path, 'r') as f:
+            try:
+                last_counter = int(f.read().strip() or 0)
+            except ValueError:
+                # a truncated or corrupt index; fall back to the log itself,
+                # so that events aren't appended (and dispatched) twice
+                last_counter = logged_counter(dest)
+
+    # anything at or below the last counter has already been appended
+    pending = []
+    if os.path.isdir(events_dir):
+        for filename in os.listdir(events_dir):
+            if filename.endswith('.json'):
+                counter = event_counter(filename)
+                if counter > last_counter:
+                    pending.append((counter, filename))
+    pending.sort()
+
+    count = 0
+    # always create the log, so the controller has something to sync
+    with open(dest, 'a') as log:
+        for counter, filename in pending:
+            if counter != last_counter + 1:
+                # an earlier event isn't listed yet; stop at the gap (and pick
+                # up from there on the next check) so that it isn't skipped
+                break
+            try:
+                with open(os.path.join(events_dir, filename), 'r') as f:
+                    event_data = json.load(f)
+            except ValueError:
+                # not fully written yet; stop here (and pick it up on the
+                # next check) so that events are appended in order
+                break
+            log.write(json.dumps(event_data) + '\n')
+            last_counter = counter
+            count += 1
+        log.flush()
+
+    if count:
+        # replace the index only once the events it covers are in the log
+        with open(index_path + '.tmp', 'w') as index:
+            index.write(str(last_counter))
+        os.rename(index_path + '.tmp', index_path)
+
+    module.exit_json(dest=dest, changed=bool(count), appended=count)
+
+
+if __name__ == '__main__':
+    main()
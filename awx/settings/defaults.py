@@ -202,6 +202,11 @@ JOB_EVENT_WORKERS = 4
 # The maximum size of the job event worker queue before requests are blocked
 JOB_EVENT_MAX_QUEUE_SIZE = 10000
 
+# Events for a job are handled by the same callback receiver worker, in order;
+# if that worker falls this many events behind the least busy worker, the job
+# is moved to the least busy worker
+JOB_EVENT_REBALANCE_THRESHOLD = 1000
+
 # Disallow sending session cookies over insecure connections
 SESSION_COOKIE_SECURE = True
 
@@ -660,6 +665,24 @@ AWX_PROOT_SHOW_PATHS = []
 # Note: This setting may be overridden by database settings.
 AWX_PROOT_BASE_PATH = "/tmp"
 
+# Directory holding the per-node cache of project checkouts (one per project
+# revision) that jobs are copied from.  Defaults to a directory inside
+# AWX_PROOT_BASE_PATH, so links can be made into job private data dirs.
+AWX_PROJECT_CHECKOUT_CACHE_PATH = None
+
+# Disk budget (in bytes) for cached project checkouts; least recently used
+# checkouts are removed past this size.  Set to 0 to disable the cache.
+AWX_PROJECT_CHECKOUT_CACHE_MAX_SIZE = 2 * 1024 ** 3
+
+# How jobs receive their copy of a cached checkout: 'reflink' (copy-on-write
+# where the filesystem supports it, a plain copy otherwise) or 'copy'.
+AWX_PROJECT_CHECKOUT_CACHE_LINK = 'reflink'
+
+# Seconds to keep values looked up with external credential plugins (e.g.,
+# HashiCorp Vault) in the memory of each job process, so that jobs launched
+# together don't all query the secret backend.  0 disables the cache.
+AWX_CREDENTIAL_PLUGIN_CACHE_TTL = 0
+
 # Disable resource profiling by default
 AWX_RESOURCE_PROFILING_ENABLED = False
 
@@ -687,6 +710,9 @@ PENDO_TRACKING_STATE = "off"
 # Note: This setting may be overridden by database settings.
 INSIGHTS_TRACKING_STATE = False
 
+# Number of collectors and tables gathered concurrently for Insights.
+AUTOMATION_ANALYTICS_GATHER_WORKERS = 4
+
 
 # Default list of modules allowed for ad hoc commands.
 # Note: This setting may be overridden by database settings.
@@ -958,6 +984,17 @@ PERSISTENT_CALLBACK_MESSAGES = True
 USE_CALLBACK_QUEUE = True
 CALLBACK_QUEUE = "callback_tasks"
 
+# Job events are published to the callback queue in batches of up to this
+# many events; a partial batch is published once its oldest event is
+# CALLBACK_BATCH_INTERVAL seconds old (checked as events arrive and whenever
+# the running job polls for cancellation)
+CALLBACK_BATCH_SIZE = 50
+CALLBACK_BATCH_INTERVAL = 1
+
+# The number of unacknowledged callback messages the callback receiver will
+# accept from the broker at once; received messages are acknowledged in bulk
+CALLBACK_PREFETCH_COUNT = 100
+
 SCHEDULER_QUEUE = "scheduler"
 
 TASK_COMMAND_PORT = 6559
@@ -982,11 +1019,21 @@ INSIGHTS_AGENT_MIME = 'application/example'
 
 TOWER_SETTINGS_MANIFEST = {}
 
+# Number of seconds the expensive aggregates behind /api/v2/metrics/ are
+# cached for.  Set to 0 to query the database on every scrape.
+AWX_METRICS_CACHE_TIMEOUT = 60
+
 # Settings related to external logger configuration
 LOG_AGGREGATOR_ENABLED = False
 LOG_AGGREGATOR_TCP_TIMEOUT = 5
 LOG_AGGREGATOR_VERIFY_CERT = True
 LOG_AGGREGATOR_LEVEL = 'INFO'
+# Records are shipped to the aggregator in batches from a background thread;
+# when LOG_AGGREGATOR_MAX_QUEUE_SIZE records are waiting, new records are
+# either dropped ('drop') or the logging call waits for room ('block')
+LOG_AGGREGATOR_MAX_QUEUE_SIZE = 10000
+LOG_AGGREGATOR_BATCH_SIZE = 100
+LOG_AGGREGATOR_QUEUE_FULL_POLICY = 'drop'
 
 # The number of retry attempts for websocket session establishment
 # If you're encountering issues establishing websockets in clustered Tower,
@@ -1238,6 +1285,10 @@ SILENCED_SYSTEM_CHECKS = ['models.E006']
 # Use middleware to get request statistics
 AWX_REQUEST_PROFILE = False
 
+# Fraction (0 to 1) of requests whose SQL statements are recorded for the
+# request metrics, when AWX_REQUEST_PROFILE is off
+AWX_REQUEST_PROFILE_SAMPLE_RATE = 0
+
 # Delete temporary directories created to store playbook run-time
 AWX_CLEANUP_PATHS = True
 
@@ -3,6 +3,7 @@
 
 # Python
 from collections import OrderedDict
+import json
 import logging
 import uuid
 
@@ -13,6 +14,7 @@ from django.dispatch import receiver
 from django.contrib.auth.models import User
 from django.conf import settings as django_settings
 from django.core.signals import setting_changed
+from django.db.models import Count, Exists, Max, OuterRef
 from django.utils.encoding import force_text
 
 # django-auth-ldap
@@ -308,31 +310,89 @@ class SAMLAuth(BaseSAMLAuth):
         return super(SAMLAuth, self).get_user(user_id)
 
 
-def _update_m2m_from_groups(user, ldap_user, related, opts, remove=True):
+def _is_member_of_groups(ldap_user, opts):
     '''
-    Hepler function to update m2m relationship based on LDAP group membership.
+    Helper function to check an org/team map option against LDAP group
+    membership; returns None when the option doesn't manage the membership.
     '''
-    should_add = False
     if opts is None:
-        return
+        return None
     elif not opts:
-        pass
+        return False
     elif opts is True:
-        should_add = True
-    else:
-        if isinstance(opts, str):
-            opts = [opts]
-        for group_dn in opts:
-            if not isinstance(group_dn, str):
-                continue
-            if ldap_user._get_groups().is_member_of(group_dn):
-                should_add = True
-    if should_add:
-        user.save()
-        related.add(user)
-    elif remove and user in related.all():
-        user.save()
-        related.remove(user)
+        return True
+    if isinstance(opts, str):
+        opts = [opts]
+    return any(
+        ldap_user._get_groups().is_member_of(group_dn)
+        for group_dn in opts if isinstance(group_dn, str)
+    )
+
+
+# {(ORGANIZATION_MAP, TEAM_MAP): (organization/team signature, role ids)},
+# shared by every LDAP backend (a new one is created for each login)
+_mapped_role_ids = {}
+
+
+def _get_mapped_role_ids(backend_settings, refresh=False):
+    '''
+    Return {(kind, name, organization name, role field): role id} for the
+    organizations and teams in ORGANIZATION_MAP and TEAM_MAP, creating those
+    that don't exist yet.  The ids are cached for the maps until an
+    organization or team is created, renamed or deleted.
+    '''
+    from awx.main.models import Organization, Team
+    org_map = getattr(backend_settings, 'ORGANIZATION_MAP', {})
+    team_map = dict(
+        (team_name, team_opts) for team_name, team_opts in getattr(backend_settings, 'TEAM_MAP', {}).items()
+        if 'organization' in team_opts
+    )
+    key = json.dumps([org_map, team_map], sort_keys=True, default=str)
+    signature = (
+        tuple(Organization.objects.aggregate(Max('modified'), Count('id')).values()),
+        tuple(Team.objects.aggregate(Max('modified'), Count('id')).values()),
+    )
+    cached = _mapped_role_ids.get(key)
+    if cached is not None and cached[0] == signature and not refresh:
+        return cached[1]
+
+    org_names = set(org_map) | set(team_opts['organization'] for team_opts in team_map.values())
+    orgs = dict((org.name, org) for org in Organization.objects.filter(name__in=org_names))
+    for org_name in org_names - set(orgs):
+        orgs[org_name], created = Organization.objects.get_or_create(name=org_name)
+    teams = dict(
+        ((team.organization_id, team.name), team)
+        for team in Team.objects.filter(organization__in=orgs.values(), name__in=team_map.keys())
+    )
+
+    role_ids = {}
+    for org_name in org_map:
+        for role_field in ('admin_role', 'auditor_role', 'member_role'):
+            role_ids[('organization', org_name, org_name, role_field)] = getattr(orgs[org_name], role_field + '_id')
+    for team_name, team_opts in team_map.items():
+        org = orgs[team_opts['organization']]
+        team = teams.get((org.pk, team_name))
+        if team is None:
+            team, created = Team.objects.get_or_create(name=team_name, organization=org)
+        role_ids[('team', team_name, org.name, 'member_role')] = team.member_role_id
+    if len(_mapped_role_ids) >= 16:
+        # the maps of a few LDAP servers, and of their previous versions
+        _mapped_role_ids.clear()
+    # if any were created above, the signature is already out of date and
+    # the ids are looked up once more on the next login
+    _mapped_role_ids[key] = (signature, role_ids)
+    return role_ids
+
+
+def _get_role_memberships(user, role_ids):
+    '''
+    Return {role id: whether the user is a member} for the given roles, with
+    a single query.
+    '''
+    from awx.main.models import Role
+    return dict(Role.objects.filter(pk__in=role_ids).annotate(
+        is_member=Exists(Role.members.through.objects.filter(role_id=OuterRef('pk'), user_id=user.pk))
+    ).values_list('pk', 'is_member'))
 
 
 @receiver(populate_user, dispatch_uid='populate-ldap-user')
@@ -341,7 +401,7 @@ def on_populate_user(sender, **kwargs):
     Handle signal from LDAP backend to populate the user object.  Update user
     organization/team memberships according to their LDAP groups.
     '''
-    from awx.main.models import Organization, Team
+    from awx.main.models import Role, batch_role_ancestor_rebuilding
     user = kwargs['user']
     ldap_user = kwargs['ldap_user']
     backend = ldap_user.backend
@@ -360,35 +420,54 @@ def on_populate_user(sender, **kwargs):
                 'LDAP user {} has {} > max {} characters'.format(user.username, field, max_len)
             )
 
-    # Update organization membership based on group memberships.
+    # Work out the organization and team roles the user should (or should
+    # no longer) be a member of, based on group memberships.
+    targets = []
     org_map = getattr(backend.settings, 'ORGANIZATION_MAP', {})
     for org_name, org_opts in org_map.items():
-        org, created = Organization.objects.get_or_create(name=org_name)
         remove = bool(org_opts.get('remove', True))
-        admins_opts = org_opts.get('admins', None)
-        remove_admins = bool(org_opts.get('remove_admins', remove))
-        _update_m2m_from_groups(user, ldap_user, org.admin_role.members, admins_opts,
-                                remove_admins)
-        auditors_opts = org_opts.get('auditors', None)
-        remove_auditors = bool(org_opts.get('remove_auditors', remove))
-        _update_m2m_from_groups(user, ldap_user, org.auditor_role.members, auditors_opts,
-                                remove_auditors)
-        users_opts = org_opts.get('users', None)
-        remove_users = bool(org_opts.get('remove_users', remove))
-        _update_m2m_from_groups(user, ldap_user, org.member_role.members, users_opts,
-                                remove_users)
-
-    # Update team membership based on group memberships.
+        for role_field, opts_name in (('admin_role', 'admins'), ('auditor_role', 'auditors'), ('member_role', 'users')):
+            targets.append((
+                ('organization', org_name, org_name, role_field),
+                _is_member_of_groups(ldap_user, org_opts.get(opts_name, None)),
+                bool(org_opts.get('remove_' + opts_name, remove)),
+            ))
     team_map = getattr(backend.settings, 'TEAM_MAP', {})
     for team_name, team_opts in team_map.items():
         if 'organization' not in team_opts:
             continue
-        org, created = Organization.objects.get_or_create(name=team_opts['organization'])
-        team, created = Team.objects.get_or_create(name=team_name, organization=org)
-        users_opts = team_opts.get('users', None)
-        remove = bool(team_opts.get('remove', True))
-        _update_m2m_from_groups(user, ldap_user, team.member_role.members, users_opts,
-                                remove)
+        targets.append((
+            ('team', team_name, team_opts['organization'], 'member_role'),
+            _is_member_of_groups(ldap_user, team_opts.get('users', None)),
+            bool(team_opts.get('remove', True)),
+        ))
+    targets = [target for target in targets if target[1] is not None]
+    if org_map or team_map:
+        role_ids = _get_mapped_role_ids(backend.settings)
+
+    if targets:
+        if user.pk is None:
+            user.save()
+        memberships = _get_role_memberships(user, role_ids.values())
+        if len(memberships) < len(set(role_ids.values())):
+            # a mapped organization or team was deleted since the role ids
+            # were cached
+            role_ids = _get_mapped_role_ids(backend.settings, refresh=True)
+            memberships = _get_role_memberships(user, role_ids.values())
+        to_add, to_remove = set(), set()
+        for key, should_add, remove in targets:
+            role_id = role_ids[key]
+            if should_add and not memberships[role_id]:
+                to_add.add(role_id)
+            elif not should_add and remove and memberships[role_id]:
+                to_remove.add(role_id)
+        if to_add or to_remove:
+            roles = Role.objects.in_bulk(to_add | to_remove)
+            with batch_role_ancestor_rebuilding():
+                for role_id in sorted(to_add):
+                    roles[role_id].members.add(user)
+                for role_id in sorted(to_remove):
+                    roles[role_id].members.remove(user)
 
     # Update user profile to store LDAP DN.
     user.save()
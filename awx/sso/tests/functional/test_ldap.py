@@ -1,8 +1,11 @@
+from unittest import mock
+
 from django.test.utils import override_settings
 import ldap
 import pytest
 
-from awx.sso.backends import LDAPSettings
+from awx.main.models import Organization, Team
+from awx.sso.backends import LDAPBackend, LDAPSettings, on_populate_user
 
 
 @override_settings(AUTH_LDAP_CONNECTION_OPTIONS = {ldap.OPT_NETWORK_TIMEOUT: 60})
@@ -22,3 +25,56 @@ def test_ldap_with_missing_timeout():
         ldap.OPT_REFERRALS: 0,
         ldap.OPT_NETWORK_TIMEOUT: 30
     }
+
+
+@override_settings(
+    AUTH_LDAP_ORGANIZATION_MAP={
+        'Engineering': {'admins': 'cn=admins,dc=example,dc=com', 'users': True},
+        'Sales': {'users': 'cn=sales,dc=example,dc=com'},
+    },
+    AUTH_LDAP_TEAM_MAP={
+        'Ops': {'organization': 'Engineering', 'users': 'cn=ops,dc=example,dc=com'},
+    },
+)
+@pytest.mark.django_db
+def test_ldap_org_team_membership_sync(django_user_model):
+    groups = set(['cn=admins,dc=example,dc=com'])
+
+    def login():
+        # as with authenticate(), every login gets a new backend
+        ldap_user = mock.Mock(dn='uid=alice,dc=example,dc=com', backend=LDAPBackend())
+        ldap_user._get_groups.return_value.is_member_of.side_effect = lambda dn: dn in groups
+        on_populate_user(None, user=user, ldap_user=ldap_user)
+
+    user = django_user_model.objects.create(username='alice')
+    sales = Organization.objects.create(name='Sales')
+    sales.member_role.members.add(user)
+
+    login()
+    engineering = Organization.objects.get(name='Engineering')
+    ops = Team.objects.get(name='Ops', organization=engineering)
+    assert user in engineering.admin_role.members.all()
+    assert user in engineering.member_role.members.all()
+    assert user not in sales.member_role.members.all()
+    assert user not in ops.member_role.members.all()
+    assert user.profile.ldap_dn == 'uid=alice,dc=example,dc=com'
+
+    # organizations and teams are looked up again only once they change
+    login()
+    groups.add('cn=ops,dc=example,dc=com')
+    with mock.patch.object(Organization.objects, 'filter') as org_filter:
+        login()
+    org_filter.assert_not_called()
+    assert user in ops.member_role.members.all()
+
+    # a renamed organization is no longer the mapped one
+    engineering.name = 'Old Engineering'
+    engineering.save()
+    login()
+    assert user in Organization.objects.get(name='Engineering').admin_role.members.all()
+
+    # a deleted organization is created again
+    sales.delete()
+    groups.add('cn=sales,dc=example,dc=com')
+    login()
+    assert user in Organization.objects.get(name='Sales').member_role.members.all()
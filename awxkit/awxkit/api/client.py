@@ -39,6 +39,10 @@ class Connection(object):
             requests.packages.urllib3.disable_warnings()
 
         self.session = requests.Session()
+        # keep a connection for each thread fetching pages concurrently
+        adapter = requests.adapters.HTTPAdapter(pool_maxsize=max(config.client_page_workers, 10))
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
         self.uses_session_cookie = False
 
     def get_session_requirements(self, next='/api/'):
@@ -1,4 +1,6 @@
+import collections
 import inspect
+import itertools
 import logging
 import json
 import re
@@ -6,6 +8,12 @@ import re
 from requests import Response
 import six
 from six.moves import http_client as http
+from six.moves import range
+
+try:
+    from concurrent.futures import ThreadPoolExecutor
+except ImportError:  # python 2 without the futures backport
+    ThreadPoolExecutor = None
 
 from awxkit.utils import (
     PseudoNamespace,
@@ -276,18 +284,69 @@ class Page(object):
         r = self.connection.get(self.endpoint, query_parameters)
         page = self.page_identity(r)
         if all_pages and page.next:
-            paged_results = [r.json()['results']]
-            while page.next:
-                r = self.connection.get(self.next, query_parameters)
-                page = self.page_identity(r)
-                paged_results.append(r.json()['results'])
             json = r.json()
-            json['results'] = []
-            for page in paged_results:
-                json['results'].extend(page)
+            json['results'].extend(self._iter_remaining_results(json, query_parameters))
+            json['next'] = None
             page = self.__class__.from_json(json)
         return page
 
+    def iter_results(self, **query_parameters):
+        """Lazily yield the JSON of every result of a list endpoint, across all of its pages.
+
+        Unlike `get(all_pages=True)`, only a few pages are held in memory at a time.
+        """
+        r = self.connection.get(self.endpoint, query_parameters)
+        self.page_identity(r)
+        data = r.json()
+        for result in data['results']:
+            yield result
+        for result in self._iter_remaining_results(data, query_parameters):
+            yield result
+
+    def _get_results(self, endpoint, query_parameters=None):
+        r = self.connection.get(endpoint, query_parameters)
+        # raises for error responses
+        self.__class__(self.connection, endpoint=endpoint).page_identity(r)
+        return r.json()
+
+    def _iter_remaining_results(self, data, query_parameters):
+        """Yield the results of the pages after `data`, the JSON of the first page.
+
+        If the number of pages is known, they are requested by number, up to
+        `config.client_page_workers` at a time, and yielded in order; otherwise
+        `next` links are followed one page at a time.
+        """
+        page_size = len(data['results'])
+        workers = config.client_page_workers
+        if not data.get('next'):
+            return
+        if ThreadPoolExecutor is None or workers < 2 or not page_size or data.get('count') is None:
+            while data.get('next'):
+                data = self._get_results(data['next'])
+                for result in data['results']:
+                    yield result
+            return
+
+        last_page = (data['count'] + page_size - 1) // page_size
+        pages = iter(range(2, last_page + 1))
+
+        def fetch(number):
+            params = dict(query_parameters, page=number, page_size=page_size)
+            try:
+                return self._get_results(self.endpoint, params)['results']
+            except exc.NotFound:
+                # the list has shrunk since the first page was requested
+                return []
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            pending = collections.deque(executor.submit(fetch, n) for n in itertools.islice(pages, workers))
+            while pending:
+                results = pending.popleft().result()
+                for number in itertools.islice(pages, 1):
+                    pending.append(executor.submit(fetch, number))
+                for result in results:
+                    yield result
+
     def head(self):
         r = self.connection.head(self.endpoint)
         return self.page_identity(r)
@@ -397,6 +456,9 @@ class TentativePage(str):
     def get(self, **params):
         return self._create().get(**params)
 
+    def iter_results(self, **params):
+        return self._create().iter_results(**params)
+
     def create_or_replace(self, **query_parameters):
         """Create an object, and if any other item shares the name, delete that one first.
 
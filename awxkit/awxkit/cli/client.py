@@ -4,6 +4,7 @@ import logging
 import os
 import pkg_resources
 import sys
+import types
 
 from requests.exceptions import RequestException
 import six
@@ -11,7 +12,7 @@ import six
 from .custom import handle_custom_actions
 from .format import (add_authentication_arguments,
                      add_output_formatting_arguments,
-                     FORMATTERS, format_response)
+                     FORMATTERS, format_response, format_json_lines)
 from .options import ResourceOptionsParser, UNIQUENESS_RULES
 from .resource import parse_resource, is_control_resource
 from awxkit import api, config, utils, exceptions, WSClient  # noqa
@@ -167,6 +168,11 @@ class CLI(object):
             else:
                 response = self.parse_action(resource)
 
+            if isinstance(response, types.GeneratorType):
+                for line in format_json_lines(response):
+                    print(utils.to_str(line), file=self.stdout)
+                return
+
             _filter = self.get_config('filter')
 
             # human format for metrics, settings is special
@@ -313,6 +319,12 @@ class CLI(object):
         if self.original_action == 'create':
             return page.post(parsed)
 
+        if self.method == 'get' and parsed.get('all_pages') and self.get_config('format') == 'json':
+            # stream the results of every page, rather than collecting
+            # them all before printing anything
+            parsed.pop('all_pages')
+            return page.iter_results(**parsed)
+
         return getattr(page, self.method)(**parsed)
 
     def parse_args(self, argv, env=None):
@@ -99,6 +99,13 @@ def format_response(response, fmt='json', filter='.', changed=False):
     return formatted
 
 
+def format_json_lines(results):
+    """Format each result as a line of JSON, as soon as it is received"""
+    for result in results:
+        result.pop('related', None)
+        yield json.dumps(result)
+
+
 def format_jq(output, fmt):
     try:
         import jq
@@ -111,7 +111,9 @@ class ResourceOptionsParser(object):
                     '--all', dest='all_pages', action='store_true',
                     help=(
                         'fetch all pages of content from the API when '
-                        'returning results (instead of just the first page)'
+                        'returning results (instead of just the first page); '
+                        'with the json format, each result is printed as a '
+                        'line of JSON as soon as it is received'
                     )
                 )
                 add_output_formatting_arguments(parser, {})
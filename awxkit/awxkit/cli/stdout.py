@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 from __future__ import print_function
 
+import logging
 import sys
 
 import time
@@ -8,6 +9,116 @@ import time
 from .utils import cprint, color_enabled, STATUS_COLORS
 from awxkit.utils import to_str
 
+log = logging.getLogger(__name__)
+
+# the longest time to wait between two polls of a job which isn't changing
+MAX_INTERVAL = 5
+
+# seconds without a websocket message after which the job is checked over
+# the API, in case a message was missed
+WS_IDLE = 10
+
+
+def subscribe(session, **groups):
+    """
+    Returns a websocket client subscribed to the given channel groups, or None
+    if websockets can't be used; websocket-client is an optional dependency,
+    and the websocket only accepts session (not OAuth2 token) authentication.
+    """
+    try:
+        session_id = session.cookies.get('sessionid')
+        if not session_id:
+            return None
+        from awxkit.ws import WSClient
+        ws = WSClient(session_id=session_id, csrftoken=session.cookies.get('csrftoken')).connect()
+    except Exception as e:
+        log.debug('Websocket unavailable, falling back to polling: {}'.format(e))
+        return None
+    accepted = ws.recv(timeout=5)
+    if not (accepted and accepted.get('accept')):
+        log.debug('Websocket connection was not accepted, falling back to polling.')
+        ws.close()
+        return None
+    ws.subscribe(**groups)
+    return ws
+
+
+def follow(ws, handle, check, timed_out):
+    """
+    Passes websocket messages to `handle` until it reports the job as done.
+    `check` looks the job up over the API; it's called once the subscription
+    is in place, and again whenever the websocket goes quiet.
+
+    Returns False if the websocket was closed (or monitoring timed out)
+    before the job was done.
+    """
+    try:
+        if check():
+            return True
+        idle = time.time()
+        while not timed_out():
+            message = ws.recv(timeout=1)
+            if message is not None:
+                idle = time.time()
+                if handle(message):
+                    return True
+            elif ws.closed:
+                return False
+            elif time.time() - idle > WS_IDLE:
+                if check():
+                    return True
+                idle = time.time()
+        return False
+    finally:
+        ws.close()
+
+
+def poll(step, timed_out, interval):
+    """
+    Calls `step` until it reports the job as done, sleeping `interval`
+    seconds between calls which made progress, and exponentially longer (up
+    to MAX_INTERVAL) while nothing changes.
+
+    Returns False if monitoring timed out.
+    """
+    delay = interval
+    while not timed_out():
+        progressed, done = step()
+        if done:
+            return True
+        delay = interval if progressed else min(delay * 2, max(interval, MAX_INTERVAL))
+        time.sleep(delay)
+    return False
+
+
+class EventStream(object):
+    """Prints the stdout of job events in order, however they arrive"""
+
+    def __init__(self, print_stdout=True):
+        self.print_stdout = print_stdout
+        self.next_line = 0
+        self.pending = {}
+
+    def add(self, *events):
+        """Returns True if the stdout printed so far moved forward"""
+        for event in events:
+            start_line = event['start_line']
+            if start_line < self.next_line:
+                continue
+            # several events may start on the same line if all but one of
+            # them have no stdout; keep the one which ends last
+            if event['end_line'] >= self.pending.get(start_line, event)['end_line']:
+                self.pending[start_line] = event
+
+        printed = self.next_line
+        while self.next_line in self.pending:
+            event = self.pending.pop(self.next_line)
+            stdout = to_str(event.get('stdout'))
+            if stdout and self.print_stdout:
+                print(stdout)
+            self.next_line = event['end_line']
+        return self.next_line != printed
+
 
 def monitor_workflow(response, session, print_stdout=True, timeout=None,
                      interval=.25):
@@ -39,6 +150,7 @@ def monitor_workflow(response, session, print_stdout=True, timeout=None,
                 else:
                     print(status)
                 seen.add(result['id'])
+        return [(result['id'], result['status']) for result in results]
 
     if print_stdout:
         cprint('------Starting Standard Out Stream------', 'red')
@@ -48,24 +160,42 @@ def monitor_workflow(response, session, print_stdout=True, timeout=None,
 
     started = time.time()
     seen = set()
-    while True:
-        if timeout and time.time() - started > timeout:
-            if print_stdout:
-                cprint('Monitoring aborted due to timeout.', 'red')
-            break
+    state = {'nodes': None}
+
+    def timed_out():
+        return timeout and time.time() - started > timeout
 
+    def redraw():
+        # if this is a tty-like device, we can send ANSI codes
+        # to draw an auto-updating view
+        # otherwise, just wait for the job to finish and print it *once*
+        # all at the end
         if sys.stdout.isatty():
-            # if this is a tty-like device, we can send ANSI codes
-            # to draw an auto-updating view
-            # otherwise, just wait for the job to finish and print it *once*
-            # all at the end
-            fetch(seen)
+            nodes, state['nodes'] = state['nodes'], fetch(seen)
+            return nodes != state['nodes']
+        return False
 
-        time.sleep(.25)
-        json = get().json
-        if json.finished:
-            fetch(seen)
-            break
+    def handle(message):
+        if message.get('group_name') == 'workflow_events':
+            redraw()
+        elif message.get('group_name') == 'jobs' and message.get('unified_job_id') == response.id:
+            return message.get('status') in ('successful', 'failed', 'error', 'canceled')
+        return False
+
+    def check():
+        redraw()
+        return bool(get().json.finished)
+
+    def step():
+        progressed = redraw()
+        return progressed, bool(get().json.finished)
+
+    ws = subscribe(session, jobs=['status_changed'], workflow_events=[response.id])
+    done = follow(ws, handle, check, timed_out) if ws is not None else False
+    if done or poll(step, timed_out, interval):
+        fetch(seen)
+    elif print_stdout:
+        cprint('Monitoring aborted due to timeout.', 'red')
     if print_stdout:
         cprint('------End of Standard Out Stream--------\n', 'red')
     return get().json.status
@@ -78,44 +208,65 @@ def monitor(response, session, print_stdout=True, timeout=None, interval=.25):
         events = response.related.job_events.get
     else:
         events = response.related.events.get
+    group = '{}_events'.format(response.type)
 
-    next_line = 0
+    stream = EventStream(print_stdout)
 
-    def fetch(next_line):
-        for result in events(**payload).json.results:
-            if result['start_line'] != next_line:
-                # If this event is a line from _later_ in the stdout,
-                # it means that the events didn't arrive in order;
-                # skip it for now and wait until the prior lines arrive and are
-                # printed
-                continue
-            stdout = to_str(result.get('stdout'))
-            if stdout and print_stdout:
-                print(stdout)
-            next_line = result['end_line']
-        return next_line
+    def fetch():
+        if stream.next_line:
+            payload['start_line__gte'] = stream.next_line
+        return stream.add(*events(**payload).json.results)
+
+    def finished():
+        json = get().json
+        return (
+            json.event_processing_finished is True or
+            json.status in ('error', 'canceled')
+        )
+
+    seen = set()
+
+    def handle(message):
+        if message.get('group_name') == group:
+            stream.add(message)
+        elif message.get('group_name') == 'jobs' and message.get('unified_job_id') == response.id:
+            status = message.get('status')
+            if status in ('error', 'canceled'):
+                return True
+            # the summary is sent once all of the job's events are saved,
+            # which may be before its final status is
+            if 'final_counter' in message:
+                seen.add('summary')
+            elif status in ('successful', 'failed'):
+                seen.add('status')
+            else:
+                return False
+            return seen == {'summary', 'status'} or finished()
+        return False
+
+    def check():
+        fetch()
+        return finished()
+
+    def step():
+        return fetch(), finished()
 
     if print_stdout:
         cprint('------Starting Standard Out Stream------', 'red')
 
     started = time.time()
-    while True:
-        if timeout and time.time() - started > timeout:
-            if print_stdout:
-                cprint('Monitoring aborted due to timeout.', 'red')
-            break
-        next_line = fetch(next_line)
-        if next_line:
-            payload['start_line__gte'] = next_line
 
-        time.sleep(.25)
-        json = get().json
-        if (
-            json.event_processing_finished is True or
-            json.status in ('error', 'canceled')
-        ):
-            fetch(next_line)
-            break
+    def timed_out():
+        return timeout and time.time() - started > timeout
+
+    ws = subscribe(session, jobs=['status_changed', 'summary'], **{group: [response.id]})
+    done = follow(ws, handle, check, timed_out) if ws is not None else False
+    if done or poll(step, timed_out, interval):
+        # pick up any events which weren't streamed
+        while fetch():
+            pass
+    elif print_stdout:
+        cprint('Monitoring aborted due to timeout.', 'red')
     if print_stdout:
         cprint('------End of Standard Out Stream--------\n', 'red')
     return get().json.status
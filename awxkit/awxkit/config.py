@@ -30,5 +30,6 @@ config.getvalue = types.MethodType(getvalue, config)
 config.assume_untrusted = config.get('assume_untrusted', True)
 
 config.client_connection_attempts = int(os.getenv('AWXKIT_CLIENT_CONNECTION_ATTEMPTS', 5))
+config.client_page_workers = int(os.getenv('AWXKIT_CLIENT_PAGE_WORKERS', 4))
 config.prevent_teardown = to_bool(os.getenv('AWXKIT_PREVENT_TEARDOWN', False))
 config.use_sessions = to_bool(os.getenv('AWXKIT_SESSIONS', False))
@@ -225,6 +225,14 @@ class WSClient(object):
         self.ws.run_forever(sslopt=sslopt)
         log.debug('ws.run_forever finished')
 
+    @property
+    def closed(self):
+        return self._ws_closed
+
+    def recv(self, timeout=10):
+        """Returns the next message, or None if none arrives within timeout seconds"""
+        return self._recv(wait=True, timeout=timeout)
+
     def _recv(self, wait=False, timeout=10):
         try:
             msg = self._recv_queue.get(wait, timeout)
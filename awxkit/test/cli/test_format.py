@@ -4,7 +4,7 @@ import yaml
 
 from awxkit.api.pages import Page
 from awxkit.api.pages.users import Users, User
-from awxkit.cli.format import format_response
+from awxkit.cli.format import format_response, format_json_lines
 
 
 def test_json_empty_list():
@@ -14,6 +14,14 @@ def test_json_empty_list():
     formatted = format_response(page)
     assert json.loads(formatted) == {'results': []}
 
+def test_json_lines():
+    users = [
+        {'username': 'betty', 'related': {}},
+        {'username': 'tom', 'related': {}},
+    ]
+    lines = format_json_lines(iter(users))
+    assert [json.loads(line) for line in lines] == [{'username': 'betty'}, {'username': 'tom'}]
+
 def test_yaml_empty_list():
     page = Page.from_json({
         'results': []
@@ -0,0 +1,97 @@
+try:
+    from unittest.mock import MagicMock, patch
+except ImportError:
+    from mock import MagicMock, patch
+
+from awxkit.cli import stdout
+from awxkit.cli.stdout import EventStream, monitor
+
+
+def event(start_line, end_line, text=None):
+    return {'start_line': start_line, 'end_line': end_line, 'stdout': text, 'group_name': 'job_events'}
+
+
+def job_response(pages, statuses):
+    response = MagicMock(id=42, type='job')
+    response.related.job_events.get.side_effect = [
+        MagicMock(json=MagicMock(results=page)) for page in pages
+    ]
+    response.url.get.side_effect = [
+        MagicMock(json=MagicMock(status=status, event_processing_finished=status == 'successful'))
+        for status in statuses
+    ]
+    return response
+
+
+class FakeWS(object):
+
+    closed = False
+
+    def __init__(self, messages):
+        self.messages = list(messages)
+
+    def recv(self, timeout=10):
+        return self.messages.pop(0) if self.messages else None
+
+    def close(self):
+        self.closed = True
+
+
+def test_events_printed_in_order(capsys):
+    stream = EventStream()
+    assert stream.add(event(1, 3, 'two'), event(0, 0), event(3, 3)) is False
+    assert stream.add(event(0, 1, 'one')) is True
+    assert stream.add(event(0, 1, 'one')) is False
+    assert capsys.readouterr().out == 'one\ntwo\n'
+    assert stream.next_line == 3
+
+
+def test_poll_backs_off_while_idle():
+    steps = iter([(False, False)] * 6 + [(True, False), (False, True)])
+    with patch.object(stdout.time, 'sleep') as sleep:
+        assert stdout.poll(lambda: next(steps), lambda: False, .25) is True
+    assert [c[0][0] for c in sleep.call_args_list] == [.5, 1, 2, 4, 5, 5, .25]
+
+
+def test_monitor_polls_without_websocket(capsys):
+    response = job_response(
+        [[event(0, 1, 'one')], [], [event(1, 2, 'two')], []],
+        ['running', 'running', 'successful', 'successful'],
+    )
+    session = MagicMock(cookies={})
+    with patch.object(stdout.time, 'sleep'):
+        assert monitor(response, session) == 'successful'
+    assert 'one\ntwo\n' in capsys.readouterr().out
+
+
+def test_monitor_streams_websocket_events(capsys):
+    response = job_response(
+        [[event(0, 1, 'one')], [event(2, 3, 'three')], []],
+        ['running', 'successful', 'successful'],
+    )
+    ws = FakeWS([
+        event(1, 2, 'two'),
+        {'group_name': 'jobs', 'unified_job_id': 7, 'status': 'successful'},
+        {'group_name': 'jobs', 'unified_job_id': 42, 'final_counter': 3},
+    ])
+    with patch.object(stdout, 'subscribe', return_value=ws) as subscribe:
+        assert monitor(response, MagicMock()) == 'successful'
+    assert subscribe.call_args[1] == {'jobs': ['status_changed', 'summary'], 'job_events': [42]}
+    assert ws.closed
+    assert 'one\ntwo\nthree\n' in capsys.readouterr().out
+
+
+def test_monitor_waits_for_status_after_summary(capsys):
+    response = job_response(
+        [[event(0, 1, 'one')], []],
+        ['running', 'running', 'successful'],
+    )
+    ws = FakeWS([
+        {'group_name': 'jobs', 'unified_job_id': 42, 'final_counter': 1},
+        event(1, 2, 'two'),
+        {'group_name': 'jobs', 'unified_job_id': 42, 'status': 'successful'},
+    ])
+    with patch.object(stdout, 'subscribe', return_value=ws):
+        assert monitor(response, MagicMock()) == 'successful'
+    assert ws.messages == []
+    assert 'one\ntwo\n' in capsys.readouterr().out
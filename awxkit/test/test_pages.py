@@ -0,0 +1,60 @@
+import json
+
+try:
+    from unittest.mock import patch
+except ImportError:
+    from mock import patch
+import pytest
+import requests
+from six.moves.urllib.parse import parse_qs, urlparse
+
+from awxkit.api.pages import Page
+from awxkit.config import config
+
+HOSTS = [{'id': i, 'name': 'host-{}'.format(i)} for i in range(1, 24)]
+
+
+class FakeConnection(object):
+
+    def __init__(self):
+        self.requested = []
+
+    def get(self, endpoint, query_parameters=None):
+        url = urlparse(endpoint)
+        params = dict((k, int(v[0])) for k, v in parse_qs(url.query).items())
+        params.update(query_parameters or {})
+        self.requested.append(params.get('page', 1))
+        page, page_size = params.get('page', 1), params.get('page_size', 5)
+        results = HOSTS[(page - 1) * page_size:page * page_size]
+        next_page = None
+        if page * page_size < len(HOSTS):
+            next_page = '/api/v2/hosts/?page={}&page_size={}'.format(page + 1, page_size)
+
+        r = requests.Response()
+        r.status_code = 200 if results else 404
+        r._content = json.dumps({
+            'count': len(HOSTS), 'next': next_page, 'results': results
+        }).encode('utf-8')
+        r.request = requests.Request('GET', 'https://awx.example.org' + url.path).prepare()
+        r.elapsed = 0
+        return r
+
+
+@pytest.mark.parametrize('workers', [1, 4])
+def test_iter_results(workers):
+    connection = FakeConnection()
+    with patch.object(config, 'client_page_workers', workers):
+        results = Page(connection, endpoint='/api/v2/hosts/').iter_results(page_size=5)
+        assert next(results) == HOSTS[0]
+        # pages are only requested as the results are consumed
+        assert len(connection.requested) <= 1 + workers
+        assert [next(results) for _ in range(4)] == HOSTS[1:5]
+        assert list(results) == HOSTS[5:]
+    assert sorted(connection.requested) == [1, 2, 3, 4, 5]
+
+
+def test_get_all_pages():
+    connection = FakeConnection()
+    page = Page(connection, endpoint='/api/v2/hosts/').get(all_pages=True, page_size=5)
+    assert page.json['results'] == HOSTS
+    assert page.json['next'] is None